@@ -1,8 +1,6 @@
 import os
-import pyodbc, psycopg2
 from datetime import timedelta
 from decouple import config
-from sqlalchemy import create_engine
 
 BASE_DIR = os.path.dirname(os.path.realpath(__file__))
 
@@ -12,6 +10,110 @@ class Config:
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(minutes=480)
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(minutes=480)
     SQLALCHEMY_TRACK_MODIFICATIONS = config('SQLALCHEMY_TRACK_MODIFICATIONS', cast=bool)
+    # Statement logging is for local debugging only; DevConfig turns it on.
+    SQLALCHEMY_ECHO = config('SQLALCHEMY_ECHO', default=False, cast=bool)
+
+    # Connection pool of the single per-process engine (the Flask-SQLAlchemy one).
+    # pool_size + max_overflow is the hard cap of open connections per worker.
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': config('DB_POOL_SIZE', default=5, cast=int),
+        'max_overflow': config('DB_MAX_OVERFLOW', default=10, cast=int),
+        'pool_recycle': config('DB_POOL_RECYCLE', default=1800, cast=int),  # seconds
+        'pool_timeout': config('DB_POOL_TIMEOUT', default=30, cast=int),    # seconds to wait for a free connection
+        'pool_pre_ping': config('DB_POOL_PRE_PING', default=True, cast=bool),
+    }
+
+    # Batched audit logging into logactions (utils/audit_log.py)
+    AUDIT_LOG_ENABLED = config('AUDIT_LOG_ENABLED', default=True, cast=bool)
+    AUDIT_LOG_BATCH_SIZE = config('AUDIT_LOG_BATCH_SIZE', default=200, cast=int)
+    AUDIT_LOG_FLUSH_INTERVAL = config('AUDIT_LOG_FLUSH_INTERVAL', default=2.0, cast=float)  # seconds
+    AUDIT_LOG_QUEUE_SIZE = config('AUDIT_LOG_QUEUE_SIZE', default=10000, cast=int)
+    AUDIT_LOG_BLOCK_TIMEOUT = config('AUDIT_LOG_BLOCK_TIMEOUT', default=0.0, cast=float)  # 0 = drop when full
+
+    # Full-text search over books/attachments (utils/text_search.py). The path is the
+    # local on-disk index used when the database is not PostgreSQL.
+    SEARCH_ENABLED = config('SEARCH_ENABLED', default=True, cast=bool)
+    SEARCH_INDEX_PATH = config('SEARCH_INDEX_PATH', default=os.path.join(BASE_DIR, 'search_index.db'))
+    SEARCH_MAX_PER_PAGE = config('SEARCH_MAX_PER_PAGE', default=50, cast=int)
+
+    # Per-endpoint input limits of the text routes, in characters (utils/request_schema.py).
+    # Larger requests are refused with 413 before any tokenization.
+    GRAMMAR_MAX_CHARS = config('GRAMMAR_MAX_CHARS', default=5000, cast=int)
+    PARAPHRASE_MAX_CHARS = config('PARAPHRASE_MAX_CHARS', default=2000, cast=int)
+    AIBYPASS_MAX_CHARS = config('AIBYPASS_MAX_CHARS', default=2000, cast=int)
+    COEDIT_MAX_CHARS = config('COEDIT_MAX_CHARS', default=2000, cast=int)
+
+    # JSON logging through a queue and a background writer (utils/log_setup.py).
+    # LOG_OUTPUT is 'stdout' or 'file'; files are LOG_DIR/app-<pid>.log, one per worker.
+    LOG_LEVEL = config('LOG_LEVEL', default='INFO')
+    LOG_OUTPUT = config('LOG_OUTPUT', default='stdout')
+    LOG_DIR = config('LOG_DIR', default=os.path.join(os.path.dirname(BASE_DIR), 'logs'))
+    LOG_QUEUE_SIZE = config('LOG_QUEUE_SIZE', default=10000, cast=int)
+
+    # Request tracing (utils/tracing.py): share of requests traced, and where the
+    # OTLP/JSON span files (spans-<pid>.jsonl) are written.
+    TRACE_ENABLED = config('TRACE_ENABLED', default=True, cast=bool)
+    TRACE_SAMPLE_RATIO = config('TRACE_SAMPLE_RATIO', default=0.1, cast=float)
+    TRACE_EXPORT_DIR = config('TRACE_EXPORT_DIR', default=os.path.join(os.path.dirname(BASE_DIR), 'logs'))
+    TRACE_SERVICE_NAME = config('TRACE_SERVICE_NAME', default='grammar-check')
+
+    # Admin endpoints (Operation/admin.py): role names that count as admin, comma separated,
+    # and the limits of the sampling profiler route.
+    ADMIN_ROLE_NAMES = config('ADMIN_ROLE_NAMES', default='admin')
+    # /api/metrics needs an admin token, except from these addresses (the scraper), comma
+    # separated. Behind a reverse proxy every request comes from the proxy: leave it empty.
+    METRICS_ALLOWED_IPS = config('METRICS_ALLOWED_IPS', default='')
+    PROFILER_MAX_SECONDS = config('PROFILER_MAX_SECONDS', default=60, cast=float)
+    PROFILER_INTERVAL_MS = config('PROFILER_INTERVAL_MS', default=10, cast=float)
+
+    # Where Tool/model_store.py provisions the model directories (Config/model_manifest.json).
+    MODELS_ROOT = config('MODELS_ROOT', default='/var/www/html/python/grammer_check/models')
+    # Which model, backend and generate() profile serve each (task, lang, style, tier) (utils/model_routing.py).
+    MODEL_ROUTING_FILE = config('MODEL_ROUTING_FILE', default=os.path.join(BASE_DIR, 'model_routing.json'))
+    # Hot swap (utils/model_swap.py): how long a swap waits for in-flight requests on the old model.
+    MODEL_SWAP_DRAIN_TIMEOUT = config('MODEL_SWAP_DRAIN_TIMEOUT', default=300.0, cast=float)
+
+    # Early exit (Operation/engine/early_exit.py): input whose every token the model would
+    # copy with at least this probability is returned without decoding. A share of those
+    # skips is decoded anyway to measure the corrections missed.
+    EARLY_EXIT_ENABLED = config('EARLY_EXIT_ENABLED', default=True, cast=bool)
+    EARLY_EXIT_THRESHOLD = config('EARLY_EXIT_THRESHOLD', default=0.9, cast=float)
+    EARLY_EXIT_AUDIT_RATE = config('EARLY_EXIT_AUDIT_RATE', default=0.02, cast=float)
+
+    # Generation memory (utils/generation_memory.py): budget in MB for the estimated peak of
+    # concurrent generate() calls (0 = what is left below the high watermark), how long a
+    # call waits for memory before running with fewer beams, and the RSS sampling period.
+    GENERATION_MEMORY_ENABLED = config('GENERATION_MEMORY_ENABLED', default=True, cast=bool)
+    GENERATION_MEMORY_BUDGET_MB = config('GENERATION_MEMORY_BUDGET_MB', default=0, cast=int)
+    GENERATION_MEMORY_WAIT_SECONDS = config('GENERATION_MEMORY_WAIT_SECONDS', default=30.0, cast=float)
+    GENERATION_MEMORY_SAMPLE_MS = config('GENERATION_MEMORY_SAMPLE_MS', default=5, cast=float)
+
+    # Memory governor (utils/memory_governor.py): RSS watermarks in MB per worker process
+    # (0 = 85% / 70% of the cgroup or physical memory limit, divided by MEMORY_WORKERS),
+    # the number of worker processes sharing that limit (WEB_CONCURRENCY, the gunicorn
+    # setting, by default) and how often RSS is checked, in seconds.
+    MEMORY_GOVERNOR_ENABLED = config('MEMORY_GOVERNOR_ENABLED', default=True, cast=bool)
+    MEMORY_WORKERS = config('MEMORY_WORKERS', default=config('WEB_CONCURRENCY', default=1, cast=int), cast=int)
+    MEMORY_HIGH_WATERMARK_MB = config('MEMORY_HIGH_WATERMARK_MB', default=0, cast=int)
+    MEMORY_LOW_WATERMARK_MB = config('MEMORY_LOW_WATERMARK_MB', default=0, cast=int)
+    MEMORY_CHECK_INTERVAL = config('MEMORY_CHECK_INTERVAL', default=1.0, cast=float)
+
+    # Engine for code running outside an app context (scripts, CLI tools), created
+    # on first use only for the config actually selected. Inside the app this is
+    # the Flask-SQLAlchemy engine, so the process keeps one pool.
+    _engine = None
+
+    @classmethod
+    def get_engine(cls):
+        from flask import has_app_context
+        if has_app_context():
+            from exts import db
+            return db.engine
+        if cls.__dict__.get('_engine') is None:
+            from sqlalchemy import create_engine
+            cls._engine = create_engine(cls.SQLALCHEMY_DATABASE_URI, echo=cls.SQLALCHEMY_ECHO,
+                                        **cls.SQLALCHEMY_ENGINE_OPTIONS)
+        return cls._engine
 
 class DevConfig(Config):
     SQLALCHEMY_DATABASE_URI = "sqlite:///" + os.path.join(BASE_DIR, 'database.db')
@@ -30,19 +132,15 @@ class SQLConfig(Config):
     @staticmethod
     def test_connection():
         try:
+            import pyodbc
             conn = pyodbc.connect(SQLConfig.conn_str)
             conn.close()
             return "Successfully connected to SQL Server."
         except Exception as e:
             return "Failed to connect to SQL Server."
 
-    engine = create_engine('mssql+pyodbc:///?odbc_connect={}'.format(conn_str))
     SQLALCHEMY_DATABASE_URI = 'mssql+pyodbc:///?odbc_connect={}'.format(conn_str)
-    SQLALCHEMY_ENGINE_OPTIONS = {
-        'pool_pre_ping': True
-    }
     DEBUG = True
-    SQLALCHEMY_ECHO = True
 
 
 
@@ -55,6 +153,7 @@ class PostgreConfig(Config):
     @staticmethod
     def test_connection():
         try:
+            import psycopg2
             conn = psycopg2.connect(PostgreConfig.conn_str)
             conn.close()
             return "Successfully connected to PostgreSQL."
@@ -63,10 +162,8 @@ class PostgreConfig(Config):
 
     # Use the connection string in SQLAlchemy configurations
     SQLALCHEMY_DATABASE_URI = conn_str
-    engine = create_engine(conn_str)
 
     DEBUG = True
-    SQLALCHEMY_ECHO = True
 
 
 
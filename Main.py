@@ -1,15 +1,30 @@
-from flask import Flask, make_response, jsonify
+from flask import Flask, make_response, jsonify, request
 from flask_restx import Api
 from flask_migrate import Migrate
 from flask_cors import CORS, cross_origin
 from flask_jwt_extended import JWTManager
 # from Operations.LogEvent import Log_ns
+# NOTE: the interface namespace defers torch/transformers to first use, and DB
+# drivers are only loaded by the engine of the config passed to create_app.
 from Operation.interface import interface_ns
+from Operation.search import search_ns
+from Operation.admin import admin_ns
 
 
 
 from exts import db
-import psycopg2
+from utils import metrics
+from utils.auth import admin_required
+from utils.db_pool import init_pool_metrics
+from utils.log_setup import init_logging
+from utils.tracing import tracer
+from utils.audit_log import audit_log
+from utils.memory_governor import memory_governor
+from utils.generation_memory import generation_memory
+from utils.model_routing import model_router
+from utils.model_swap import model_swapper
+from utils.text_search import init_search
+from Operation.engine.early_exit import early_exit
 import datetime
 
 
@@ -27,7 +42,17 @@ def create_app(config):
     # CORS(app, resources={r"/*": {"origins": "http://pmo.test.ur.gov.iq"}})
     # app.config.from_object(DevConfig)
     app.config.from_object(config)
+    init_logging(app)
+    tracer.init_app(app)
     db.init_app(app)
+    init_pool_metrics(app)
+    audit_log.init_app(app)
+    memory_governor.init_app(app)
+    generation_memory.init_app(app)
+    model_router.init_app(app)
+    model_swapper.init_app(app)
+    early_exit.init_app(app)
+    init_search(app)
     migrate = Migrate(app,db)
     JWTManager(app)
     api = Api(app, doc='/docs')
@@ -42,8 +67,24 @@ def create_app(config):
                     response = make_response(jsonify(message), status_code)
                     return response 
 
+    def render_metrics():
+        if request.args.get('format') == 'prometheus':
+            return make_response(metrics.render_prometheus(), 200, {'Content-Type': 'text/plain; version=0.0.4'})
+        return make_response(jsonify(metrics.snapshot()), 200)
+
+    # scrapers on METRICS_ALLOWED_IPS read the metrics without a token, anyone else must be an admin
+    metrics_allowed = {ip.strip() for ip in app.config.get('METRICS_ALLOWED_IPS', '').split(',') if ip.strip()}
+
+    @app.route('/api/metrics', methods=['GET'])
+    def get_metrics():
+        if request.remote_addr in metrics_allowed:
+            return render_metrics()
+        return admin_required(render_metrics)()
+
 
     api.add_namespace(interface_ns)
+    api.add_namespace(search_ns)
+    api.add_namespace(admin_ns)
   
     return app
 ##########################################################
\ No newline at end of file
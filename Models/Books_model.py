@@ -1,12 +1,19 @@
-from exts import db
+from exts import db, BigIntegerPK
+from Models.Bulk_mixin import BulkMixin
+from utils.pagination import keyset_paginate
 from datetime import datetime
 
 
 ############################################################################################################
 # الكتاب الاصلي
-class books(db.Model):
+class books(BulkMixin, db.Model):
+    __soft_delete__ = 'is_delete'
     # __table_args__ = {'extend_existing': True}
-    book_id = db.Column(db.BigInteger, primary_key=True)
+    __table_args__ = (
+        db.Index('ix_books_incoming_number', 'incoming_number'),
+        db.Index('ix_books_organization_date_book_id', 'organization_date', 'book_id'),
+    )
+    book_id = db.Column(BigIntegerPK, primary_key=True)
     incoming_number = db.Column(db.Integer(), nullable=False) # رقم الوارد
     outcoming_number = db.Column(db.Integer(), nullable=True) # رقم الصادر
     organization_date = db.Column(db.Date, nullable=True, default=lambda: datetime.utcnow().date())  # تاريخ التنظيم (date only)
@@ -43,9 +50,10 @@ class books(db.Model):
 
 ############################################################################################################
 # جدول المرفقات
-class attachments(db.Model):
+class attachments(BulkMixin, db.Model):
+    __soft_delete__ = 'is_delete'
     # __table_args__ = {'extend_existing': True}
-    attach_id = db.Column(db.BigInteger, primary_key=True)
+    attach_id = db.Column(BigIntegerPK, primary_key=True)
     book_id = db.Column(db.Integer(), nullable=False) # الكتاب الاصلي
     physical_path = db.Column(db.Text(), nullable=False) # نسخة من الكتاب بعد التوقيع
     attachments_text = db.Column(db.Text(), nullable=True) # المرفقات كنص
@@ -72,9 +80,17 @@ class attachments(db.Model):
 
 ############################################################################################################
 # جدول ارسال الكتب
-class transfer_book(db.Model):
+class transfer_book(BulkMixin, db.Model):
+    __soft_delete__ = 'is_delete'
     # __table_args__ = {'extend_existing': True}
-    trans_id = db.Column(db.BigInteger, primary_key=True)
+    # inbox / outbox listings filter on the org and page by trans_id (see inbox())
+    __table_args__ = (
+        db.Index('ix_transfer_book_recieve_trans', 'org_recieve_id', 'trans_id'),
+        db.Index('ix_transfer_book_recieve_seen_trans', 'org_recieve_id', 'is_seen', 'trans_id'),
+        db.Index('ix_transfer_book_send_trans', 'org_send_id', 'trans_id'),
+        db.Index('ix_transfer_book_book_id', 'book_id'),
+    )
+    trans_id = db.Column(BigIntegerPK, primary_key=True)
     book_id = db.Column(db.Integer(), nullable=False) # الكتاب الاصلي
     org_send_id = db.Column(db.Integer(), nullable=False) # الجهة المرسلة
     org_recieve_id = db.Column(db.Integer(), nullable=False) # الجهة المستلمة
@@ -97,4 +113,17 @@ class transfer_book(db.Model):
 
     def delete(self):
         db.session.delete(self)
-        db.session.commit()
\ No newline at end of file
+        db.session.commit()
+
+    @classmethod
+    def inbox(cls, org_recieve_id, cursor=None, limit=20, unseen_only=False):
+        # newest first, keyset-paginated on trans_id (flat cost at any depth)
+        query = cls.query.filter(cls.org_recieve_id == org_recieve_id, cls.is_delete.isnot(True))
+        if unseen_only:
+            query = query.filter(cls.is_seen == False)  # noqa: E712
+        return keyset_paginate(query, [cls.trans_id], cursor=cursor, limit=limit)
+
+    @classmethod
+    def outbox(cls, org_send_id, cursor=None, limit=20):
+        query = cls.query.filter(cls.org_send_id == org_send_id, cls.is_delete.isnot(True))
+        return keyset_paginate(query, [cls.trans_id], cursor=cursor, limit=limit)
\ No newline at end of file
@@ -0,0 +1,159 @@
+from exts import db
+from sqlalchemy import insert, update, select
+
+
+############################################################################################################
+# Class-level bulk operations shared by the models.
+#
+# save()/delete() on an instance commit one row at a time; these run executemany
+# statements in chunks of `chunk_size` rows and commit once at the end, so an import
+# of thousands of rows costs one transaction instead of thousands.
+#
+# Rows are dicts of column -> value (model instances are accepted too).
+class BulkMixin:
+    __soft_delete__ = None      # name of the "is deleted" flag column, if the table has one
+    BULK_CHUNK_SIZE = 1000
+
+    @classmethod
+    def _pk_names(cls):
+        return [c.name for c in cls.__table__.primary_key.columns]
+
+    @classmethod
+    def _as_row(cls, obj):
+        if isinstance(obj, dict):
+            return obj
+        # model instance: only the columns that were actually set, so server/python defaults still apply
+        return {c.key: getattr(obj, c.key) for c in cls.__table__.columns if getattr(obj, c.key) is not None}
+
+    @classmethod
+    def _chunks(cls, rows, chunk_size):
+        chunk_size = chunk_size or cls.BULK_CHUNK_SIZE
+        for i in range(0, len(rows), chunk_size):
+            chunk = rows[i:i + chunk_size]
+            # executemany needs the same keys in every row of a statement
+            groups = {}
+            for row in chunk:
+                groups.setdefault(tuple(sorted(row)), []).append(row)
+            for group in groups.values():
+                yield group
+
+    @classmethod
+    def _after_bulk(cls):
+        # hook for models that keep derived data in sync (see orgs)
+        pass
+
+    @classmethod
+    def _run(cls, work, commit):
+        try:
+            count = work()
+            if commit:
+                db.session.commit()
+                cls._after_bulk()
+            return count
+        except Exception:
+            db.session.rollback()
+            raise
+
+    @classmethod
+    def bulk_insert(cls, rows, chunk_size=None, commit=True):
+        """Insert all rows in one transaction. Returns the number of rows inserted."""
+        rows = [cls._as_row(r) for r in rows]
+
+        def work():
+            for group in cls._chunks(rows, chunk_size):
+                db.session.execute(insert(cls.__table__), group)
+            return len(rows)
+
+        return cls._run(work, commit)
+
+    @classmethod
+    def bulk_update(cls, rows, chunk_size=None, commit=True):
+        """Update rows matched by primary key (every row must carry the primary key)."""
+        rows = [cls._as_row(r) for r in rows]
+
+        def work():
+            for group in cls._chunks(rows, chunk_size):
+                db.session.execute(update(cls), group)
+            return len(rows)
+
+        return cls._run(work, commit)
+
+    @classmethod
+    def bulk_upsert(cls, rows, chunk_size=None, index_elements=None, commit=True):
+        """
+        Insert rows, updating the existing ones on conflict of `index_elements`
+        (the primary key by default). Uses INSERT .. ON CONFLICT on PostgreSQL and
+        SQLite; other backends split each chunk into a bulk UPDATE and a bulk INSERT.
+        """
+        rows = [cls._as_row(r) for r in rows]
+        keys = list(index_elements or cls._pk_names())
+        dialect = db.session.get_bind().dialect.name
+
+        def work():
+            for group in cls._chunks(rows, chunk_size):
+                if dialect in ("postgresql", "sqlite"):
+                    if dialect == "postgresql":
+                        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+                    else:
+                        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+                    stmt = dialect_insert(cls.__table__)
+                    set_ = {name: stmt.excluded[name] for name in group[0] if name not in keys}
+                    if set_:
+                        stmt = stmt.on_conflict_do_update(index_elements=keys, set_=set_)
+                    else:
+                        stmt = stmt.on_conflict_do_nothing(index_elements=keys)
+                    db.session.execute(stmt, group)
+                else:
+                    cls._upsert_generic(group, keys)
+            return len(rows)
+
+        return cls._run(work, commit)
+
+    @classmethod
+    def _upsert_generic(cls, group, keys):
+        key_cols = [cls.__table__.c[k] for k in keys]
+        wanted = {tuple(row.get(k) for k in keys) for row in group}
+        existing = set()
+        if len(keys) == 1:
+            existing = {(v,) for v in db.session.execute(
+                select(key_cols[0]).where(key_cols[0].in_([w[0] for w in wanted]))).scalars()}
+        else:
+            for key in wanted:
+                found = db.session.execute(
+                    select(*key_cols).where(*[c == v for c, v in zip(key_cols, key)])).first()
+                if found is not None:
+                    existing.add(key)
+
+        to_update = [r for r in group if tuple(r.get(k) for k in keys) in existing]
+        to_insert = [r for r in group if tuple(r.get(k) for k in keys) not in existing]
+        if to_update:
+            if keys == cls._pk_names():
+                db.session.execute(update(cls), to_update)
+            else:
+                for row in to_update:
+                    values = {k: v for k, v in row.items() if k not in keys}
+                    db.session.execute(update(cls.__table__)
+                                       .where(*[c == row[k] for c, k in zip(key_cols, keys)])
+                                       .values(**values))
+        if to_insert:
+            db.session.execute(insert(cls.__table__), to_insert)
+
+    @classmethod
+    def bulk_soft_delete(cls, ids, chunk_size=None, commit=True):
+        """Set the soft-delete flag on every primary key in `ids`. Returns the number of rows flagged."""
+        if not cls.__soft_delete__:
+            raise ValueError(f"{cls.__name__} has no soft-delete column")
+        ids = list(ids)
+        pk = cls.__table__.primary_key.columns.values()[0]
+        flag = cls.__table__.c[cls.__soft_delete__]
+        chunk_size = chunk_size or cls.BULK_CHUNK_SIZE
+
+        def work():
+            count = 0
+            for i in range(0, len(ids), chunk_size):
+                result = db.session.execute(
+                    update(cls.__table__).where(pk.in_(ids[i:i + chunk_size])).values({flag: True}))
+                count += result.rowcount
+            return count
+
+        return cls._run(work, commit)
@@ -1,7 +1,11 @@
-from exts import db
+from exts import db, BigIntegerPK
+from Models.Bulk_mixin import BulkMixin
 from datetime import datetime
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
 
-class orgs(db.Model):
+class orgs(BulkMixin, db.Model):
+    __soft_delete__ = 'isdelete'
     # __table_args__ = {'extend_existing': True}
     orgid = db.Column(db.Integer, primary_key=True)
     orgup = db.Column(db.Integer(), nullable=False)
@@ -26,6 +30,12 @@ class orgs(db.Model):
         db.session.delete(self)
         db.session.commit()
 
+    @classmethod
+    def _after_bulk(cls):
+        # bulk statements bypass the mapper events below, so rebuild the closure from orgup
+        from utils.org_hierarchy import rebuild_closure
+        rebuild_closure()
+
     # def update(self, OrgID, OrgUp, OrgLevel, OrgEnName, OrgArName, OrgKuName, OrgIsActive):
     #     self.OrgID = OrgID
     #     self.OrgUp = OrgUp
@@ -36,11 +46,97 @@ class orgs(db.Model):
     #     self.OrgIsActive = OrgIsActive
     #     db.session.commit()
 
+######################################################################################
+# Closure table of the orgs tree: one row per (ancestor, descendant) pair, including
+# (org, org) at depth 0. Kept in sync with orgs.orgup by the mapper events below so
+# ancestor/descendant lookups are a single indexed query instead of a recursive walk.
+# Read it through utils/org_hierarchy.py, which caches it in-process.
+class orgs_closure(BulkMixin, db.Model):
+    ancestor_id = db.Column(db.Integer, primary_key=True)
+    descendant_id = db.Column(db.Integer, primary_key=True, index=True)
+    depth = db.Column(db.Integer(), nullable=False)
+
+    def __repr__(self):
+
+        return f"<orgs_closure {self.ancestor_id}->{self.descendant_id}>"
+
+
+def _closure_link(connection, orgid, orgup):
+    # (orgid, orgid, 0) plus every ancestor of the parent, one level further away
+    connection.execute(text(
+        "INSERT INTO orgs_closure (ancestor_id, descendant_id, depth) VALUES (:org, :org, 0)"
+    ), {"org": orgid})
+    if orgup is not None and orgup != orgid:
+        connection.execute(text(
+            "INSERT INTO orgs_closure (ancestor_id, descendant_id, depth) "
+            "SELECT ancestor_id, :org, depth + 1 FROM orgs_closure WHERE descendant_id = :up"
+        ), {"org": orgid, "up": orgup})
+
+
+def _closure_move(connection, orgid, new_orgup):
+    # detach the subtree of orgid from its old ancestors ...
+    connection.execute(text(
+        "DELETE FROM orgs_closure "
+        "WHERE descendant_id IN (SELECT descendant_id FROM orgs_closure WHERE ancestor_id = :org) "
+        "AND ancestor_id NOT IN (SELECT descendant_id FROM orgs_closure WHERE ancestor_id = :org)"
+    ), {"org": orgid})
+    # ... and attach it under every ancestor of the new parent
+    if new_orgup is not None and new_orgup != orgid:
+        connection.execute(text(
+            "INSERT INTO orgs_closure (ancestor_id, descendant_id, depth) "
+            "SELECT sup.ancestor_id, sub.descendant_id, sup.depth + sub.depth + 1 "
+            "FROM orgs_closure sup CROSS JOIN orgs_closure sub "
+            "WHERE sup.descendant_id = :up AND sub.ancestor_id = :org"
+        ), {"org": orgid, "up": new_orgup})
+
+
+def _mark_hierarchy_dirty():
+    db.session.info["orgs_hierarchy_dirty"] = True
+
+
+@event.listens_for(orgs, "after_insert")
+def _orgs_after_insert(mapper, connection, target):
+    _closure_link(connection, target.orgid, target.orgup)
+    _mark_hierarchy_dirty()
+
+
+@event.listens_for(orgs, "after_update")
+def _orgs_after_update(mapper, connection, target):
+    history = db.inspect(target).attrs.orgup.history
+    if history.has_changes():
+        _closure_move(connection, target.orgid, target.orgup)
+        _mark_hierarchy_dirty()
+
+
+@event.listens_for(orgs, "after_delete")
+def _orgs_after_delete(mapper, connection, target):
+    # children keep their orgup but are cut off from the deleted org's ancestors
+    _closure_move(connection, target.orgid, None)
+    connection.execute(text(
+        "DELETE FROM orgs_closure WHERE ancestor_id = :org OR descendant_id = :org"
+    ), {"org": target.orgid})
+    _mark_hierarchy_dirty()
+
+
+@event.listens_for(Session, "after_commit")
+def _orgs_after_commit(session):
+    # drop the cached tree only once the change is visible to other sessions
+    if session.info.pop("orgs_hierarchy_dirty", False):
+        from utils.org_hierarchy import invalidate
+        invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _orgs_after_rollback(session):
+    session.info.pop("orgs_hierarchy_dirty", None)
+
+
+
 ######################################################################################
 # Database Models
 # LogActions model
-class logactions(db.Model):
-    logid = db.Column(db.BigInteger, primary_key=True)
+class logactions(BulkMixin, db.Model):
+    logid = db.Column(BigIntegerPK, primary_key=True)
     usid = db.Column(db.Integer(), nullable=True) 
     orgid = db.Column(db.Integer(), nullable=True) 
     methodname = db.Column(db.Unicode(255), nullable=True)
@@ -64,8 +160,8 @@ class logactions(db.Model):
 
 
 #######################################################################################
-class qr_codedata(db.Model):
-    id = db.Column(db.BigInteger, primary_key=True)
+class qr_codedata(BulkMixin, db.Model):
+    id = db.Column(BigIntegerPK, primary_key=True)
     q_code_id = db.Column(db.Text(), nullable=True)
     qr_code_json = db.Column(db.Text(), nullable=False, default='')
     time_stamp = db.Column(db.DateTime, nullable=False)
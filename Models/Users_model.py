@@ -1,8 +1,10 @@
-from exts import db
+from exts import db, BigIntegerPK
+from Models.Bulk_mixin import BulkMixin
 import datetime
 
-class usertable(db.Model):
-    usid = db.Column(db.BigInteger, primary_key=True)
+class usertable(BulkMixin, db.Model):
+    __soft_delete__ = 'usisdelete'
+    usid = db.Column(BigIntegerPK, primary_key=True)
     usfirstname = db.Column(db.Unicode(25), nullable=True)
     ussecondname = db.Column(db.Unicode(25), nullable=True)
     usthirdname = db.Column(db.Unicode(25), nullable=True)
@@ -61,7 +63,8 @@ class usertable(db.Model):
 # Database Models
 # Role model
 
-class role(db.Model):
+class role(BulkMixin, db.Model):
+    __soft_delete__ = 'isdelete'
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.Text(), nullable=False)
     description = db.Column(db.Text(), nullable=False)
@@ -91,7 +94,8 @@ class role(db.Model):
 # Database Models
 # Role-User model
 
-class roleuser(db.Model):
+class roleuser(BulkMixin, db.Model):
+    __soft_delete__ = 'isdelete'
     id = db.Column(db.Integer, primary_key=True)
     userid = db.Column(db.BigInteger(), nullable=False)
     roleid = db.Column(db.BigInteger(), nullable=False)
@@ -122,7 +126,7 @@ class roleuser(db.Model):
 # Database Models
 # Privileges model
 
-class privileges(db.Model):
+class privileges(BulkMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.Text(), nullable=False)
     description = db.Column(db.Text(), nullable=False)
@@ -150,7 +154,7 @@ class privileges(db.Model):
 # Database Models
 # Role-Privilege model
 
-class roleprivilege(db.Model):
+class roleprivilege(BulkMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
     roleid = db.Column(db.BigInteger(), nullable=False)
     privilegeid = db.Column(db.BigInteger(), nullable=False)
@@ -175,7 +179,7 @@ class roleprivilege(db.Model):
 
 
 ######################################################################################
-class accesstoken(db.Model):
+class accesstoken(BulkMixin, db.Model):
     # id = db.Column(db.Integer, primary_key=True)
     id = db.Column(db.Integer, primary_key=True)
     userid = db.Column(db.Integer, nullable=False)
@@ -0,0 +1,120 @@
+from flask import request, jsonify, make_response, current_app
+from flask_restx import Resource, Namespace
+import logging
+import os
+
+from utils.auth import admin_required
+from utils.model_registry import resident_models
+from utils.model_routing import model_router
+from utils.model_swap import SwapError, model_swapper
+from utils.profiler import ProfilerBusy, collapsed, sample_stacks, torch_capture
+
+admin_ns = Namespace("/api/admin", description="Admin-only operational endpoints")
+admin_ns.logger = logging.getLogger("admin_ns")
+
+
+# -------------------- Sampling Profiler Route --------------------
+@admin_ns.route('/profile')
+class Profile(Resource):
+    @admin_required
+    def get(self):
+        """
+        Sample every worker thread of this process for `seconds` and return the
+        collapsed stacks (`format=collapsed` for a flamegraph-ready text file).
+        With `torch=1` the next generate call in this process is also run under
+        torch.profiler and its operator breakdown is included.
+        """
+        try:
+            try:
+                seconds = float(request.args.get("seconds", 10))
+                interval_ms = float(request.args.get("interval_ms", current_app.config.get("PROFILER_INTERVAL_MS", 10)))
+            except ValueError:
+                return make_response(jsonify({"error": "seconds and interval_ms must be numbers"}), 400)
+            max_seconds = current_app.config.get("PROFILER_MAX_SECONDS", 60)
+            if not 0 < seconds <= max_seconds:
+                return make_response(jsonify({"error": f"seconds must be between 0 and {max_seconds}"}), 400)
+            interval = max(1.0, interval_ms) / 1000
+            include_idle = request.args.get("idle") == "1"
+            with_torch = request.args.get("torch") == "1"
+
+            try:
+                stacks, ticks, torch_result = sample_stacks(seconds, interval, include_idle=include_idle,
+                                                            capture=torch_capture if with_torch else None)
+            except ProfilerBusy:
+                return make_response(jsonify({"error": "a profile is already running"}), 409)
+
+            if request.args.get("format") == "collapsed":
+                return make_response(collapsed(stacks), 200, {
+                    "Content-Type": "text/plain; charset=utf-8",
+                    "Content-Disposition": "attachment; filename=profile.collapsed",
+                })
+            return jsonify({
+                "seconds": seconds,
+                "interval_ms": interval * 1000,
+                "ticks": ticks,
+                "samples": sum(stacks.values()),
+                "collapsed": collapsed(stacks),
+                "torch": torch_result,
+            })
+
+        except Exception as e:
+            admin_ns.logger.exception(f"Exception in /admin/profile: {e}")
+            return make_response(jsonify({"error": "خطأ في تشغيل المحلل"}), 500)
+
+
+# -------------------- Models: routing, resident models and hot swap --------------------
+@admin_ns.route('/models')
+class Models(Resource):
+    @admin_required
+    def get(self):
+        try:
+            return jsonify({
+                "routing": model_router.describe(),
+                "resident": resident_models.resident(),
+                "swaps": model_swapper.jobs(),
+            })
+        except Exception as e:
+            admin_ns.logger.exception(f"Exception in /admin/models: {e}")
+            return make_response(jsonify({"error": "خطأ في قراءة حالة النماذج"}), 500)
+
+
+@admin_ns.route('/models/swap')
+class ModelSwap(Resource):
+    @admin_required
+    def post(self):
+        """
+        Load a new version of a routed model in the background and switch to it once it
+        is warm: {"model": "flan_t5_base", "path": "flan_t5_base@bf16", "backend"?, "dtype"?, "warmup"?}.
+        `path` is relative to MODELS_ROOT. Returns 202 with the job; poll /models/swap/<id>.
+        """
+        try:
+            data = request.get_json(silent=True)
+            if not isinstance(data, dict) or not isinstance(data.get("model"), str) or not isinstance(data.get("path"), str):
+                return make_response(jsonify({"error": "model and path are required"}), 400)
+
+            models_root = os.path.realpath(current_app.config.get("MODELS_ROOT", ""))
+            path = os.path.realpath(os.path.join(models_root, data["path"]))
+            if os.path.dirname(path) != models_root:
+                return make_response(jsonify({"error": "path must be a directory directly under MODELS_ROOT"}), 400)
+
+            try:
+                job = model_swapper.start(data["model"], path, backend=data.get("backend"),
+                                          dtype=data.get("dtype"), warmup=data.get("warmup", True) is not False)
+            except SwapError as e:
+                return make_response(jsonify({"error": str(e)}), e.status)
+            admin_ns.logger.info(f"Swap {job.id} started: {job.model} -> {path}")
+            return make_response(jsonify(job.to_dict()), 202)
+
+        except Exception as e:
+            admin_ns.logger.exception(f"Exception in /admin/models/swap: {e}")
+            return make_response(jsonify({"error": "خطأ في تبديل النموذج"}), 500)
+
+
+@admin_ns.route('/models/swap/<string:job_id>')
+class ModelSwapStatus(Resource):
+    @admin_required
+    def get(self, job_id):
+        job = model_swapper.job(job_id)
+        if job is None:
+            return make_response(jsonify({"error": "no such swap job"}), 404)
+        return jsonify(job)
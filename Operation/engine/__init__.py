@@ -0,0 +1,16 @@
+"""
+Inference engine: one code path for every text endpoint.
+
+* tasks.py       grammar, paraphrase, aiBypass and coedit: prompts, labels, schemas;
+* backends.py    how a model directory is loaded (torch eager, torch int8, ONNX Runtime);
+* pipeline.py    cache, language split, routing, resident models, batched generate;
+* early_exit.py  skips generate for input the model would return unchanged;
+* rerank.py      picks among several candidates for the tasks that must reword;
+* chunking.py    cuts inputs to the model window, groups a batch by length.
+
+The endpoints live in Operation/interface.py, and which model serves which request
+is set in Config/model_routing.json.
+"""
+from Operation.engine.pipeline import (generate_batch, generate_candidates, infer, infer_batch, infer_with,
+                                       run_task)
+from Operation.engine.tasks import TASKS, Task
@@ -0,0 +1,70 @@
+"""
+Model backends: how a routed model directory becomes (tokenizer, model).
+
+A backend is a loader `(path, dtype) -> (tok, mdl)` where `mdl` has a
+transformers-style `generate()`. They are registered with the model router under
+the names used by the `backend` field of Config/model_routing.json:
+
+* `seq2seq`, `bart`, `mt5`, `t5`: torch eager, weights loaded in `dtype`;
+* `<arch>-int8` (e.g. `t5-int8`): the same model with its Linear layers dynamically
+  quantized to int8 (`torch.ao.quantization.quantize_dynamic`). CPU only; the
+  weights take about a quarter of the memory and the matmuls run faster, at a
+  small quality cost. The model is loaded in float32 first whatever `dtype` says;
+* `onnx`: an encoder/decoder exported with `optimum-cli export onnx`, run by ONNX
+  Runtime through `optimum.onnxruntime.ORTModelForSeq2SeqLM`. The precision is
+  fixed by the export, so `dtype` is ignored.
+
+torch, transformers and optimum are imported only when a loader runs.
+"""
+ARCHITECTURES = {
+    "seq2seq": ("AutoTokenizer", "AutoModelForSeq2SeqLM"),
+    "bart": ("BartTokenizer", "BartForConditionalGeneration"),
+    "mt5": ("MT5Tokenizer", "MT5ForConditionalGeneration"),
+    "t5": ("AutoTokenizer", "T5ForConditionalGeneration"),
+}
+
+
+def _classes(arch):
+    import transformers
+    tokenizer_name, model_name = ARCHITECTURES[arch]
+    return getattr(transformers, tokenizer_name), getattr(transformers, model_name)
+
+
+def torch_eager(arch):
+    def load(path, dtype):
+        import torch
+        tokenizer_cls, model_cls = _classes(arch)
+        tok = tokenizer_cls.from_pretrained(path)
+        mdl = model_cls.from_pretrained(path, torch_dtype=getattr(torch, dtype), device_map={"": "cpu"})
+        mdl.eval()
+        return tok, mdl
+    return load
+
+
+def torch_int8(arch):
+    eager = torch_eager(arch)
+
+    def load(path, dtype):
+        import torch
+        tok, mdl = eager(path, "float32")
+        mdl = torch.ao.quantization.quantize_dynamic(mdl, {torch.nn.Linear}, dtype=torch.qint8)
+        mdl.eval()
+        return tok, mdl
+    return load
+
+
+def onnx_runtime(path, dtype):
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM
+    from transformers import AutoTokenizer
+    return AutoTokenizer.from_pretrained(path), ORTModelForSeq2SeqLM.from_pretrained(path)
+
+
+BACKENDS = {"onnx": onnx_runtime}
+for _arch in ARCHITECTURES:
+    BACKENDS[_arch] = torch_eager(_arch)
+    BACKENDS[f"{_arch}-int8"] = torch_int8(_arch)
+
+
+def register_backends(router):
+    for name, loader in BACKENDS.items():
+        router.register_backend(name, loader)
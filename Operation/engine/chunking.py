@@ -0,0 +1,95 @@
+"""
+Fitting inputs to the model window, and grouping them by length.
+
+Prompts are tokenized with truncation at MAX_INPUT_TOKENS, so text past the
+window would be lost. `chunk()` splits every input whose tokens do not fit
+next to the prompt template into pieces that do. It cuts at sentence ends
+(utils/lang_detect.split_sentences) and packs consecutive sentences up to the
+budget. A single sentence longer than the budget is cut between words. The
+pieces are corrected as separate inputs of the same batch, and `unchunk()` puts
+the outputs back together with the original whitespace between them.
+
+`length_buckets()` orders a batch by token length and cuts it where lengths more
+than double. Each bucket is padded only to its own longest input, and the memory
+plan's sub-batches (utils/generation_memory.py) are cut from rows of similar
+length. Short inputs batched with a long document therefore stop paying for its
+padding in every encoder layer and every cross-attention step.
+"""
+import math
+import re
+
+from utils.lang_detect import split_sentences
+
+MAX_INPUT_TOKENS = 256
+# a bucket holds inputs up to this many times the length of its shortest one
+BUCKET_RATIO = 2.0
+
+_WORD_RE = re.compile(r'\S+\s*')
+
+
+def _pack(units, counts, budget):
+    pieces, current, used = [], "", 0
+    for unit, count in zip(units, counts):
+        if current and used + count > budget:
+            pieces.append(current)
+            current, used = "", 0
+        current += unit
+        used += count
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def _split_long(sentence, count, budget):
+    words = _WORD_RE.findall(sentence)
+    parts = min(len(words), math.ceil(count / budget))
+    size = math.ceil(len(words) / parts)
+    return ["".join(words[i:i + size]) for i in range(0, len(words), size)]
+
+
+def chunk(tok, texts, budget):
+    """
+    Returns (pieces, layout): the texts to run, and per input text the list of
+    (piece index, whitespace that followed the piece). Calls the tokenizer: hold
+    the model's tokenizer lock.
+    """
+    pieces, layout = [], []
+    lengths = [len(ids) for ids in tok(texts, add_special_tokens=False).input_ids]
+    for text, length in zip(texts, lengths):
+        if length <= budget:
+            layout.append([(len(pieces), "")])
+            pieces.append(text)
+            continue
+        sentences = split_sentences(text)
+        counts = [len(ids) for ids in tok(sentences, add_special_tokens=False).input_ids]
+        units, unit_counts = [], []
+        for sentence, count in zip(sentences, counts):
+            if count > budget:
+                parts = _split_long(sentence, count, budget)
+                units.extend(parts)
+                unit_counts.extend(math.ceil(count / len(parts)) for _ in parts)
+            else:
+                units.append(sentence)
+                unit_counts.append(count)
+        entry = []
+        for piece in _pack(units, unit_counts, budget):
+            stripped = piece.rstrip()
+            entry.append((len(pieces), piece[len(stripped):]))
+            pieces.append(stripped)
+        layout.append(entry)
+    return pieces, layout
+
+
+def unchunk(layout, outputs):
+    return ["".join(outputs[i] + gap for i, gap in entry).strip() for entry in layout]
+
+
+def length_buckets(lengths):
+    """Row indexes grouped by length, shortest first; no bucket spans more than BUCKET_RATIO."""
+    buckets = []
+    for i in sorted(range(len(lengths)), key=lengths.__getitem__):
+        if buckets and lengths[i] <= max(1, lengths[buckets[-1][0]]) * BUCKET_RATIO:
+            buckets[-1].append(i)
+        else:
+            buckets.append([i])
+    return buckets
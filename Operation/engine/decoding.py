@@ -0,0 +1,74 @@
+"""
+Copy-biased decoding for correction tasks.
+
+A corrected sentence is mostly a copy of its input, but beam search weighs the
+whole vocabulary at every step. With a `copy_bias` object in a routing profile
+(Config/model_routing.json), generate() gets a logits processor built from the
+input ids of each row:
+
+    "copy_bias": {"bias": 5.0}                   add 5.0 to the logits of the row's
+                                                 own tokens and the edit vocabulary
+    "copy_bias": {"constrain": true}             allow only those tokens
+
+The edit vocabulary is the small set of tokens that corrections insert:
+punctuation, articles, auxiliaries and prepositions for English; punctuation,
+hamza / ta marbuta / alif maqsura forms and particles for Arabic. EOS is always
+allowed. With the output space this narrow, greedy decoding (num_beams 1) is
+usually as good as 6 beams: see Tool/bench_copy_decoding.py.
+
+torch is imported only when a processor is built.
+"""
+from utils.lang_detect import AR, EN
+
+EDIT_VOCABULARY = {
+    EN: (
+        ". , ; : ! ? ' \" - ( ) a an the is are was were be been has have had do does did "
+        "will would can could should to of in on at for with by from and or but not that which who "
+        "it its it's they their there them he she his her we our you your I me my this these those"
+    ).split(),
+    AR: (
+        ". ، ؛ : ! ؟ \" - ( ) ة ه أ إ آ ا ى ي ء ئ ؤ و "
+        "في من على إلى عن أن إن لا ما قد هذا هذه ذلك التي الذي الذين"
+    ).split(),
+}
+
+
+def _token_ids(tok, texts):
+    ids = set()
+    # BPE vocabularies (BART) encode a word differently at the start of the text
+    for variant in (texts, [" " + t for t in texts]):
+        for row in tok(variant, add_special_tokens=False).input_ids:
+            ids.update(row)
+    return ids
+
+
+class CopyBiasLogitsProcessor:
+    def __init__(self, allowed, bias=5.0, constrain=False):
+        self.allowed = allowed          # bool [batch, vocab]: the row's tokens + edit vocabulary
+        self.bias = bias
+        self.constrain = constrain
+        self._expanded = None
+
+    def __call__(self, input_ids, scores):
+        mask = self._expanded
+        if mask is None or mask.shape[0] != scores.shape[0]:
+            # generate() flattens beams into the batch: rows are [b0 beams..., b1 beams..., ...]
+            mask = self.allowed[:, :scores.shape[-1]].repeat_interleave(scores.shape[0] // self.allowed.shape[0], dim=0)
+            mask = mask.to(scores.device)
+            self._expanded = mask
+        if self.constrain:
+            return scores.masked_fill(~mask, float("-inf"))
+        return scores + mask.to(scores.dtype) * self.bias
+
+
+def copy_bias_processor(tok, lang, sources, vocab_size, bias=5.0, constrain=False):
+    """A logits processor for one batch, `sources` being the texts to correct, in batch order."""
+    import torch
+
+    common = _token_ids(tok, EDIT_VOCABULARY.get(lang, EDIT_VOCABULARY[EN]))
+    common.update(i for i in (tok.eos_token_id, tok.pad_token_id) if i is not None)
+    allowed = torch.zeros((len(sources), vocab_size), dtype=torch.bool)
+    for row, text in enumerate(sources):
+        ids = [i for i in _token_ids(tok, [text]) | common if i < vocab_size]
+        allowed[row, ids] = True
+    return CopyBiasLogitsProcessor(allowed, bias=bias, constrain=constrain)
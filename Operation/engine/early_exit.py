@@ -0,0 +1,99 @@
+"""
+Early exit for input that needs no correction.
+
+Much of the grammar traffic is already correct, and a 6-beam decode of up to 96
+tokens is spent on rewriting it to itself. Before decoding, the engine scores
+each input with one teacher-forced forward pass of the model it already holds:
+the prompt goes to the encoder and the input text itself is the decoder target.
+The confidence of an input is the smallest probability the model gives to any of
+its tokens, or 0 when some token is not the model's top choice. At or above
+`EARLY_EXIT_THRESHOLD` (>= 0.5), greedy decoding would reproduce the input token
+for token, so the input is returned as is. The response is then the same as a
+decode that changed nothing (`already_correct: true` in /grammar_check).
+
+The forward pass runs over the whole target in parallel, so it costs about one
+decoding step per beam instead of up to max_new_tokens steps.
+
+Only the styles a task lists in `early_exit_styles` are checked: a style that
+asks for a rewrite (academic, formal, ...) must run even on correct input.
+
+What the skip costs in quality is measured, not assumed. A share
+(`EARLY_EXIT_AUDIT_RATE`) of the skipped inputs is decoded anyway, and the
+response uses that decode. `early_exit_audit_total{outcome="missed"}` counts the
+audited skips where the full decode changed the text. missed / audited estimates
+the share of skipped inputs that would have been corrected.
+
+Metrics, per task and model: early_exit_checked_total, early_exit_skipped_total
+(skip rate = skipped / checked), early_exit_audit_total{outcome=agreed|missed}.
+"""
+import logging
+import random
+
+from utils import metrics
+from utils.tracing import tracer
+
+from Operation.engine.chunking import MAX_INPUT_TOKENS
+
+logger = logging.getLogger("engine")
+
+
+def copy_confidence(model, prompts, texts):
+    """Per input, the smallest probability of the input's own tokens as the output (0 if not greedy)."""
+    import torch
+
+    tok, mdl = model.tok, model.mdl
+    with model.tokenizer_lock:
+        enc = tok(prompts, return_tensors="pt", padding=True, truncation=True, max_length=MAX_INPUT_TOKENS)
+        labels = tok(text_target=texts, return_tensors="pt", padding=True, truncation=True,
+                     max_length=MAX_INPUT_TOKENS).input_ids
+    mask = labels != tok.pad_token_id
+    labels = labels.masked_fill(~mask, -100)   # ignored by the loss and the decoder input shift
+
+    with torch.no_grad():
+        logits = mdl(input_ids=enc.input_ids, attention_mask=enc.attention_mask, labels=labels).logits
+    target = labels.clamp(min=0).unsqueeze(-1)
+    probs = logits.float().log_softmax(-1).gather(-1, target).squeeze(-1).exp()
+    greedy = logits.argmax(-1) == target.squeeze(-1)
+    probs = probs.masked_fill(~greedy, 0.0).masked_fill(~mask, 1.0)
+    return probs.min(dim=-1).values.tolist()
+
+
+def same_text(a, b):
+    return " ".join(a.split()) == " ".join(b.split())
+
+
+class EarlyExit:
+    def __init__(self):
+        self.enabled = False
+        self.threshold = 0.9
+        self.audit_rate = 0.0
+
+    def init_app(self, app):
+        self.enabled = app.config.get("EARLY_EXIT_ENABLED", True)
+        self.threshold = app.config.get("EARLY_EXIT_THRESHOLD", 0.9)
+        self.audit_rate = app.config.get("EARLY_EXIT_AUDIT_RATE", 0.02)
+
+    def applies(self, task, style):
+        return self.enabled and style in task.early_exit_styles
+
+    def check(self, task, lang, route, model, texts, prompts):
+        """Returns (skipped, audited): indexes to answer with their input, and those of them still decoded."""
+        with tracer.span("early_exit", task=task.name, lang=lang, model=route.model,
+                         batch_size=len(texts)) as span:
+            confidence = copy_confidence(model, prompts, texts)
+            skipped = {i for i, c in enumerate(confidence) if c >= self.threshold}
+            span.set_attribute("skipped", len(skipped))
+        audited = {i for i in skipped if random.random() < self.audit_rate}
+        metrics.inc("early_exit_checked_total", len(texts), task=task.name, model=route.model)
+        metrics.inc("early_exit_skipped_total", len(skipped), task=task.name, model=route.model)
+        return skipped, audited
+
+    def audit(self, task, route, text, output):
+        outcome = "agreed" if same_text(text, output) else "missed"
+        metrics.inc("early_exit_audit_total", task=task.name, model=route.model, outcome=outcome)
+        if outcome == "missed":
+            logger.info("early exit missed a correction", extra={"task": task.name, "model": route.model,
+                                                                 "chars": len(text)})
+
+
+early_exit = EarlyExit()
@@ -0,0 +1,205 @@
+"""
+The shared inference path for every task (Operation/engine/tasks.py).
+
+    run_task(task, text, style)
+      result cache (per task, keyed on the exact text up to whitespace)
+      -> infer(): split into Arabic / English spans (split_languages tasks) or detect
+         the majority script of the whole text
+      -> infer_batch(): one batched generate per language. model_router.use() picks
+         the model and the generate() profile for (task, lang, style, tier), where the
+         tier follows the length of the whole request, and borrows the resident model.
+         Inputs longer than the model window are cut into pieces at sentence ends
+         (Operation/engine/chunking.py) and put back together after generate.
+         Profiles with num_return_sequences > 1 give several candidates per input,
+         reranked by similarity to the input (Operation/engine/rerank.py)
+      -> early exit: inputs the model would copy unchanged skip generate
+         (Operation/engine/early_exit.py)
+      -> generate_batch(): tokenize / generate / decode, traced, profiled on demand
+         and logged with token counts. Inputs of similar length share a generate
+         call, padded only to their own longest. Profiles with "copy_bias" decode with a
+         processor favouring the input's own tokens (Operation/engine/decoding.py).
+         Sub-batch size and beams are fitted to the memory budget
+         (utils/generation_memory.py)
+      -> the similarity retry, for single-candidate profiles whose output copied
+         its input
+
+Anything added here (caching, batching, metrics) applies to all endpoints at once.
+"""
+import logging
+import time
+
+from utils import metrics
+from utils.lang_detect import detect_language, join_spans, split_spans
+from utils.generation_memory import generation_memory
+from utils.model_routing import model_router
+from utils.profiler import torch_capture
+from utils.tracing import tracer
+
+from Operation.engine import chunking
+from Operation.engine.backends import register_backends
+from Operation.engine.decoding import copy_bias_processor
+from Operation.engine import rerank
+from Operation.engine.early_exit import early_exit
+from Operation.engine.tasks import TASKS, too_similar
+
+logger = logging.getLogger("engine")
+
+register_backends(model_router)
+# results of a swapped-out model must not outlive it
+for _task in TASKS.values():
+    if _task.cache is not None:
+        model_router.add_listener(_task.cache.clear)
+
+
+def run_task(task, text, style=None):
+    text = (text or "").strip()
+    style = (style or task.default_style).strip().lower()
+    metrics.inc("engine_requests_total", task=task.name)
+    if task.cache is None:
+        return infer(task, text, style)
+
+    with tracer.span("cache.lookup", cache=task.name) as span:
+        key = task.cache.key(task.name, style, text)
+        result = task.cache.get(key)
+        span.set_attribute("cache.hit", result is not None)
+    if result is None:
+        result = infer(task, text, style)
+        task.cache.put(key, result)
+    return result
+
+
+def infer(task, text, style):
+    if not task.split_languages:
+        return infer_batch(task, detect_language(text), [text], style, chars=len(text))[0] or text
+
+    # split into Arabic / English spans, run all spans of one language in a single
+    # batched generate call on that language's model, and reassemble in order
+    with tracer.span("split_spans", chars=len(text)) as trace_span:
+        spans = split_spans(text)
+        trace_span.set_attribute("spans", len(spans))
+    by_lang = {}
+    for i, span in enumerate(spans):
+        if span.text:
+            by_lang.setdefault(span.lang, []).append(i)
+
+    outputs = [span.text for span in spans]
+    for lang, idxs in by_lang.items():
+        results = infer_batch(task, lang, [spans[i].text for i in idxs], style, chars=len(text))
+        for i, out in zip(idxs, results):
+            outputs[i] = out or spans[i].text
+    return join_spans(spans, outputs).strip()
+
+
+def infer_batch(task, lang, texts, style, chars):
+    # models stay resident between requests; the memory governor evicts idle ones under pressure
+    with model_router.use(task.name, lang, style, chars) as (route, model):
+        return infer_with(task, lang, route, model, texts, style)
+
+
+def infer_with(task, lang, route, model, texts, style):
+    """One output per text on an already borrowed model (infer_batch, benchmarks)."""
+    with model.tokenizer_lock:
+        overhead = len(model.tok(task.prompt(lang, style, "")).input_ids)
+        texts, layout = chunking.chunk(model.tok, texts, max(16, chunking.MAX_INPUT_TOKENS - overhead))
+    if len(texts) > len(layout):
+        metrics.inc("engine_chunks_total", len(texts) - len(layout), task=task.name)
+
+    prompts = [task.prompt(lang, style, t) for t in texts]
+    outputs = list(texts)
+    todo, audited = range(len(texts)), ()
+    if early_exit.applies(task, style):
+        skipped, audited = early_exit.check(task, lang, route, model, texts, prompts)
+        todo = [i for i in todo if i not in skipped or i in audited]
+    if todo:
+        sources = [texts[i] for i in todo]
+        candidates = generate_candidates(task, lang, route, model, [prompts[i] for i in todo],
+                                         route.generate_kwargs(), sources=sources)
+        if task.retry_similarity is not None and any(len(c) > 1 for c in candidates):
+            decoded = rerank.pick(task, sources, candidates)
+        else:
+            decoded = [c[0] for c in candidates]
+        for i, out in zip(todo, decoded):
+            outputs[i] = out or texts[i]
+            if i in audited:
+                early_exit.audit(task, route, texts[i], out)
+
+    # profiles that return a single candidate fall back to a second decode
+    if task.retry_similarity is not None and route.generate_kwargs().get("num_return_sequences", 1) == 1:
+        retry = [i for i in todo if too_similar(texts[i], outputs[i], task.retry_similarity)]
+        if retry:
+            metrics.inc("engine_retries_total", len(retry), task=task.name)
+            again = generate_batch(task, lang, route, model, [prompts[i] for i in retry],
+                                   route.generate_kwargs(retry=True), sources=[texts[i] for i in retry])
+            for i, out in zip(retry, again):
+                outputs[i] = out or texts[i]
+    return chunking.unchunk(layout, outputs)
+
+
+def _sentinel_ids(tok):
+    # Block T5 “sentinel” tokens like <extra_id_0>, <extra_id_1>, …
+    sentinel_ids = []
+    for i in range(100):  # mT5 supports many sentinel tokens; 100 is safe
+        tok_id = tok.convert_tokens_to_ids(f"<extra_id_{i}>")
+        if tok_id is not None and tok_id != tok.unk_token_id:
+            sentinel_ids.append([tok_id])
+    return sentinel_ids
+
+
+def generate_batch(task, lang, route, model, prompts, gen_kwargs, sources=None):
+    """One output per prompt: the first (best-scored) candidate."""
+    return [c[0] for c in generate_candidates(task, lang, route, model, prompts, gen_kwargs, sources)]
+
+
+def generate_candidates(task, lang, route, model, prompts, gen_kwargs, sources=None):
+    """Per prompt, the list of its `num_return_sequences` outputs."""
+    import torch
+
+    tok, mdl = model.tok, model.mdl
+    sources = sources or prompts
+    if gen_kwargs.pop("block_sentinel_tokens", False):
+        gen_kwargs["bad_words_ids"] = _sentinel_ids(tok)   # <-- forbid <extra_id_*>
+    copy_bias = gen_kwargs.pop("copy_bias", None)
+
+    with tracer.span("tokenize", task=task.name, lang=lang, batch_size=len(prompts)) as span, model.tokenizer_lock:
+        enc = tok(prompts, return_tensors="pt", padding=True, truncation=True, max_length=chunking.MAX_INPUT_TOKENS)
+        lengths = enc.attention_mask.sum(dim=1).tolist()
+        tokens_in = sum(lengths)
+        span.set_attribute("tokens_in", tokens_in)
+
+    # one generate per length bucket, padded to the bucket's longest input; within a
+    # bucket, sub-batches and beams are fitted to the memory budget (utils/generation_memory.py)
+    outputs = [None] * len(prompts)
+    tokens_out = 0
+    started = time.perf_counter()
+    for bucket in chunking.length_buckets(lengths):
+        width = max(lengths[i] for i in bucket)
+        columns = slice(-width, None) if tok.padding_side == "left" else slice(0, width)
+        with generation_memory.reserve(route.model, mdl, len(bucket), width, gen_kwargs) as plan, \
+                tracer.span("generate", task=task.name, lang=lang, model=route.model, tokens=width,
+                            num_beams=plan.gen_kwargs.get("num_beams", 1), batch_size=plan.batch_size) as span:
+            for start in range(0, len(bucket), plan.batch_size):
+                rows = bucket[start:start + plan.batch_size]
+                index = torch.tensor(rows)
+                kwargs = dict(plan.gen_kwargs)
+                if copy_bias:
+                    from transformers import LogitsProcessorList
+                    with model.tokenizer_lock:
+                        processor = copy_bias_processor(tok, lang, [sources[i] for i in rows],
+                                                        mdl.config.vocab_size, **copy_bias)
+                    kwargs["logits_processor"] = LogitsProcessorList([processor])
+                with torch.no_grad(), torch_capture.profile(task=task.name, lang=lang, model=route.model,
+                                                            batch_size=len(rows)):
+                    out = mdl.generate(input_ids=enc.input_ids[index, columns],
+                                       attention_mask=enc.attention_mask[index, columns], **kwargs)
+                tokens_out += int((out != tok.pad_token_id).sum())
+                with tracer.span("decode", task=task.name, lang=lang), model.tokenizer_lock:
+                    decoded = [task.strip_label(lang, r) for r in tok.batch_decode(out, skip_special_tokens=True)]
+                k = kwargs.get("num_return_sequences", 1)
+                for n, i in enumerate(rows):
+                    outputs[i] = decoded[n * k:(n + 1) * k]
+            span.set_attribute("tokens_out", tokens_out)
+    logger.info("generate", extra={
+        "model": route.model, "latency_ms": round((time.perf_counter() - started) * 1000, 2),
+        "tokens_in": tokens_in, "tokens_out": tokens_out,
+    })
+    return outputs
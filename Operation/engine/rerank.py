@@ -0,0 +1,70 @@
+"""
+Candidate reranking for tasks that must reword their input (paraphrase, aiBypass).
+
+Their profiles ask generate() for k candidates per input (`num_return_sequences`)
+instead of one. `pick()` then scores all n x k candidates against their sources
+in one vectorized pass and keeps, per input:
+
+* the candidate most similar to the source among those at or below the task's
+  `retry_similarity` threshold: reworded enough, closest in content;
+* when none is below it, the least similar one, counted in
+  engine_rerank_fallback_total.
+
+Before, a single output was checked and a too-similar one triggered a second,
+serial generate call with more beams. That doubled the latency of exactly the
+requests that were already the slowest.
+
+Similarity is the word-set Jaccard index of `tasks.too_similar`: each text
+becomes a boolean row over the batch's vocabulary, and intersections and unions
+are reductions over that axis.
+"""
+from utils import metrics
+
+
+def jaccard(sources, candidates):
+    """[n, k] word-set Jaccard similarity of candidates[i][j] to sources[i]; 1.0 when either is empty."""
+    import torch
+
+    vocab = {}
+
+    def word_ids(text):
+        return {vocab.setdefault(w, len(vocab)) for w in text.lower().split()}
+
+    src_ids = [word_ids(s) for s in sources]
+    cand_ids = [[word_ids(c) for c in row] for row in candidates]
+    n, k = len(sources), max(len(row) for row in candidates)
+
+    def one_hot(shape, index):
+        out = torch.zeros(shape, dtype=torch.bool)
+        if index:
+            out[tuple(torch.tensor(axis) for axis in zip(*index))] = True
+        return out
+
+    src = one_hot((n, len(vocab)), [(i, w) for i, ids in enumerate(src_ids) for w in ids])
+    cand = one_hot((n, k, len(vocab)),
+                   [(i, j, w) for i, row in enumerate(cand_ids) for j, ids in enumerate(row) for w in ids])
+
+    src = src.unsqueeze(1)
+    inter = (src & cand).sum(-1)
+    union = (src | cand).sum(-1)
+    empty = (src.sum(-1) == 0) | (cand.sum(-1) == 0)
+    similarity = inter.float() / union.clamp(min=1).float()
+    return similarity.masked_fill(empty, 1.0)
+
+
+def pick(task, sources, candidates):
+    """One output per source: the best candidate under the task's similarity threshold."""
+    import torch
+
+    similarity = jaccard(sources, candidates)
+    below = similarity <= task.retry_similarity
+    # candidates under the threshold score their similarity (0..t), the others below -1,
+    # highest first among the latter when the former are empty: the least similar
+    score = torch.where(below, similarity, -1.0 - similarity)
+    best = score.argmax(dim=-1).tolist()
+
+    fallbacks = int((~below.any(dim=-1)).sum())
+    metrics.inc("engine_candidates_total", sum(len(row) for row in candidates), task=task.name)
+    if fallbacks:
+        metrics.inc("engine_rerank_fallback_total", fallbacks, task=task.name)
+    return [row[j] for row, j in zip(candidates, best)]
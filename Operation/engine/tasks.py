@@ -0,0 +1,180 @@
+"""
+Text tasks served by the engine.
+
+A Task holds everything that is specific to one endpoint:
+
+* prompts per language and style. English prompts serve any language that has none
+  of its own;
+* the label(s) the model may echo in front of its answer, stripped from the output;
+* the request schema (allowed styles, character limit, output formats) and the
+  response key. Format "edits" returns the changes as offsets into the input
+  (utils/text_edits.py) instead of the whole output;
+* `split_languages`: Arabic / English spans are routed and batched separately and
+  put back in order (grammar). Other tasks route the whole text by its majority
+  script;
+* `retry_similarity`: the highest word-set Jaccard similarity to the input an output
+  may have (paraphrase and aiBypass must actually reword). The best of the
+  profile's candidates under it is kept (Operation/engine/rerank.py); a
+  single-candidate profile runs the prompt again with its "retry" overrides;
+* `cacheable`: whether outputs go through a result cache (not for sampled tasks);
+* `early_exit_styles`: styles whose input is returned unchanged when the model is
+  confident it needs no edit (Operation/engine/early_exit.py). Only styles that
+  correct, never those that rewrite.
+
+Which model and which generate() settings serve a task is decided by
+Config/model_routing.json, not here.
+"""
+from utils.lang_detect import AR, EN
+from utils.request_schema import TextRequestSchema
+from utils.result_cache import ResultCache
+
+
+class Task:
+    def __init__(self, name, endpoint, response_key, prompts, labels=(), default_style="standard",
+                 limit_key=None, default_limit=2000, split_languages=False, retry_similarity=None,
+                 cacheable=True, early_exit_styles=(), formats=("text",)):
+        self.name = name
+        self.endpoint = endpoint
+        self.response_key = response_key
+        self.prompts = prompts          # {lang: {style: template with {text}}}
+        self.labels = labels            # {lang: (label, ...)} or (label, ...) for every language
+        self.default_style = default_style
+        self.split_languages = split_languages
+        self.retry_similarity = retry_similarity
+        self.early_exit_styles = frozenset(early_exit_styles)
+        self.cache = ResultCache(name, max_entries=2048) if cacheable else None
+        styles = set().union(*(p.keys() for p in prompts.values()))
+        self.schema = TextRequestSchema(endpoint, styles=styles, default_style=default_style,
+                                        limit_key=limit_key, default_limit=default_limit, formats=formats)
+
+    def prompt(self, lang, style, text):
+        templates = self.prompts.get(lang, self.prompts[EN])
+        return templates.get(style, templates[self.default_style]).format(text=text)
+
+    def strip_label(self, lang, output):
+        output = output.strip()
+        labels = self.labels.get(lang, self.labels.get(EN, ())) if isinstance(self.labels, dict) else self.labels
+        lowered = output.lower()
+        for label in labels:
+            if lowered.startswith(label.lower()):
+                return output[len(label):].strip()
+        return output
+
+
+def too_similar(src, out, threshold):
+    a, b = set(src.lower().split()), set(out.lower().split())
+    if not a or not b:
+        return True
+    return len(a & b) / max(1, len(a | b)) > threshold
+
+
+# -------------------- Grammar (Arabic + English) --------------------
+AR_GRAMMAR_PROMPTS = {
+    "standard": (
+        "صحح الأخطاء النحوية والإملائية وعلامات الترقيم في الجملة التالية "
+        "مع الحفاظ على نفس المعنى. اكتب الجملة المصححة فقط دون أي شروح أو رموز خاصة:\n"
+        "{text}\n"
+        "النص المصحح:"
+    ),
+    "academic": (
+        "صحح الأخطاء وأعد صياغة الجملة بأسلوب أكاديمي رسمي وواضح، "
+        "ثم اكتب الجملة المصححة فقط دون أي شروح أو رموز خاصة:\n"
+        "{text}\n"
+        "النص المصحح:"
+    ),
+    "technical": (
+        "صحح الأخطاء وأعد صياغة الجملة بأسلوب تقني دقيق مع مصطلحات مناسبة، "
+        "ثم اكتب الجملة المصححة فقط دون أي شروح أو رموز خاصة:\n"
+        "{text}\n"
+        "النص المصحح:"
+    ),
+}
+
+EN_GRAMMAR_PROMPTS = {
+    "standard":  "Correct grammar, spelling, and punctuation. Keep the same meaning.\nOriginal: {text}\nCorrected:",
+    "academic":  "Correct grammar and rewrite in a formal, academic tone. Keep meaning.\nOriginal: {text}\nCorrected:",
+    "technical": "Correct grammar and rewrite in a precise, technical style. Keep meaning.\nOriginal: {text}\nCorrected:",
+}
+
+GRAMMAR = Task(
+    "grammar", "grammar_check", "corrected_text",
+    prompts={AR: AR_GRAMMAR_PROMPTS, EN: EN_GRAMMAR_PROMPTS},
+    labels={AR: ("النص المصحح:",), EN: ("Corrected:",)},
+    limit_key="GRAMMAR_MAX_CHARS", default_limit=5000, split_languages=True,
+    early_exit_styles=("standard",), formats=("text", "edits"),
+)
+
+# -------------------- Paraphrase (few-shot: forces rewording + tone) --------------------
+_NO_COPY = "Do NOT repeat 3-word phrases from the original. Keep the meaning the same.\n"
+
+PARAPHRASE = Task(
+    "paraphrase", "paraphrase", "paraphrased_text",
+    prompts={EN: {
+        "academic": (
+            "Rewrite the sentence in a formal, academic tone using different wording. " + _NO_COPY +
+            "Original: The study shows people sleep less during the summer.\n"
+            "Paraphrase: The findings indicate that individuals tend to obtain less sleep in the summer months.\n"
+            "Original: {text}\nParaphrase:"
+        ),
+        "casual": (
+            "Rewrite the sentence in a relaxed, conversational tone using different wording. " + _NO_COPY +
+            "Original: The device malfunctioned during the demonstration.\n"
+            "Paraphrase: The gadget messed up while we were showing it off.\n"
+            "Original: {text}\nParaphrase:"
+        ),
+        "professional": (
+            "Rewrite the sentence in a clear, concise, professional tone using different wording. " + _NO_COPY +
+            "Original: We will try to resolve the issue as soon as possible.\n"
+            "Paraphrase: We will address the issue promptly.\n"
+            "Original: {text}\nParaphrase:"
+        ),
+        "shortened": "Paraphrase concisely without losing meaning.\nOriginal: {text}\nParaphrase:",
+        "expanded":  "Paraphrase with a bit more detail and clarity.\nOriginal: {text}\nParaphrase:",
+    }},
+    labels=("Paraphrase:", "Paraphrase -", "Paraphrase —"),
+    default_style="academic", limit_key="PARAPHRASE_MAX_CHARS",
+    retry_similarity=0.72, cacheable=False,
+)
+
+# -------------------- AI bypass (reword so the text reads as human-written) --------------------
+AIBYPASS = Task(
+    "aibypass", "aiBypass", "aiBypass_text",
+    prompts={EN: {
+        "standard": (
+            "Rewrite the following text so it completely avoids detection by AI detectors, "
+            "while keeping the meaning exactly the same. Use different structure, synonyms, and phrasing.\n"
+            "Original: {text}\nRewrite:"
+        ),
+        "advanced": (
+            "Rewrite the following text in a way that bypasses AI detection and appears entirely human-written. "
+            "Change sentence structure, reorder ideas, and replace words with synonyms while keeping meaning identical.\n"
+            "Original: {text}\nRewrite:"
+        ),
+        "creative": (
+            "Transform the following text so it bypasses AI detection while keeping the meaning the same. "
+            "Add subtle creative variations, figurative language, and unique expressions.\n"
+            "Original: {text}\nRewrite:"
+        ),
+    }},
+    labels=("Rewrite:", "Paraphrase:", "Rewritten:"),
+    limit_key="AIBYPASS_MAX_CHARS", retry_similarity=0.72,
+)
+
+# -------------------- CoEdIT (instruction-tuned editing model) --------------------
+COEDIT = Task(
+    "coedit", "coedit", "edited_text",
+    prompts={EN: {
+        "grammar":    "Fix grammatical errors in this sentence: {text}",
+        "fluency":    "Improve the fluency of this text: {text}",
+        "coherence":  "Make this text more coherent: {text}",
+        "clarity":    "Make this text clearer: {text}",
+        "formal":     "Write this more formally: {text}",
+        "simplify":   "Simplify this sentence: {text}",
+        "paraphrase": "Paraphrase this sentence: {text}",
+        "neutralize": "Remove points of view: {text}",
+    }},
+    default_style="grammar", limit_key="COEDIT_MAX_CHARS",
+    early_exit_styles=("grammar", "fluency"), formats=("text", "edits"),
+)
+
+TASKS = {task.name: task for task in (GRAMMAR, PARAPHRASE, AIBYPASS, COEDIT)}
@@ -0,0 +1,64 @@
+from flask import request, jsonify, make_response, current_app
+from flask_restx import Resource, Namespace
+from flask_jwt_extended import jwt_required
+import logging
+
+from Models.Books_model import books
+from utils.text_search import get_search_index
+
+search_ns = Namespace("/api/search", description="Full-text search over books and attachments")
+search_ns.logger = logging.getLogger("search_ns")
+
+
+# -------------------- Book Search Route --------------------
+@search_ns.route('/books')
+class BookSearch(Resource):
+    @jwt_required()
+    def get(self):
+        try:
+            q = (request.args.get("q") or "").strip()
+            if not q:
+                return make_response(jsonify({"error": "q is required"}), 400)
+            try:
+                page = max(1, int(request.args.get("page", 1)))
+                per_page = int(request.args.get("per_page", 20))
+            except ValueError:
+                return make_response(jsonify({"error": "page and per_page must be integers"}), 400)
+            per_page = max(1, min(per_page, current_app.config.get("SEARCH_MAX_PER_PAGE", 50)))
+
+            total, hits = get_search_index().search(q, limit=per_page, offset=(page - 1) * per_page)
+
+            # one hit per live book; hydrate from the books table. A book soft-deleted by a bulk
+            # update stays in the local index until reindex_all(), so it is still checked here
+            book_ids = {h["book_id"] for h in hits if h["book_id"] is not None}
+            found = {}
+            if book_ids:
+                rows = books.query.filter(books.book_id.in_(book_ids), books.is_delete.isnot(True)).all()
+                found = {b.book_id: b for b in rows}
+
+            results = []
+            for h in hits:
+                book = found.get(h["book_id"])
+                if book is None:
+                    continue
+                results.append({
+                    "book_id": book.book_id,
+                    "incoming_number": book.incoming_number,
+                    "organization_date": book.organization_date.isoformat() if book.organization_date else None,
+                    "subject": book.subject,
+                    "matched": h["doc_type"],
+                    "score": round(h["score"], 4),
+                    "snippet": h["snippet"],
+                })
+
+            return jsonify({
+                "results": results,
+                "page": page,
+                "per_page": per_page,
+                "total": total,
+                "has_more": page * per_page < total,
+            })
+
+        except Exception as e:
+            search_ns.logger.exception(f"Exception in /search/books: {e}")
+            return make_response(jsonify({"error": "خطأ في البحث"}), 500)
@@ -0,0 +1,112 @@
+"""
+Benchmark: per-row save() vs the BulkMixin class methods.
+
+Runs against a throw-away SQLite file by default, or any database given with
+--db-uri (e.g. a staging PostgreSQL). Tables are created with db.create_all().
+
+    $ python Tool/bench_bulk_models.py --rows 5000 --chunk-size 1000
+    $ python Tool/bench_bulk_models.py --db-uri postgresql://user:pw@host/bench
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+from flask import Flask
+
+from exts import db
+from Models.Books_model import books, transfer_book
+
+
+def make_app(db_uri):
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = db_uri
+    app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    db.init_app(app)
+    return app
+
+
+def book_row(i):
+    return {
+        "incoming_number": i,
+        "section": "section",
+        "to": "to",
+        "subject": f"subject {i}",
+        "description": "description",
+        "notes": "notes",
+        "copy_to": "copy",
+        "time_stamp": datetime.utcnow(),
+    }
+
+
+def transfer_row(i):
+    return {"book_id": i, "org_send_id": i % 50, "org_recieve_id": (i + 1) % 50, "time_stamp": datetime.utcnow()}
+
+
+def timed(label, n, fn):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<40} {n:>8} rows  {elapsed:8.3f}s  {n / elapsed:>10.0f} rows/s")
+    return elapsed
+
+
+def reset_tables():
+    db.drop_all()
+    db.create_all()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-row vs bulk model operations")
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--db-uri", default=None)
+    args = parser.parse_args()
+
+    tmp = None
+    db_uri = args.db_uri
+    if db_uri is None:
+        tmp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+        tmp.close()
+        db_uri = "sqlite:///" + tmp.name
+
+    app = make_app(db_uri)
+    n = args.rows
+    with app.app_context():
+        for model, make_row in ((books, book_row), (transfer_book, transfer_row)):
+            name = model.__name__
+            reset_tables()
+            per_row = timed(f"{name}: save() per row", n,
+                            lambda: [model(**make_row(i)).save() for i in range(n)])
+            reset_tables()
+            bulk = timed(f"{name}: bulk_insert", n,
+                         lambda: model.bulk_insert([make_row(i) for i in range(n)], chunk_size=args.chunk_size))
+            print(f"{'':<40} speed-up x{per_row / bulk:.1f}")
+
+            ids = [getattr(obj, model._pk_names()[0]) for obj in model.query.all()]
+            upserts = [dict(make_row(i), **{model._pk_names()[0]: pk}) for i, pk in enumerate(ids)]
+            timed(f"{name}: bulk_upsert (all existing)", n,
+                  lambda: model.bulk_upsert(upserts, chunk_size=args.chunk_size))
+
+            def soft_delete_per_row():
+                for obj in model.query.all():
+                    setattr(obj, model.__soft_delete__, True)
+                    db.session.commit()
+
+            per_row = timed(f"{name}: soft delete per row", n, soft_delete_per_row)
+            bulk = timed(f"{name}: bulk_soft_delete", n,
+                         lambda: model.bulk_soft_delete(ids, chunk_size=args.chunk_size))
+            print(f"{'':<40} speed-up x{per_row / bulk:.1f}")
+            print()
+        db.drop_all()
+
+    if tmp is not None:
+        os.unlink(tmp.name)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+"""
+Benchmark the coedit task on coedit-large against flan-t5-base.
+
+Each model runs in its own process, so load time and memory are not skewed by
+the other one. Both go through the engine path the /coedit endpoint uses
+(Operation/engine/pipeline.infer_with): chunking to the model window, length
+buckets, memory-planned generate, with the "coedit" routing profile.
+
+Reported per model: load time, weight size, RSS growth of the load and the
+process peak RSS. Per document size: latency p50 / p95 per batch of documents and
+the RSS growth while generating.
+
+    $ python Tool/bench_coedit.py                         # needs the local models
+    $ python Tool/bench_coedit.py --sizes 1 10 40 --docs 8 --style fluency
+"""
+import argparse
+import json
+import math
+import os
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+from Config.config import Config
+from utils.lang_detect import EN
+from utils.memory_governor import rss_bytes
+from utils.model_routing import Route, model_router
+
+MODELS = ("grammarly_coedit", "flan_t5_base")
+SENTENCES = [
+    "The committee have approved the budget for next year.",
+    "We was informed about the delay in the shipment.",
+    "Please send me the report before monday.",
+    "The new system reduce the processing time significantly.",
+    "She don't know where the files is stored.",
+    "Their going to announce the results tomorrow.",
+    "The meeting was postponed until next week.",
+    "All employees must submit their timesheets by Friday.",
+]
+_MB = 1024 * 1024
+
+
+def make_docs(rng, docs, sentences):
+    return [" ".join(rng.choice(SENTENCES) for _ in range(sentences)) for _ in range(docs)]
+
+
+class RssPeak:
+    """RSS growth over the block, sampled every 5 ms."""
+
+    def __enter__(self):
+        self.start = self.peak = rss_bytes()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def _sample(self):
+        while not self._stop.wait(0.005):
+            self.peak = max(self.peak, rss_bytes())
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.growth = max(self.peak, rss_bytes()) - self.start
+
+
+def run_model(name, args):
+    from Operation.engine import TASKS, infer_with
+    from Operation.engine.backends import BACKENDS
+    from utils.model_registry import ResidentModel
+
+    model_router.load(args.routing, args.models_root)
+    spec = model_router.model(name)
+    profile = model_router.route("coedit", EN, args.style).profile
+    route = Route(name, spec["path"], spec["backend"], spec["dtype"], profile, None)
+
+    rss_before = rss_bytes()
+    started = time.perf_counter()
+    tok, mdl = BACKENDS[spec["backend"]](spec["path"], spec["dtype"])
+    model = ResidentModel(name, tok, mdl, time.perf_counter() - started)
+    result = {"model": name, "load_s": round(model.load_seconds, 2),
+              "weights_mb": model.nbytes // _MB, "rss_loaded_mb": (rss_bytes() - rss_before) // _MB, "sizes": []}
+
+    task = TASKS["coedit"]
+    rng = random.Random(args.seed)
+    infer_with(task, EN, route, model, make_docs(rng, 1, 1), args.style)  # warm up
+    for size in args.sizes:
+        docs = make_docs(rng, args.docs, size)
+        timings = []
+        with RssPeak() as peak:
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                infer_with(task, EN, route, model, docs, args.style)
+                timings.append(time.perf_counter() - start)
+        result["sizes"].append({
+            "sentences": size,
+            "p50_s": round(statistics.median(timings), 3),
+            "p95_s": round(sorted(timings)[math.ceil(len(timings) * 0.95) - 1], 3),
+            "rss_growth_mb": round(peak.growth / _MB, 1),
+        })
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    result["process_peak_mb"] = (peak if sys.platform == "darwin" else peak * 1024) // _MB
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="coedit-large vs flan-t5-base on the coedit task")
+    parser.add_argument("--model", choices=MODELS, help="run one model in this process (used internally)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 5, 20], help="sentences per document")
+    parser.add_argument("--docs", type=int, default=4, help="documents per batch")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--style", default="grammar")
+    parser.add_argument("--seed", type=int, default=3)
+    parser.add_argument("--routing", default=Config.MODEL_ROUTING_FILE)
+    parser.add_argument("--models-root", default=Config.MODELS_ROOT)
+    args = parser.parse_args()
+
+    if args.model:
+        print(json.dumps(run_model(args.model, args)))
+        return
+
+    results = []
+    for name in MODELS:
+        cmd = [sys.executable, os.path.realpath(__file__), "--model", name] + sys.argv[1:]
+        proc = subprocess.run(cmd, capture_output=True, text=True)
+        if proc.returncode:
+            print(f"{name}: failed\n{proc.stderr[-2000:]}", file=sys.stderr)
+            continue
+        results.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+    print(f"{'model':<18} {'load s':>7} {'weights MB':>11} {'RSS load MB':>12} {'peak MB':>8}")
+    for r in results:
+        print(f"{r['model']:<18} {r['load_s']:>7} {r['weights_mb']:>11} {r['rss_loaded_mb']:>12} "
+              f"{r['process_peak_mb']:>8}")
+    print()
+    print(f"{'model':<18} {'sentences':>9} {'p50 s':>7} {'p95 s':>7} {'RSS growth MB':>14}")
+    for r in results:
+        for s in r["sizes"]:
+            print(f"{r['model']:<18} {s['sentences']:>9} {s['p50_s']:>7} {s['p95_s']:>7} {s['rss_growth_mb']:>14}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""
+Benchmark mixed-script routing.
+
+Compares, per corpus, the old routing (whole text to mT5 if it contains any Arabic
+character, otherwise to the English model) with span routing (utils/lang_detect.py:
+Arabic and English spans batched to their own model and reassembled).
+
+    $ python Tool/bench_mixed_lang.py --detect-only     # detection / splitting cost, no models needed
+    $ python Tool/bench_mixed_lang.py --docs 10         # end-to-end latency, needs the local models
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+from utils.arabic_text import contains_arabic
+from utils.lang_detect import AR, EN, split_spans
+
+EN_SENTENCES = [
+    "The committee have approved the budget for next year.",
+    "We was informed about the delay in the shipment.",
+    "Please send me the report before monday.",
+    "The new system reduce the processing time significantly.",
+]
+AR_SENTENCES = [
+    "ذهب الطالب الى المدرسه في الصباح الباكر.",
+    "تمت الموافقه على المشروع من قبل اللجنة.",
+    "ارسلت الوزاره الكتاب الى المديرية.",
+    "يجب ان يتم تدقيق الحسابات قبل نهاية الشهر.",
+]
+NAMES = ["أحمد", "بغداد", "وزارة المالية", "محمد علي"]
+
+
+def make_corpora(rng, n):
+    return {
+        "english": [" ".join(rng.choice(EN_SENTENCES) for _ in range(3)) for _ in range(n)],
+        "arabic": [" ".join(rng.choice(AR_SENTENCES) for _ in range(3)) for _ in range(n)],
+        "english + arabic names": [
+            " ".join(rng.choice(EN_SENTENCES).replace("We", f"We and {rng.choice(NAMES)}", 1) for _ in range(3))
+            for _ in range(n)],
+        "alternating paragraphs": [
+            "\n".join(rng.choice(EN_SENTENCES) if i % 2 else rng.choice(AR_SENTENCES) for i in range(4))
+            for _ in range(n)],
+    }
+
+
+def old_routing(text, style):
+    from Operation.engine import TASKS, infer_batch
+    return infer_batch(TASKS["grammar"], AR if contains_arabic(text) else EN, [text], style, chars=len(text))[0]
+
+
+def span_routing(text, style):
+    from Operation.engine import TASKS, infer
+    return infer(TASKS["grammar"], text, style)
+
+
+def run(fn, docs, style):
+    timings = []
+    for text in docs:
+        start = time.perf_counter()
+        fn(text, style)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mixed-script routing benchmark")
+    parser.add_argument("--docs", type=int, default=10, help="documents per corpus")
+    parser.add_argument("--style", default="standard")
+    parser.add_argument("--detect-only", action="store_true")
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    corpora = make_corpora(rng, args.docs)
+
+    print(f"{'corpus':<24} {'split us/doc':>12} {'spans/doc':>10} {'to mT5 (old)':>13} {'AR chars (new)':>15}")
+    for name, docs in corpora.items():
+        start = time.perf_counter()
+        for _ in range(100):
+            all_spans = [split_spans(d) for d in docs]
+        split_us = (time.perf_counter() - start) / (100 * len(docs)) * 1e6
+        old_ar = sum(1 for d in docs if contains_arabic(d)) / len(docs)
+        ar_chars = sum(len(s.text) for spans in all_spans for s in spans if s.lang == AR)
+        total_chars = sum(len(d) for d in docs)
+        print(f"{name:<24} {split_us:>12.1f} {statistics.mean(len(s) for s in all_spans):>10.1f} "
+              f"{old_ar:>12.0%} {ar_chars / total_chars:>14.0%}")
+
+    if args.detect_only:
+        return
+
+    from Config.config import Config
+    from utils.model_routing import model_router
+    model_router.load(Config.MODEL_ROUTING_FILE, Config.MODELS_ROOT)
+
+    print()
+    print(f"{'corpus':<24} {'old total s':>12} {'span total s':>13} {'old p50':>8} {'span p50':>9}")
+    for name, docs in corpora.items():
+        run(span_routing, docs[:1], args.style)  # load models before timing
+        old = run(old_routing, docs, args.style)
+        new = run(span_routing, docs, args.style)
+        print(f"{name:<24} {sum(old):>12.2f} {sum(new):>13.2f} "
+              f"{statistics.median(old):>8.2f} {statistics.median(new):>9.2f}")
+
+
+if __name__ == '__main__':
+    main()
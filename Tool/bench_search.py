@@ -0,0 +1,109 @@
+"""
+Benchmark the full-text search index on a generated corpus.
+
+Builds an index of --rows synthetic book documents (mixed Arabic / English, with
+random diacritics like real input) and reports indexing throughput, index size
+and ranked-query latency for rare, common and multi-term queries.
+
+    $ python Tool/bench_search.py                        # 1,000,000 rows, local FTS5 index
+    $ python Tool/bench_search.py --rows 100000
+    $ python Tool/bench_search.py --db-uri postgresql://user:pw@host/bench   # tsvector + GIN
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+from utils.text_search import LocalSearchIndex, PostgresSearchIndex, normalize
+
+AR_WORDS = ["كتاب", "وزارة", "المالية", "الموازنة", "تقرير", "اجتماع", "مشروع", "العقد", "الموظفين",
+            "الرواتب", "التدقيق", "المحافظة", "الصحة", "التربية", "النقل", "الكهرباء", "المياه",
+            "الموافقة", "الطلب", "المرفقات", "اللجنة", "القرار", "المديرية", "الشركة", "الاستيراد"]
+EN_WORDS = ["budget", "report", "meeting", "contract", "approval", "invoice", "ministry", "audit",
+            "project", "salary", "transfer", "request", "committee", "decision", "supply", "tender"]
+HARAKAT = ["َ", "ُ", "ِ", "ّ", "ْ", ""]
+RARE = [f"ref{i:05d}" for i in range(2000)]
+
+
+def make_doc(rng, i):
+    words = []
+    for _ in range(rng.randint(20, 60)):
+        if rng.random() < 0.7:
+            w = rng.choice(AR_WORDS)
+            if rng.random() < 0.3:
+                w = "".join(ch + rng.choice(HARAKAT) for ch in w)
+        else:
+            w = rng.choice(EN_WORDS)
+        words.append(w)
+    words.append(rng.choice(RARE))
+    original = " ".join(words)
+    return ("book", i, i, normalize(original), original)
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Full-text search benchmark")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--batch", type=int, default=10_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--db-uri", default=None, help="PostgreSQL URI to benchmark the tsvector backend")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    tmpdir = None
+    if args.db_uri:
+        from sqlalchemy import create_engine
+        index = PostgresSearchIndex(create_engine(args.db_uri))
+        backend = "postgresql tsvector/GIN"
+    else:
+        tmpdir = tempfile.mkdtemp()
+        path = os.path.join(tmpdir, "search_index.db")
+        index = LocalSearchIndex(path)
+        backend = f"local FTS5 ({path})"
+
+    print(f"backend: {backend}")
+    start = time.perf_counter()
+    for lo in range(0, args.rows, args.batch):
+        index.upsert([make_doc(rng, i) for i in range(lo, min(lo + args.batch, args.rows))])
+    elapsed = time.perf_counter() - start
+    print(f"indexed {args.rows} docs in {elapsed:.1f}s ({args.rows / elapsed:.0f} docs/s)")
+    if tmpdir:
+        size = sum(os.path.getsize(os.path.join(tmpdir, f)) for f in os.listdir(tmpdir))
+        print(f"index size on disk: {size / 1e6:.1f} MB")
+
+    cases = {
+        "rare term": lambda: rng.choice(RARE),
+        "common term": lambda: rng.choice(AR_WORDS),
+        "two terms": lambda: f"{rng.choice(AR_WORDS)} {rng.choice(EN_WORDS)}",
+        "diacritized": lambda: "".join(ch + "َ" for ch in rng.choice(AR_WORDS)),
+    }
+    print(f"{'query':<14} {'p50 ms':>8} {'p95 ms':>8} {'avg hits':>10}")
+    for label, make_query in cases.items():
+        timings, hits = [], []
+        for _ in range(args.queries):
+            q = make_query()
+            t = time.perf_counter()
+            total, _ = index.search(q, limit=20)
+            timings.append((time.perf_counter() - t) * 1000)
+            hits.append(total)
+        print(f"{label:<14} {statistics.median(timings):>8.2f} {percentile(timings, 0.95):>8.2f} "
+              f"{statistics.mean(hits):>10.0f}")
+
+    if tmpdir:
+        for f in os.listdir(tmpdir):
+            os.unlink(os.path.join(tmpdir, f))
+        os.rmdir(tmpdir)
+
+
+if __name__ == '__main__':
+    main()
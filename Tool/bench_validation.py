@@ -0,0 +1,86 @@
+"""
+Benchmark request validation (Validation/validation.py).
+
+Reports the per-request cost of each validator schema on a valid payload and on
+payloads that fail at the last check, and compares the one-pass password check
+with the previous one-regex-scan-per-rule version.
+
+    $ python Tool/bench_validation.py
+    $ python Tool/bench_validation.py --number 200000
+"""
+import argparse
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+from Validation.validation import (AddSubstrateValidator, AddUserValidator, ChangePasswordValidator,
+                                   CreateUserValidator, LoginValidator, check_password_complexity)
+
+
+class Upload:
+    filename = "card.jpg"
+
+
+ADD_USER = {
+    "ususername": "ahmed.ali", "uspassword": "Str0ng!Passw0rd", "usphoneno": "07701234567", "orgid": 12,
+    "usfirstname": "أحمد", "ussecondname": "علي", "usthirdname": "حسن", "usforthname": "كاظم",
+    "ussurname": "Al-Baghdadi", "usbirthdate": "1990-05-17", "usgender": "ذكر",
+}
+SUBSTRATE = {
+    "name": "محمد", "father_name": "جاسم", "third_name": "عبد الله", "forth_name": "", "surn_ame": "",
+    "birth_date": "1985-02-01", "national_number": "199012345678", "phone_number": "07801234567",
+    "gender": "انثى",
+}
+CASES = {
+    "login": (LoginValidator.validate_login_data, ({"UsUsername": "ahmed.ali", "UsPassword": "x"},)),
+    "change_password": (ChangePasswordValidator.validate_change_password_data,
+                        ({"new_password": "Str0ng!Passw0rd", "confirm_password": "Str0ng!Passw0rd"},)),
+    "create_user": (CreateUserValidator.validate_create_user_data,
+                    ({"ususername": "ahmed.ali", "uspassword": "Str0ng!Passw0rd", "roles_id": [1], "orgid": 3},)),
+    "add_user": (AddUserValidator.validate_add_user_data, (ADD_USER,)),
+    "add_user (bad gender)": (AddUserValidator.validate_add_user_data, (dict(ADD_USER, usgender="x"),)),
+    "substrate": (AddSubstrateValidator.validate_request_data, (SUBSTRATE, {"card_photo": Upload()})),
+}
+
+
+def legacy_password_complexity(password):
+    """The previous implementation: one regex scan per rule, patterns looked up at call time."""
+    if len(password) < 8:
+        return "length"
+    if not re.search(r'[A-Z]', password):
+        return "upper"
+    if not re.search(r'[a-z]', password):
+        return "lower"
+    if not re.search(r'[0-9]', password):
+        return "digit"
+    if not re.search(r'[!@#$%^&*(),.?\":{}|<>]', password):
+        return "special"
+    return "ok"
+
+
+def per_call_us(fn, args, number):
+    return min(timeit.repeat(lambda: fn(*args), number=number, repeat=3)) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validation benchmark")
+    parser.add_argument("--number", type=int, default=50_000, help="calls per measurement")
+    args = parser.parse_args()
+
+    print(f"{'validator':<24} {'us/request':>10}")
+    for name, (fn, call_args) in CASES.items():
+        print(f"{name:<24} {per_call_us(fn, call_args, args.number):>10.2f}")
+
+    print()
+    print(f"{'password':<24} {'legacy us':>10} {'one-pass us':>12}")
+    for password in ("Str0ng!Passw0rd", "weakpassword", "x" * 64 + "A1!"):
+        legacy = per_call_us(legacy_password_complexity, (password,), args.number)
+        current = per_call_us(check_password_complexity, (password,), args.number)
+        print(f"{password[:22]:<24} {legacy:>10.2f} {current:>12.2f}")
+
+
+if __name__ == '__main__':
+    main()
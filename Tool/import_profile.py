@@ -0,0 +1,89 @@
+"""
+Import-time profile report.
+
+Runs `python -X importtime -c "import <module>"` in a clean interpreter and
+prints the slowest imports (cumulative) plus the total wall time, so we can
+check that CLI tools, tests and health probes start quickly.
+
+    $ python Tool/import_profile.py                 # profiles Main
+    $ python Tool/import_profile.py Main run --top 25 --budget 1.0
+    $ python Tool/import_profile.py Main --forbid torch transformers
+
+Exit code is 1 if a module exceeds --budget seconds or pulls in a --forbid module.
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+
+# import time: self [us] | cumulative | imported package
+_LINE_RE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+
+def profile_import(module):
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT_DIR, capture_output=True, text=True,
+    )
+    wall = time.perf_counter() - start
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        m = _LINE_RE.match(line)
+        if m:
+            self_us, cum_us, indent, name = m.groups()
+            rows.append({
+                "name": name,
+                "self_ms": int(self_us) / 1000,
+                "cum_ms": int(cum_us) / 1000,
+                "depth": len(indent) // 2,
+            })
+    errors = [l for l in proc.stderr.splitlines() if not l.startswith("import time:")]
+    return {"module": module, "wall_s": wall, "rows": rows, "returncode": proc.returncode, "errors": errors}
+
+
+def print_report(report, top):
+    print(f"== import {report['module']}: {report['wall_s']:.3f}s wall "
+          f"({len(report['rows'])} modules, exit={report['returncode']})")
+    if report["returncode"] != 0:
+        print("\n".join(report["errors"][-10:]))
+    print(f"{'cumulative ms':>14} {'self ms':>10}  module")
+    for r in sorted(report["rows"], key=lambda r: r["cum_ms"], reverse=True)[:top]:
+        print(f"{r['cum_ms']:>14.1f} {r['self_ms']:>10.1f}  {'  ' * r['depth']}{r['name']}")
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time profile report")
+    parser.add_argument("modules", nargs="*", default=["Main"])
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--budget", type=float, default=None, help="max seconds per module")
+    parser.add_argument("--forbid", nargs="*", default=[], help="top-level packages that must not be imported")
+    args = parser.parse_args()
+
+    failed = False
+    for module in args.modules:
+        report = profile_import(module)
+        print_report(report, args.top)
+
+        loaded = {r["name"].split(".")[0] for r in report["rows"]}
+        for pkg in args.forbid:
+            if pkg in loaded:
+                print(f"!! {module} imports {pkg} at import time")
+                failed = True
+        if args.budget is not None and report["wall_s"] > args.budget:
+            print(f"!! {module} took {report['wall_s']:.3f}s > budget {args.budget:.3f}s")
+            failed = True
+        if report["returncode"] != 0:
+            failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""
+Deploy-time schema steps for an existing database. Idempotent: whatever already
+exists is skipped, so it is safe to run on every deploy.
+
+1. the lookup indexes declared in the models' __table_args__ (books, transfer_book);
+   on PostgreSQL they are built CONCURRENTLY so the tables stay writable;
+2. the orgs_closure table (Models/Orgs_model.py), backfilled with
+   rebuild_closure() when it is new or empty;
+3. the search index tables (utils/text_search.py), backfilled with reindex_all()
+   when the index is new or empty.
+
+`--backfill` reruns both backfills on tables that already have rows, e.g. after a
+bulk import or to fill the stored original text of an older search index.
+
+    $ python Tool/migrate_indexes.py --config PostgreConfig
+    $ python Tool/migrate_indexes.py --config PostgreConfig --dry-run
+    $ python Tool/migrate_indexes.py --config PostgreConfig --backfill
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+from flask import Flask
+from sqlalchemy import inspect
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from Config import config as config_module
+from exts import db
+from Models.Books_model import books, transfer_book
+from Models.Orgs_model import orgs_closure
+
+MODELS = (books, transfer_book)
+
+
+def create_indexes(engine, dry_run):
+    inspector = inspect(engine)
+    concurrently = engine.dialect.name == "postgresql"
+
+    for model in MODELS:
+        table = model.__table__
+        if not inspector.has_table(table.name):
+            print(f"-- {table.name}: table missing, skipped")
+            continue
+        existing = {ix["name"] for ix in inspector.get_indexes(table.name)}
+        for index in sorted(table.indexes, key=lambda ix: ix.name):
+            if index.name in existing:
+                print(f"-- {index.name}: exists")
+                continue
+            if concurrently:
+                index.dialect_options["postgresql"]["concurrently"] = True
+            ddl = str(CreateIndex(index).compile(dialect=engine.dialect))
+            print(ddl + ";")
+            if dry_run:
+                continue
+            start = time.perf_counter()
+            if concurrently:
+                # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+                with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+                    index.create(conn)
+            else:
+                with engine.begin() as conn:
+                    index.create(conn)
+            print(f"-- {index.name}: created in {time.perf_counter() - start:.1f}s")
+
+
+def create_closure(engine, dry_run, backfill):
+    from utils.org_hierarchy import rebuild_closure
+
+    table = orgs_closure.__table__
+    if inspect(engine).has_table(table.name):
+        print(f"-- {table.name}: exists")
+        empty = db.session.query(orgs_closure).first() is None
+    else:
+        print(str(CreateTable(table).compile(dialect=engine.dialect)).strip() + ";")
+        for index in table.indexes:
+            print(str(CreateIndex(index).compile(dialect=engine.dialect)) + ";")
+        if dry_run:
+            print(f"-- {table.name}: would be backfilled with rebuild_closure()")
+            return
+        table.create(engine, checkfirst=True)
+        empty = True
+    if not (empty or backfill):
+        return
+    if dry_run:
+        print(f"-- {table.name}: would be backfilled with rebuild_closure()")
+        return
+    start = time.perf_counter()
+    rows = rebuild_closure()
+    print(f"-- {table.name}: {rows} rows in {time.perf_counter() - start:.1f}s")
+
+
+def create_search_index(dry_run, backfill):
+    from utils.text_search import get_search_index, reindex_all
+
+    if dry_run:
+        print("-- search index: tables created if missing, backfilled with reindex_all() when empty")
+        return
+    index = get_search_index()   # creates the tables when they are missing
+    print(f"-- search index: {type(index).__name__}, {index.size()} documents")
+    if index.size() and not backfill:
+        return
+    start = time.perf_counter()
+    count = reindex_all()
+    print(f"-- search index: {count} documents indexed in {time.perf_counter() - start:.1f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create missing indexes, the org closure and the search index")
+    parser.add_argument("--config", default="PostgreConfig", help="config class name in Config/config.py")
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--backfill", action="store_true", help="rebuild the closure and the search index anyway")
+    args = parser.parse_args()
+
+    config = getattr(config_module, args.config)
+    create_indexes(config.get_engine(), args.dry_run)
+
+    # the backfills go through the app's session and search index wiring
+    app = Flask(__name__)
+    app.config.from_object(config)
+    db.init_app(app)
+    with app.app_context():
+        create_closure(db.engine, args.dry_run, args.backfill)
+        create_search_index(args.dry_run, args.backfill)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,549 @@
+"""
+Model store: provision the local model directories from a pinned manifest.
+
+Config/model_manifest.json lists every model the engine loads: the directory
+name under MODELS_ROOT, the Hugging Face repo and the revision. `lock` resolves
+each revision to a commit and records every file we keep with its sha256 and
+size. `sync` makes MODELS_ROOT match the locked manifest. It is idempotent: a
+second run with nothing changed does no I/O beyond a stat per file.
+
+    $ python Tool/model_store.py lock                       # pin commits + sha256 (network)
+    $ python Tool/model_store.py sync                       # fetch what is missing, build the directories
+    $ python Tool/model_store.py sync --offline --source /mnt/usb/models
+    $ python Tool/model_store.py verify                     # re-hash everything the snapshots use
+    $ python Tool/model_store.py status
+    $ python Tool/model_store.py gc --dry-run
+
+Layout under MODELS_ROOT:
+
+    .blobs/sha256/ab/ab12...     every file once, named by its sha256, read-only
+    .store/derived/<op>-<sha>    sha256 of the output of <op> applied to blob <sha>
+    .store/tmp/                  staging, on the same filesystem so renames and links work
+    flan_t5_base/                a snapshot: hardlinks into .blobs
+    grammarly_coedit@bf16/       a variant snapshot (weights cast to bfloat16)
+
+* Only the formats we load are fetched: `*.safetensors`, the config and the
+  tokenizer files. Pickle checkpoints (`pytorch_model*.bin`) are fetched only when
+  a revision has no safetensors. They are converted once with
+  `torch.load(weights_only=True)` into `model.safetensors` and are never linked into
+  a snapshot. TF, Flax, ONNX and other files are never fetched.
+* Each download is hashed before it enters .blobs; a mismatch with the lock is an
+  error. Files shared by several models or variants (tokenizers, configs) are
+  stored once.
+* Conversions and variants (`bf16`, `fp16`) are recorded in .store/derived, keyed by
+  their input blob, so they run once per input.
+* A snapshot is built next to the old one and swapped in with a rename. Workers
+  still holding files of the old one keep their inodes.
+* Offline: `--offline` never touches the network. `--source` points at another
+  store (a provisioned box, a mounted copy) whose blobs and derived records are
+  copied before anything is downloaded.
+"""
+import argparse
+import fnmatch
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from decouple import config
+
+DEFAULT_MANIFEST = os.path.join(ROOT_DIR, "Config", "model_manifest.json")
+DEFAULT_MODELS_ROOT = "/var/www/html/python/grammer_check/models"
+
+# top-level files kept in a snapshot
+ALLOWED_FILES = (
+    "*.safetensors", "model.safetensors.index.json",
+    "config.json", "generation_config.json",
+    "tokenizer.json", "tokenizer_config.json", "special_tokens_map.json", "added_tokens.json",
+    "vocab.json", "vocab.txt", "merges.txt", "*.model",
+)
+# fetched only when the revision has no safetensors, and only as conversion input
+CONVERTIBLE_FILES = ("pytorch_model.bin", "pytorch_model-*-of-*.bin")
+CONVERTED_NAME = "model.safetensors"
+
+VARIANT_DTYPES = {"bf16": "bfloat16", "fp16": "float16"}
+
+_CHUNK = 1024 * 1024
+
+
+class StoreError(Exception):
+    pass
+
+
+def _matches(filename, patterns):
+    return "/" not in filename and any(fnmatch.fnmatchcase(filename, p) for p in patterns)
+
+
+def sha256_file(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _human(nbytes):
+    if nbytes < 1024 * 1024:
+        return f"{nbytes / 1024:.1f}KB"
+    if nbytes < 1024 ** 3:
+        return f"{nbytes / 1024 ** 2:.1f}MB"
+    return f"{nbytes / 1024 ** 3:.2f}GB"
+
+
+# -------------------- conversions (torch / safetensors are imported lazily) --------------------
+def convert_pickle_to_safetensors(inputs, output):
+    """Merge (possibly sharded) pytorch_model*.bin files into one safetensors file."""
+    import torch
+    from safetensors.torch import save_file
+
+    state = {}
+    for path in inputs:
+        state.update(torch.load(path, map_location="cpu", weights_only=True))
+    seen = set()
+    for key, tensor in state.items():
+        ptr = tensor.untyped_storage().data_ptr()
+        # safetensors refuses tensors that share storage (tied embeddings); the loader re-ties them
+        state[key] = tensor.clone().contiguous() if ptr in seen else tensor.contiguous()
+        seen.add(ptr)
+    save_file(state, output, metadata={"format": "pt"})
+
+
+def cast_safetensors(dtype_name):
+    def cast(inputs, output):
+        import torch
+        from safetensors.torch import load_file, save_file
+
+        dtype = getattr(torch, dtype_name)
+        state = load_file(inputs[0])
+        state = {k: t.to(dtype) if t.is_floating_point() else t for k, t in state.items()}
+        save_file(state, output, metadata={"format": "pt"})
+    return cast
+
+
+def set_config_dtype(dtype_name):
+    def edit(inputs, output):
+        with open(inputs[0], encoding="utf-8") as f:
+            cfg = json.load(f)
+        cfg["torch_dtype"] = dtype_name
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(cfg, f, indent=2, sort_keys=True)
+            f.write("\n")
+    return edit
+
+
+# -------------------- the store --------------------
+class ModelStore:
+    def __init__(self, root, source=None, offline=False):
+        self.root = os.path.abspath(root)
+        self.blobs = os.path.join(self.root, ".blobs", "sha256")
+        self.derived = os.path.join(self.root, ".store", "derived")
+        self.tmp = os.path.join(self.root, ".store", "tmp")
+        self.source = ModelStore(source) if source else None
+        self.offline = offline
+
+    def blob_path(self, sha):
+        return os.path.join(self.blobs, sha[:2], sha)
+
+    def has_blob(self, sha):
+        return os.path.isfile(self.blob_path(sha))
+
+    def staging(self):
+        os.makedirs(self.tmp, exist_ok=True)
+        return tempfile.mkdtemp(dir=self.tmp)
+
+    def put_file(self, path, expected=None):
+        """Hash `path` and move it into .blobs. Returns its sha256."""
+        sha = sha256_file(path)
+        if expected is not None and sha != expected:
+            os.unlink(path)
+            raise StoreError(f"checksum mismatch: expected {expected}, got {sha}")
+        target = self.blob_path(sha)
+        if os.path.exists(target):
+            os.unlink(path)
+            return sha
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.chmod(path, 0o444)
+        os.replace(path, target)
+        return sha
+
+    def _copy_in(self, src_path, expected):
+        staging = self.staging()
+        try:
+            dst = os.path.join(staging, expected)
+            shutil.copyfile(src_path, dst)
+            return self.put_file(dst, expected)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+    def ensure_blob(self, sha, fetch, label):
+        """Make blob `sha` present: already here, copied from --source, or fetch() -> path."""
+        if self.has_blob(sha):
+            return "present"
+        if self.source is not None and self.source.has_blob(sha):
+            self._copy_in(self.source.blob_path(sha), sha)
+            return "copied"
+        if self.offline:
+            raise StoreError(f"{label}: blob {sha[:12]} is not in the store and --offline is set")
+        staging = self.staging()
+        try:
+            self.put_file(fetch(staging), sha)
+        except StoreError as e:
+            raise StoreError(f"{label}: {e}")
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        return "downloaded"
+
+    # ---- derived artifacts ----
+    def _derived_record(self, op, inputs):
+        key = inputs[0] if len(inputs) == 1 else hashlib.sha256("".join(inputs).encode()).hexdigest()
+        return os.path.join(self.derived, f"{op}-{key}")
+
+    def local_derived(self, op, inputs):
+        record = self._derived_record(op, inputs)
+        if os.path.isfile(record):
+            with open(record) as f:
+                sha = f.read().strip()
+            if self.has_blob(sha):
+                return sha
+        return None
+
+    def lookup_derived(self, op, inputs):
+        """Output sha of `op` on `inputs` when it is already in this store (or in --source)."""
+        sha = self.local_derived(op, inputs)
+        if sha is not None:
+            return sha
+        record = self._derived_record(op, inputs)
+        if self.source is not None:
+            sha = self.source.lookup_derived(op, inputs)
+            if sha is not None:
+                self._copy_in(self.source.blob_path(sha), sha)
+                self._write_record(record, sha)
+                return sha
+        return None
+
+    def _write_record(self, record, sha):
+        os.makedirs(self.derived, exist_ok=True)
+        tmp = f"{record}.{os.getpid()}"
+        with open(tmp, "w") as f:
+            f.write(sha + "\n")
+        os.replace(tmp, record)
+
+    def derive(self, op, inputs, fn):
+        sha = self.lookup_derived(op, inputs)
+        if sha is not None:
+            return sha, False
+        staging = self.staging()
+        try:
+            output = os.path.join(staging, "output")
+            fn([self.blob_path(s) for s in inputs], output)
+            sha = self.put_file(output)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        self._write_record(self._derived_record(op, inputs), sha)
+        return sha, True
+
+    # ---- snapshots ----
+    def snapshot_current(self, name, files):
+        """True when MODELS_ROOT/<name> holds exactly `files`, each linked to its blob."""
+        target = os.path.join(self.root, name)
+        if not os.path.isdir(target) or set(os.listdir(target)) != set(files):
+            return False
+        for filename, sha in files.items():
+            try:
+                if not os.path.samefile(os.path.join(target, filename), self.blob_path(sha)):
+                    return False
+            except OSError:
+                return False
+        return True
+
+    def link_snapshot(self, name, files):
+        if self.snapshot_current(name, files):
+            return False
+        staging = self.staging()
+        build = os.path.join(staging, "snapshot")
+        os.mkdir(build)
+        for filename, sha in files.items():
+            try:
+                os.link(self.blob_path(sha), os.path.join(build, filename))
+            except OSError:
+                # no hardlinks on this filesystem: fall back to a private copy
+                shutil.copyfile(self.blob_path(sha), os.path.join(build, filename))
+        target = os.path.join(self.root, name)
+        old = os.path.join(staging, "old")
+        if os.path.lexists(target):
+            os.replace(target, old)
+        os.replace(build, target)
+        shutil.rmtree(staging, ignore_errors=True)
+        return True
+
+    def snapshot_names(self):
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(n for n in os.listdir(self.root)
+                      if not n.startswith(".") and os.path.isdir(os.path.join(self.root, n)))
+
+
+# -------------------- manifest --------------------
+def load_manifest(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(path, manifest):
+    tmp = f"{path}.{os.getpid()}"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+    os.replace(tmp, path)
+
+
+def select(manifest, names):
+    models = manifest["models"]
+    unknown = [n for n in names if n not in models]
+    if unknown:
+        raise StoreError(f"not in the manifest: {', '.join(unknown)}")
+    return [(n, models[n]) for n in (names or models)]
+
+
+def _downloader(repo, commit, filename):
+    def fetch(staging):
+        from huggingface_hub import hf_hub_download
+        # a private cache inside the staging dir; resolve its symlink to the real file to move it
+        path = hf_hub_download(repo_id=repo, filename=filename, revision=commit, cache_dir=staging)
+        return os.path.realpath(path)
+    return fetch
+
+
+def snapshot_files(store, name, entry, log):
+    """{filename: sha} of the base snapshot, converting pickle weights when needed."""
+    files = {f: meta["sha256"] for f, meta in entry["files"].items()}
+    convert = entry.get("convert") or {}
+    if convert:
+        inputs = [convert[f]["sha256"] for f in sorted(convert)]
+        if store.lookup_derived("safetensors", inputs) is None:
+            for filename in sorted(convert):
+                status = store.ensure_blob(convert[filename]["sha256"],
+                                           _downloader(entry["repo"], entry["commit"], filename),
+                                           f"{name}/{filename}")
+                log(f"   {filename}: {status}")
+        sha, made = store.derive("safetensors", inputs, convert_pickle_to_safetensors)
+        log(f"   {CONVERTED_NAME}: {'converted' if made else 'present'} (from {', '.join(sorted(convert))})")
+        files[CONVERTED_NAME] = sha
+    return files
+
+
+def variant_files(store, files, variant, log):
+    dtype_name = VARIANT_DTYPES.get(variant)
+    if dtype_name is None:
+        raise StoreError(f"unknown variant {variant!r} (known: {', '.join(VARIANT_DTYPES)})")
+    out = dict(files)
+    for filename, sha in files.items():
+        if filename.endswith(".safetensors"):
+            out[filename], made = store.derive(variant, [sha], cast_safetensors(dtype_name))
+            log(f"   {filename}@{variant}: {'cast' if made else 'present'}")
+        elif filename == "config.json":
+            out[filename], _ = store.derive(f"{variant}-config", [sha], set_config_dtype(dtype_name))
+    return out
+
+
+# -------------------- commands --------------------
+def cmd_lock(args, manifest, store):
+    from huggingface_hub import HfApi
+
+    api = HfApi()
+    for name, entry in select(manifest, args.names):
+        info = api.model_info(entry["repo"], revision=entry["revision"], files_metadata=True)
+        siblings = {s.rfilename: s for s in info.siblings}
+        keep = sorted(f for f in siblings if _matches(f, ALLOWED_FILES))
+        convert = []
+        if not any(f.endswith(".safetensors") for f in keep):
+            convert = sorted(f for f in siblings if _matches(f, CONVERTIBLE_FILES))
+            keep = [f for f in keep if f != "model.safetensors.index.json"]
+        if not any(f.endswith(".safetensors") for f in keep) and not convert:
+            raise StoreError(f"{name}: {entry['repo']}@{entry['revision']} has no loadable weights")
+
+        def locked(filename):
+            sibling = siblings[filename]
+            lfs = sibling.lfs
+            if lfs is not None:
+                sha = lfs["sha256"] if isinstance(lfs, dict) else lfs.sha256
+                return {"sha256": sha, "size": sibling.size}
+            # small git-stored file: hash it by fetching it (it lands in .blobs, so sync reuses it)
+            staging = store.staging()
+            try:
+                path = _downloader(entry["repo"], info.sha, filename)(staging)
+                size = os.path.getsize(path)
+                return {"sha256": store.put_file(path), "size": size}
+            finally:
+                shutil.rmtree(staging, ignore_errors=True)
+
+        previous = entry.get("commit")
+        entry["commit"] = info.sha
+        entry["files"] = {f: locked(f) for f in keep}
+        entry["convert"] = {f: locked(f) for f in convert}
+        if not entry["convert"]:
+            del entry["convert"]
+        change = "unchanged" if previous == info.sha else f"{(previous or 'unlocked')[:12]} -> {info.sha[:12]}"
+        print(f"{name}: {entry['repo']}@{entry['revision']} {change}, {len(keep)} files"
+              + (f", converting {', '.join(convert)}" if convert else ""))
+    save_manifest(args.manifest, manifest)
+
+
+def cmd_sync(args, manifest, store):
+    started = time.perf_counter()
+    for name, entry in select(manifest, args.names):
+        if "commit" not in entry:
+            raise StoreError(f"{name}: not locked, run `model_store.py lock {name}` first")
+        log = print if args.verbose else (lambda *_: None)
+        for filename, meta in entry["files"].items():
+            status = store.ensure_blob(meta["sha256"], _downloader(entry["repo"], entry["commit"], filename),
+                                       f"{name}/{filename}")
+            if status != "present":
+                print(f"   {name}/{filename}: {status} ({_human(meta['size'])})")
+        files = snapshot_files(store, name, entry, log)
+        changed = store.link_snapshot(name, files)
+        print(f"{name}: {'updated' if changed else 'up to date'} ({entry['commit'][:12]})")
+        for variant in entry.get("variants", []):
+            changed = store.link_snapshot(f"{name}@{variant}", variant_files(store, files, variant, log))
+            print(f"{name}@{variant}: {'updated' if changed else 'up to date'}")
+    print(f"-- synced in {time.perf_counter() - started:.1f}s")
+
+
+def cmd_verify(args, manifest, store):
+    """
+    Re-hash every blob (a corrupt one is removed, so the next sync fetches it again),
+    then every snapshot file: it must still be the blob its content names.
+    """
+    bad = 0
+    for dirpath, _, filenames in os.walk(store.blobs):
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            if sha256_file(path) != filename:
+                print(f"   blob {filename[:12]}: corrupt, removed")
+                os.unlink(path)
+                bad += 1
+    for name, entry in select(manifest, args.names):
+        locked = {f: m["sha256"] for f, m in entry.get("files", {}).items()}
+        for snapshot in [name] + [f"{name}@{v}" for v in entry.get("variants", [])]:
+            target = os.path.join(store.root, snapshot)
+            if not os.path.isdir(target):
+                print(f"{snapshot}: missing")
+                bad += 1
+                continue
+            problems = 0
+            for filename in sorted(os.listdir(target)):
+                path = os.path.join(target, filename)
+                sha = sha256_file(path)
+                if snapshot == name and filename in locked and sha != locked[filename]:
+                    print(f"   {snapshot}/{filename}: does not match the lock")
+                    problems += 1
+                elif not store.has_blob(sha) or not os.path.samefile(path, store.blob_path(sha)):
+                    print(f"   {snapshot}/{filename}: not a store file, or modified in place")
+                    problems += 1
+            print(f"{snapshot}: {'ok' if not problems else f'{problems} problem(s)'}")
+            bad += problems
+    if bad:
+        raise StoreError(f"{bad} problem(s) found, run sync to repair")
+
+
+def cmd_status(args, manifest, store):
+    for name, entry in select(manifest, args.names):
+        if "commit" not in entry:
+            print(f"{name:24} {entry['repo']}@{entry['revision']}: not locked")
+            continue
+        size = sum(m["size"] for m in entry["files"].values())
+        files = {f: m["sha256"] for f, m in entry["files"].items()}
+        converted = store.lookup_derived("safetensors", [entry["convert"][f]["sha256"] for f in sorted(entry["convert"])]) \
+            if entry.get("convert") else None
+        if converted:
+            files[CONVERTED_NAME] = converted
+        state = "current" if (not entry.get("convert") or converted) and store.snapshot_current(name, files) else "needs sync"
+        print(f"{name:24} {entry['repo']}@{entry['commit'][:12]} {_human(size):>9} {state}"
+              + (f" variants: {', '.join(entry['variants'])}" if entry.get("variants") else ""))
+    total = 0
+    for dirpath, _, filenames in os.walk(store.blobs):
+        total += sum(os.path.getsize(os.path.join(dirpath, f)) for f in filenames)
+    print(f"-- {store.root}: {_human(total)} in .blobs")
+
+
+def referenced_blobs(manifest, store):
+    """Blobs the locked manifest needs: files, converted weights and variants built so far."""
+    keep = set()
+    for name, entry in manifest["models"].items():
+        files = {f: m["sha256"] for f, m in entry.get("files", {}).items()}
+        convert = entry.get("convert") or {}
+        if convert:
+            inputs = [convert[f]["sha256"] for f in sorted(convert)]
+            converted = store.local_derived("safetensors", inputs)
+            if converted is None:
+                keep.update(inputs)  # not converted yet: the pickles are still needed
+            else:
+                files[CONVERTED_NAME] = converted
+        keep.update(files.values())
+        for variant in entry.get("variants", []):
+            for filename, sha in files.items():
+                op = variant if filename.endswith(".safetensors") else f"{variant}-config"
+                derived = store.local_derived(op, [sha])
+                if derived is not None:
+                    keep.add(derived)
+    return keep
+
+
+def cmd_gc(args, manifest, store):
+    """Remove blobs neither the manifest nor any snapshot uses, and records whose output is gone."""
+    keep = referenced_blobs(manifest, store)
+    freed = 0
+    for dirpath, _, filenames in os.walk(store.blobs):
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            st = os.stat(path)
+            if filename in keep or st.st_nlink > 1:
+                continue
+            freed += st.st_size
+            print(f"   {'would remove' if args.dry_run else 'removed'} {filename[:12]} ({_human(st.st_size)})")
+            if not args.dry_run:
+                os.unlink(path)
+    if os.path.isdir(store.derived) and not args.dry_run:
+        for record in os.listdir(store.derived):
+            path = os.path.join(store.derived, record)
+            with open(path) as f:
+                if not store.has_blob(f.read().strip()):
+                    os.unlink(path)
+    print(f"-- {'would free' if args.dry_run else 'freed'} {_human(freed)}")
+
+
+COMMANDS = {"lock": cmd_lock, "sync": cmd_sync, "verify": cmd_verify, "status": cmd_status, "gc": cmd_gc}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Provision model directories from the pinned manifest")
+    parser.add_argument("command", choices=COMMANDS)
+    parser.add_argument("names", nargs="*", help="manifest entries (default: all)")
+    parser.add_argument("--root", default=config("MODELS_ROOT", default=DEFAULT_MODELS_ROOT))
+    parser.add_argument("--manifest", default=DEFAULT_MANIFEST)
+    parser.add_argument("--source", help="another store root to copy blobs and conversions from")
+    parser.add_argument("--offline", action="store_true", help="never use the network")
+    parser.add_argument("--dry-run", action="store_true", help="gc: only report")
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args()
+
+    if args.offline:
+        os.environ["HF_HUB_OFFLINE"] = "1"
+    if args.offline and args.command == "lock":
+        parser.error("lock needs the network")
+    store = ModelStore(args.root, source=args.source, offline=args.offline)
+    try:
+        COMMANDS[args.command](args, load_manifest(args.manifest), store)
+    except StoreError as e:
+        print(f"error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
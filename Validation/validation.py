@@ -2,52 +2,204 @@ import re
 from datetime import datetime
 
 
+#-------------------------------------------------------------------------------------------------
+# Validation engine
+#
+# Every regex is compiled once here at import, and every validator below is a schema
+# table: a tuple of (field key, checks). A check takes the field value and returns an
+# error message, None when the value passes, or SKIP to stop checking an empty
+# optional field. validate_schema() returns the first error in table order, in the
+# same ({'error': message}, 400) shape the routes already return.
+#-------------------------------------------------------------------------------------------------
+
+PATTERNS = {
+    'arabic': re.compile(r'[\u0600-\u06FF\u0750-\u077F\u08A0-\u08FF]'),
+    'name': re.compile(r'^[a-zA-Z\u0621-\u064A\s\'-]+$'),  # Arabic and English letters, spaces, apostrophes, hyphens
+    'phone': re.compile(r'^\d{10,15}$'),
+}
+
+PASSWORD_MIN_LENGTH = 8
+# (characters, message) in the order the errors are reported
+PASSWORD_CLASSES = (
+    (frozenset('ABCDEFGHIJKLMNOPQRSTUVWXYZ'), "يجب أن تحتوي كلمة المرور على حرف كبير واحد على الأقل"),
+    (frozenset('abcdefghijklmnopqrstuvwxyz'), "يجب أن تحتوي كلمة المرور على حرف صغير واحد على الأقل"),
+    (frozenset('0123456789'), "يجب أن تحتوي كلمة المرور على رقم واحد على الأقل"),
+    (frozenset('!@#$%^&*(),.?":{}|<>'), "يجب أن تحتوي كلمة المرور على رمز خاص واحد على الأقل"),
+)
+
+GENDERS = frozenset(['ذكر', 'انثى'])  # Add more valid options if needed
+FILE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.pdf')
+
+SKIP = object()
+
+
+def password_complexity_error(password):
+    """
+    Returns the first failing password rule's message, or None.
+    The password is scanned once into a set of characters and every rule is a
+    set test on it, instead of one regex scan per rule.
+    """
+    if len(password) < PASSWORD_MIN_LENGTH:
+        return "يجب أن تحتوي كلمة المرور على 8 أحرف على الأقل"
+    chars = set(password)
+    for allowed, message in PASSWORD_CLASSES:
+        if chars.isdisjoint(allowed):
+            return message
+    return None
+
+
+def check_password_complexity(password):
+    """
+    Checks the complexity of the password.
+    - At least one lowercase letter, one uppercase letter, one digit, and one special character.
+    """
+    return password_complexity_error(password) or "ok"
+
+
+# ---- checks ----
+
+def required(message):
+    return lambda value: None if value else message
+
+
+def optional(value):
+    return None if value else SKIP
+
+
+def not_none(message):
+    return lambda value: message if value is None else None
+
+
+def matches(pattern, message):
+    match = PATTERNS[pattern].match
+    return lambda value: None if match(value) else message
+
+
+def excludes(pattern, message):
+    search = PATTERNS[pattern].search
+    return lambda value: message if search(value) else None
+
+
+def is_int(message):
+    return lambda value: None if isinstance(value, int) else message
+
+
+def is_bool(message):
+    return lambda value: None if isinstance(value, bool) else message
+
+
+def non_empty_list(message):
+    return lambda value: None if isinstance(value, list) and value else message
+
+
+def is_list(message):
+    return lambda value: None if isinstance(value, list) else message
+
+
+def phone_964(value):
+    if not value.startswith("964") or len(value) != 13:
+        return 'يجب أن يبدأ رقم الهاتف بـ 964 ويكون مكونًا من 13 رقمًا'
+    if not value.isdigit():
+        return 'يجب أن يحتوي رقم الهاتف على أرقام فقط'
+    return None
+
+
+def past_date(value):
+    try:
+        if datetime.strptime(value, '%Y-%m-%d') > datetime.now():
+            return 'لا يمكن أن يكون تاريخ الميلاد في المستقبل'
+    except ValueError:
+        return 'يجب أن يكون تاريخ الميلاد بتنسيق YYYY-MM-DD'
+    return None
+
+
+def valid_gender(value):
+    return None if value.lower() in GENDERS else 'الجنس غير صحيح. الخيارات المتاحة هي ذكر أو انثى'
+
+
+def file_type(value):
+    if value.filename.lower().endswith(FILE_EXTENSIONS):
+        return None
+    return 'يجب أن تكون الصورة بتنسيق PNG أو JPG أو JPEG أو pdf'
+
+
+def name_checks(field_name, is_required=True):
+    return (required(f'الحقل {field_name} مطلوب') if is_required else optional,
+            matches('name', f'يجب أن يحتوي {field_name} على أحرف فقط'))
+
+
+# ---- engine ----
+
+def validate_value(checks, value):
+    for check in checks:
+        message = check(value)
+        if message is SKIP:
+            return None
+        if message:
+            return {'error': message}, 400
+    return None
+
+
+def validate_schema(schema, data):
+    for key, checks in schema:
+        error = validate_value(checks, data.get(key))
+        if error:
+            return error
+    return None
+
+
+# ---- shared field checks ----
+
+USERNAME_CHECKS = (required('اسم المستخدم مطلوب'),)
+PASSWORD_CHECKS = (required('كلمة المرور مطلوبة'), password_complexity_error)
+PHONE_CHECKS = (required('رقم الهاتف مطلوب'), matches('phone', 'يجب أن يحتوي رقم الهاتف على 10 إلى 15 رقما'))
+NATIONAL_NUMBER_CHECKS = (required('رقم الهاتف مطلوب'),
+                          matches('phone', 'يجب أن تحتوي رقم البطاقة الموحدة على 10 إلى 15 رقما'))
+PHONE_964_CHECKS = (required('رقم الهاتف مطلوب'), phone_964)
+ORGID_CHECKS = (required('رقم المجموعة مطلوب'), is_int('يجب أن يكون رقم المجموعة عدد صحيح'))
+BIRTHDATE_CHECKS = (required('تاريخ الميلاد مطلوب'), past_date)
+GENDER_CHECKS = (required('الجنس مطلوب'), valid_gender)
+CARD_PHOTO_CHECKS = (required('صورة بطاقة الناخب مطلوبة'), file_type)
+REQUEST_USERNAME_CHECKS = (required('اسم المستخدم مطلوب في الطلب'),
+                           excludes('arabic', 'يجب ألا يحتوي اسم المستخدم على أحرف عربية'))
+REQUEST_PASSWORD_CHECKS = (required('كلمة المرور مطلوبة في الطلب'), password_complexity_error)
+ROLES_CHECKS = (non_empty_list('يجب تحديد الصلاحيات'),)
+
+USER_NAME_FIELDS = (
+    ('usfirstname', name_checks('الاسم الأول')),
+    ('ussecondname', name_checks('الاسم الثاني')),
+    ('usthirdname', name_checks('الاسم الثالث')),
+    ('usforthname', name_checks('الاسم الرابع')),
+    ('ussurname', name_checks('اللقب')),
+)
+
+SUBSTRATE_NAME_FIELDS = (
+    ('name', name_checks('الاسم الأول')),
+    ('father_name', name_checks('اسم الأب')),
+    ('third_name', name_checks('الاسم الثالث')),
+    ('forth_name', name_checks('الاسم الرابع', is_required=False)),
+    ('surn_ame', name_checks('اللقب', is_required=False)),
+)
+
+
 class LoginValidator:
     """
     A class to handle the validation of login request fields like UsUsername and UsPassword.
     """
 
-    @staticmethod
-    def check_password_complexity(password):
-        """
-        Checks the complexity of the password.
-        - At least one lowercase letter, one uppercase letter, one digit, and one special character.
-        """
-        if len(password) < 8:
-            return "يجب أن تحتوي كلمة المرور على 8 أحرف على الأقل"
-        if not re.search(r'[A-Z]', password):
-            return "يجب أن تحتوي كلمة المرور على حرف كبير واحد على الأقل"
-        if not re.search(r'[a-z]', password):
-            return "يجب أن تحتوي كلمة المرور على حرف صغير واحد على الأقل"
-        if not re.search(r'[0-9]', password):
-            return "يجب أن تحتوي كلمة المرور على رقم واحد على الأقل"
-        if not re.search(r'[!@#$%^&*(),.?\":{}|<>]', password):
-            return "يجب أن تحتوي كلمة المرور على رمز خاص واحد على الأقل"
-        return "ok"
+    USERNAME_SCHEMA = (('UsUsername', REQUEST_USERNAME_CHECKS),)
+    PASSWORD_SCHEMA = (('UsPassword', REQUEST_PASSWORD_CHECKS),)
+
+    check_password_complexity = staticmethod(check_password_complexity)
 
     @staticmethod
     def validate_ususername(data):
         """
         Validates the 'UsUsername' field.
         - Must be present in the request.
-        - Must contain only English letters.
+        - Must not contain Arabic letters.
         """
-        ususername = data.get('UsUsername')
-        
-        # Check if UsUsername is provided
-        if not ususername:
-            return {'error': 'اسم المستخدم مطلوب في الطلب'}, 400
-        
-        # # Check if UsUsername contains only English letters
-        # if not re.match(r'^[A-Za-z0-9._-]+$', ususername):
-        #     return {'error': 'يجب أن يحتوي اسم المستخدم على أحرف إنجليزية فقط'}, 400
-        
-        # Check if UsUsername contains Arabic letters
-        if re.search(r'[\u0600-\u06FF\u0750-\u077F\u08A0-\u08FF]', ususername):
-            return {'error': 'يجب ألا يحتوي اسم المستخدم على أحرف عربية'}, 400
-
-        # If validation passes, return None (indicating no errors)
-        return None
+        return validate_schema(LoginValidator.USERNAME_SCHEMA, data)
 
     @staticmethod
     def validate_uspassword(data):
@@ -56,19 +208,7 @@ class LoginValidator:
         - Must be present in the request.
         - Must meet the complexity requirements.
         """
-        uspassword = data.get('UsPassword')
-
-        # Check if UsPassword is provided
-        if not uspassword:
-            return {'error': 'كلمة المرور مطلوبة في الطلب'}, 400
-
-        # Check password complexity
-        complexity_message = LoginValidator.check_password_complexity(uspassword)
-        if complexity_message != "ok":
-            return {'error': complexity_message}, 400
-
-        # If validation passes, return None (indicating no errors)
-        return None
+        return validate_schema(LoginValidator.PASSWORD_SCHEMA, data)
 
     @staticmethod
     def validate_login_data(data):
@@ -95,10 +235,6 @@ class LoginValidator:
             if error:
                 return error
 
-            # error = LoginValidator.validate_uspassword(data)
-            # if error:
-            #     return error
-
         # Case 4: If only UsPhone is provided, validation passes (no need to check username or password)
         if usphone:
             return None  # UsPhone is valid, so no errors
@@ -119,45 +255,23 @@ class ChangePhoneNumberValidator:
     A class to handle the validation of change phone number request fields like new_phone_number.
     """
 
+    SCHEMA = (('new_phone_number', (required('يجب كتابة رقم الهاتف الجديد'), phone_964)),)
+
     @staticmethod
     def check_964_phone_number(new_phone_number):
         """
-        Checks the complexity of the phone number.
+        Checks the phone number.
         - Must start with 964 and have exactly 13 digits.
         """
-        # Check if new_phone_number is provided
-        if not new_phone_number:
-            return {'error': 'رقم الهاتف مطلوب'}, 400
-        
-        # Ensure the phone number starts with 964 and has exactly 13 digits
-        if not new_phone_number.startswith("964") or len(new_phone_number) != 13:
-            return {'error': 'يجب أن يبدأ رقم الهاتف بـ 964 ويكون مكونًا من 13 رقمًا'}, 400
-        
-        # Ensure it contains only digits
-        if not new_phone_number.isdigit():
-            return {'error': 'يجب أن يحتوي رقم الهاتف على أرقام فقط'}, 400
-
-        return None  # No errors, valid phone number
+        return validate_value(PHONE_964_CHECKS, new_phone_number)
 
     @staticmethod
     def validate_change_phone_number_data(data):
         """
         Validates the change phone number request data.
         """
+        return validate_schema(ChangePhoneNumberValidator.SCHEMA, data)
 
-        new_phone_number = data.get('new_phone_number')
-
-        # Check if new_phone_number is provided
-        if not new_phone_number:
-            return {'error': 'يجب كتابة رقم الهاتف الجديد'}, 400
-
-        # Validate the phone number format (starting with 964 and 13 digits)
-        error = ChangePhoneNumberValidator.check_964_phone_number(new_phone_number)
-        if error:
-            return error
-
-        return None  # All validations passed
-    
 
 
 #-------------------------------------------------------------------------------------------------
@@ -167,23 +281,7 @@ class ChangePasswordValidator:
     A class to handle the validation of password change request fields like new_password.
     """
 
-    @staticmethod
-    def check_password_complexity(password):
-        """
-        Checks the complexity of the password.
-        - At least one lowercase letter, one uppercase letter, one digit, and one special character.
-        """
-        if len(password) < 8:
-            return "يجب أن تحتوي كلمة المرور على 8 أحرف على الأقل"
-        if not re.search(r'[A-Z]', password):
-            return "يجب أن تحتوي كلمة المرور على حرف كبير واحد على الأقل"
-        if not re.search(r'[a-z]', password):
-            return "يجب أن تحتوي كلمة المرور على حرف صغير واحد على الأقل"
-        if not re.search(r'[0-9]', password):
-            return "يجب أن تحتوي كلمة المرور على رقم واحد على الأقل"
-        if not re.search(r'[!@#$%^&*(),.?\":{}|<>]', password):
-            return "يجب أن تحتوي كلمة المرور على رمز خاص واحد على الأقل"
-        return "ok"
+    check_password_complexity = staticmethod(check_password_complexity)
 
     @staticmethod
     def validate_change_password_data(data):
@@ -204,12 +302,8 @@ class ChangePasswordValidator:
             return {'error': 'كلمة المرور وتأكيد كلمة المرور غير متطابقتين'}, 400
 
         # Validate password complexity
-        complexity_message = ChangePasswordValidator.check_password_complexity(new_password)
-        if complexity_message != "ok":
-            return {'error': complexity_message}, 400
+        return validate_value((password_complexity_error,), new_password)
 
-        return None  # All validations passed
-    
 
 #-------------------------------------------------------------------------------------------------
 
@@ -218,46 +312,23 @@ class CreateUserValidator:
     A class to handle the validation of creating a new user.
     """
 
-    @staticmethod
-    def check_password_complexity(password):
-        """
-        Checks the complexity of the password.
-        - At least one lowercase letter, one uppercase letter, one digit, and one special character.
-        """
-        if len(password) < 8:
-            return "يجب أن تحتوي كلمة المرور على 8 أحرف على الأقل"
-        if not re.search(r'[A-Z]', password):
-            return "يجب أن تحتوي كلمة المرور على حرف كبير واحد على الأقل"
-        if not re.search(r'[a-z]', password):
-            return "يجب أن تحتوي كلمة المرور على حرف صغير واحد على الأقل"
-        if not re.search(r'[0-9]', password):
-            return "يجب أن تحتوي كلمة المرور على رقم واحد على الأقل"
-        if not re.search(r'[!@#$%^&*(),.?\":{}|<>]', password):
-            return "يجب أن تحتوي كلمة المرور على رمز خاص واحد على الأقل"
-        return "ok"
+    USERNAME_SCHEMA = (('ususername', REQUEST_USERNAME_CHECKS),)
+    PASSWORD_SCHEMA = (('uspassword', REQUEST_PASSWORD_CHECKS),)
+    ROLES_ORGID_SCHEMA = (
+        ('roles_id', ROLES_CHECKS),
+        ('orgid', (required('يجب تحديد التشكيل او المجموعة'),)),
+    )
+
+    check_password_complexity = staticmethod(check_password_complexity)
 
     @staticmethod
     def validate_ususername(data):
         """
         Validates the 'ususername' field.
         - Must be present in the request.
-        - Must contain only English letters.
+        - Must not contain Arabic letters.
         """
-        ususername = data.get('ususername')
-
-        # Check if UsUsername is provided
-        if not ususername:
-            return {'error': 'اسم المستخدم مطلوب في الطلب'}, 400
-        
-        # # Check if UsUsername contains only English letters
-        # if not re.match(r'^[A-Za-z0-9._-]+$', ususername):
-        #     return {'error': 'يجب أن يحتوي اسم المستخدم على أحرف إنجليزية فقط'}, 400
-        
-        # Check if UsUsername contains Arabic letters
-        if re.search(r'[\u0600-\u06FF\u0750-\u077F\u08A0-\u08FF]', ususername):
-            return {'error': 'يجب ألا يحتوي اسم المستخدم على أحرف عربية'}, 400
-
-        return None
+        return validate_schema(CreateUserValidator.USERNAME_SCHEMA, data)
 
     @staticmethod
     def validate_uspassword(data):
@@ -266,37 +337,16 @@ class CreateUserValidator:
         - Must be present in the request.
         - Must meet the complexity requirements.
         """
-        uspassword = data.get('uspassword')
-
-        # Check if UsPassword is provided
-        if not uspassword:
-            return {'error': 'كلمة المرور مطلوبة في الطلب'}, 400
-
-        # Check password complexity
-        complexity_message = CreateUserValidator.check_password_complexity(uspassword)
-        if complexity_message != "ok":
-            return {'error': complexity_message}, 400
-
-        return None
+        return validate_schema(CreateUserValidator.PASSWORD_SCHEMA, data)
 
     @staticmethod
     def validate_roles_orgid(data):
         """
         Validates the 'roles_id' and 'orgID' fields.
-        - Must be present in the request.
-        - roles_id must be a list.
-        - orgID must be present and valid.
+        - roles_id must be a non-empty list.
+        - orgID must be present.
         """
-        roles_id = data.get('roles_id')
-        orgID = data.get('orgid')
-
-        if not roles_id or not isinstance(roles_id, list) or len(roles_id) == 0:
-            return {'error': 'يجب تحديد الصلاحيات'}, 400
-
-        if not orgID:
-            return {'error': 'يجب تحديد التشكيل او المجموعة'}, 400
-
-        return None
+        return validate_schema(CreateUserValidator.ROLES_ORGID_SCHEMA, data)
 
     @staticmethod
     def validate_create_user_data(data):
@@ -305,7 +355,6 @@ class CreateUserValidator:
         - Validate ususername and uspassword together.
         - Validate roles_id and orgID.
         """
-        # Validate Username and Password
         ususername = data.get('ususername')
         uspassword = data.get('uspassword')
 
@@ -313,20 +362,12 @@ class CreateUserValidator:
             return {'error': 'يجب كتابة كل من اسم المستخدم وكلمة المرور معًا'}, 400
 
         if ususername and uspassword:
-            error = CreateUserValidator.validate_ususername(data)
-            if error:
-                return error
-
-            error = CreateUserValidator.validate_uspassword(data)
+            error = validate_schema(CreateUserValidator.USERNAME_SCHEMA + CreateUserValidator.PASSWORD_SCHEMA, data)
             if error:
                 return error
 
         # Validate Roles and Organization ID
-        error = CreateUserValidator.validate_roles_orgid(data)
-        if error:
-            return error
-
-        return None  # All validations passed
+        return validate_schema(CreateUserValidator.ROLES_ORGID_SCHEMA, data)
 
 #-------------------------------------------------------------------------------------------------
 
@@ -335,27 +376,30 @@ class UserEditValidator:
     A class to handle the validation of the user edit request.
     """
 
+    ROLES_SCHEMA = (('roles_id', ROLES_CHECKS),)
+    ORGID_SCHEMA = (('orgid', (not_none('يجب تحديد قائمة التشكيل او المجموعة'),)),)
+    USISACTIVE_SCHEMA = (('usisactive', (is_bool('يجب أن تكون حالة النشاط (usisactive) إما True أو False'),)),)
+    PERMISSIONS_SCHEMA = (('user_permissions', ROLES_CHECKS),)
+    RECORD_LIST_CHECKS = (is_list('يجب أن تكون recordid قائمة'),)
+
+    # usisactive and recordid are not enforced on edit
+    SCHEMA = ROLES_SCHEMA + ORGID_SCHEMA
+
     @staticmethod
     def validate_roles_id(data):
         """
         Validates the 'roles_id' field.
         - Must be a list and must not be empty.
         """
-        roles_id = data.get('roles_id', [])
-        if not isinstance(roles_id, list) or len(roles_id) == 0:
-            return {'error': 'يجب تحديد الصلاحيات'}, 400
-        return None
+        return validate_schema(UserEditValidator.ROLES_SCHEMA, data)
 
     @staticmethod
     def validate_orgid_list(data):
         """
         Validates the 'orgid_list' field.
-        - Must be a list and must not be empty.
+        - Must be present.
         """
-        orgid_list = data.get('orgid')
-        if orgid_list is None:
-            return {'error': 'يجب تحديد قائمة التشكيل او المجموعة'}, 400
-        return None
+        return validate_schema(UserEditValidator.ORGID_SCHEMA, data)
 
     @staticmethod
     def validate_usisactive(data):
@@ -363,10 +407,7 @@ class UserEditValidator:
         Validates the 'usisactive' field.
         - Must be a boolean value.
         """
-        usisactive = data.get('usisactive')
-        if not isinstance(usisactive, bool):
-            return {'error': 'يجب أن تكون حالة النشاط (usisactive) إما True أو False'}, 400
-        return None
+        return validate_schema(UserEditValidator.USISACTIVE_SCHEMA, data)
 
     @staticmethod
     def validate_permissions(data):
@@ -374,10 +415,7 @@ class UserEditValidator:
         Validates the 'user_permissions' field.
         - Must be a list and must not be empty.
         """
-        permissions = data.get('user_permissions', [])
-        if not isinstance(permissions, list) or len(permissions) == 0:
-            return {'error': 'يجب تحديد الصلاحيات'}, 400
-        return None
+        return validate_schema(UserEditValidator.PERMISSIONS_SCHEMA, data)
 
     @staticmethod
     def validate_record_list(data):
@@ -385,56 +423,14 @@ class UserEditValidator:
         Validates the 'record_list' field.
         - Must be a list and can be optional.
         """
-        record_list = data.get('recordid', [])
-        if not isinstance(record_list, list):
-            return {'error': 'يجب أن تكون recordid قائمة'}, 400
-        return None
+        return validate_value(UserEditValidator.RECORD_LIST_CHECKS, data.get('recordid', []))
 
     @staticmethod
     def validate_edit_user_data(data):
         """
         Validates the entire data for editing a user.
         """
-
-        # Validate roles_id
-        error = UserEditValidator.validate_roles_id(data)
-        if error:
-            return error
-
-        # Validate orgid_list
-        error = UserEditValidator.validate_orgid_list(data)
-        if error:
-            return error
-
-        # # Validate usisactive (must be boolean)
-        # error = UserEditValidator.validate_usisactive(data)
-        # if error:
-        #     return error
-
-        # # Validate record_list (optional, but must be a list if present)
-        # error = UserEditValidator.validate_record_list(data)
-        # if error:
-        #     return error
-
-        return None  # All validations passed
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
+        return validate_schema(UserEditValidator.SCHEMA, data)
 
 
 #-------------------------------------------------------------------------------------------------
@@ -445,21 +441,23 @@ class AddUserValidator:
     A class to handle the validation of fields for the 'add_user' API.
     """
 
+    SCHEMA = (
+        ('ususername', USERNAME_CHECKS),
+        ('uspassword', PASSWORD_CHECKS),
+        ('usphoneno', PHONE_CHECKS),
+        ('orgid', ORGID_CHECKS),
+    ) + USER_NAME_FIELDS + (
+        ('usbirthdate', BIRTHDATE_CHECKS),
+        ('usgender', GENDER_CHECKS),
+    )
+
     @staticmethod
     def validate_ususername(ususername):
         """
         Validates the 'ususername' field.
         - Must be provided.
-        - Must contain only valid alphanumeric characters and allowed symbols.
         """
-        if not ususername:
-            return {'error': 'اسم المستخدم مطلوب'}, 400
-        
-        # # Check if UsUsername contains only valid alphanumeric characters and allowed symbols
-        # if not re.match(r'^[A-Za-z0-9._-]+$', ususername):
-        #     return {'error': 'يجب أن يحتوي اسم المستخدم على أحرف إنجليزية أو أرقام أو رموز (._-)'}, 400
-
-        return None
+        return validate_value(USERNAME_CHECKS, ususername)
 
     @staticmethod
     def validate_uspassword(uspassword):
@@ -468,23 +466,7 @@ class AddUserValidator:
         - Must be provided.
         - Must meet complexity requirements.
         """
-        if not uspassword:
-            return {'error': 'كلمة المرور مطلوبة'}, 400
-
-        # Check password complexity
-        if len(uspassword) < 8:
-            return {'error': 'يجب أن تحتوي كلمة المرور على 8 أحرف على الأقل'}, 400
-        if not re.search(r'[A-Z]', uspassword):
-            return {'error': 'يجب أن تحتوي كلمة المرور على حرف كبير واحد على الأقل'}, 400
-        if not re.search(r'[a-z]', uspassword):
-            return {'error': 'يجب أن تحتوي كلمة المرور على حرف صغير واحد على الأقل'}, 400
-        if not re.search(r'[0-9]', uspassword):
-            return {'error': 'يجب أن تحتوي كلمة المرور على رقم واحد على الأقل'}, 400
-        if not re.search(r'[!@#$%^&*(),.?\":{}|<>]', uspassword):
-            return {'error': 'يجب أن تحتوي كلمة المرور على رمز خاص واحد على الأقل'}, 400
-
-        return None
-    
+        return validate_value(PASSWORD_CHECKS, uspassword)
 
     @staticmethod
     def validate_usname(name, field_name):
@@ -492,13 +474,7 @@ class AddUserValidator:
         Validates name fields (firstname, secondname, etc.).
         - Must contain only alphabetic characters, spaces, apostrophes, or hyphens.
         """
-        if not name:
-            return {'error': f'الحقل {field_name} مطلوب'}, 400
-        
-        if not re.match(r'^[a-zA-Z\u0621-\u064A\s\'-]+$', name):  # Supports Arabic and English letters, spaces, apostrophes, hyphens
-            return {'error': f'يجب أن يحتوي {field_name} على أحرف فقط'}, 400
-
-        return None
+        return validate_value(name_checks(field_name), name)
 
     @staticmethod
     def validate_usbirthdate(birthdate):
@@ -507,20 +483,7 @@ class AddUserValidator:
         - Must be a valid date in 'YYYY-MM-DD' format.
         - Must not be in the future.
         """
-        if not birthdate:
-            return {'error': 'تاريخ الميلاد مطلوب'}, 400
-        
-        try:
-            # Ensure date is in correct format
-            birth_date = datetime.strptime(birthdate, '%Y-%m-%d')
-            
-            # Check if birthdate is in the future
-            if birth_date > datetime.now():
-                return {'error': 'لا يمكن أن يكون تاريخ الميلاد في المستقبل'}, 400
-        except ValueError:
-            return {'error': 'يجب أن يكون تاريخ الميلاد بتنسيق YYYY-MM-DD'}, 400
-
-        return None
+        return validate_value(BIRTHDATE_CHECKS, birthdate)
 
     @staticmethod
     def validate_usgender(gender):
@@ -528,31 +491,15 @@ class AddUserValidator:
         Validates the 'usgender' field.
         - Must be one of the predefined valid options (e.g., 'ذكر', 'انثى').
         """
-        valid_genders = ['ذكر', 'انثى']  # Add more valid options if needed
-        
-        if not gender:
-            return {'error': 'الجنس مطلوب'}, 400
-        
-        if gender.lower() not in valid_genders:
-            return {'error': 'الجنس غير صحيح. الخيارات المتاحة هي ذكر أو انثى'}, 400
-
-        return None
-
+        return validate_value(GENDER_CHECKS, gender)
 
     @staticmethod
     def validate_usphoneno(usphoneno):
         """
         Validates the 'usphoneno' field.
-        - Must be a valid phone number.
+        - Must contain 10-15 digits.
         """
-        if not usphoneno:
-            return {'error': 'رقم الهاتف مطلوب'}, 400
-
-        # Example of a phone number validation (must contain 10-15 digits)
-        if not re.match(r'^\d{10,15}$', usphoneno):
-            return {'error': 'يجب أن يحتوي رقم الهاتف على 10 إلى 15 رقما'}, 400
-
-        return None
+        return validate_value(PHONE_CHECKS, usphoneno)
 
     @staticmethod
     def validate_orgid(orgID):
@@ -560,236 +507,34 @@ class AddUserValidator:
         Validates the 'orgid' field.
         - Must be provided and be a valid integer.
         """
-        if not orgID:
-            return {'error': 'رقم المجموعة مطلوب'}, 400
-
-        if not isinstance(orgID, int):
-            return {'error': 'يجب أن يكون رقم المجموعة عدد صحيح'}, 400
-
-        return None
+        return validate_value(ORGID_CHECKS, orgID)
 
     @staticmethod
     def validate_add_user_data(data):
         """
         Validates the entire user data for the 'add_user' API.
         """
-        # Validate UsUsername
-        error = AddUserValidator.validate_ususername(data.get('ususername'))
-        if error:
-            return error
-
-        # Validate UsPassword
-        error = AddUserValidator.validate_uspassword(data.get('uspassword'))
-        if error:
-            return error
-
-        # Validate UsPhoneNo
-        error = AddUserValidator.validate_usphoneno(data.get('usphoneno'))
-        if error:
-            return error
-
-        # Validate OrgID
-        error = AddUserValidator.validate_orgid(data.get('orgid'))
-        if error:
-            return error
-        
-        # Validate Name fields (firstname, secondname, thirdname, forthname, surname)
-        error = AddUserValidator.validate_usname(data.get('usfirstname'), 'الاسم الأول')
-        if error:
-            return error
-
-        error = AddUserValidator.validate_usname(data.get('ussecondname'), 'الاسم الثاني')
-        if error:
-            return error
-
-        error = AddUserValidator.validate_usname(data.get('usthirdname'), 'الاسم الثالث')
-        if error:
-            return error
-
-        error = AddUserValidator.validate_usname(data.get('usforthname'), 'الاسم الرابع')
-        if error:
-            return error
-
-        error = AddUserValidator.validate_usname(data.get('ussurname'), 'اللقب')
-        if error:
-            return error
-
-        # Validate Birthdate
-        error = AddUserValidator.validate_usbirthdate(data.get('usbirthdate'))
-        if error:
-            return error
-
-        # Validate Gender
-        error = AddUserValidator.validate_usgender(data.get('usgender'))
-        if error:
-            return error
+        return validate_schema(AddUserValidator.SCHEMA, data)
 
-        # If all validations pass, return None
-        return None
-    
 
 
 #-------------------------------------------------------------------------------------------------
 
-# Structure the AddUserValidator class to handle validation for the add_user API.
-class EditUserValidator:
+# Same fields as AddUserValidator, without the password.
+class EditUserValidator(AddUserValidator):
     """
-    A class to handle the validation of fields for the 'add_user' API.
+    A class to handle the validation of fields for the 'edit_user' API.
     """
 
-    @staticmethod
-    def validate_ususername(ususername):
-        """
-        Validates the 'ususername' field.
-        - Must be provided.
-        - Must contain only valid alphanumeric characters and allowed symbols.
-        """
-        if not ususername:
-            return {'error': 'اسم المستخدم مطلوب'}, 400
-        
-        # # Check if UsUsername contains only valid alphanumeric characters and allowed symbols
-        # if not re.match(r'^[A-Za-z0-9._-]+$', ususername):
-        #     return {'error': 'يجب أن يحتوي اسم المستخدم على أحرف إنجليزية أو أرقام أو رموز (._-)'}, 400
-
-        return None
-    
-
-    @staticmethod
-    def validate_usname(name, field_name):
-        """
-        Validates name fields (firstname, secondname, etc.).
-        - Must contain only alphabetic characters, spaces, apostrophes, or hyphens.
-        """
-        if not name:
-            return {'error': f'الحقل {field_name} مطلوب'}, 400
-        
-        if not re.match(r'^[a-zA-Z\u0621-\u064A\s\'-]+$', name):  # Supports Arabic and English letters, spaces, apostrophes, hyphens
-            return {'error': f'يجب أن يحتوي {field_name} على أحرف فقط'}, 400
-
-        return None
-
-    @staticmethod
-    def validate_usbirthdate(birthdate):
-        """
-        Validates the 'usbirthdate' field.
-        - Must be a valid date in 'YYYY-MM-DD' format.
-        - Must not be in the future.
-        """
-        if not birthdate:
-            return {'error': 'تاريخ الميلاد مطلوب'}, 400
-        
-        try:
-            # Ensure date is in correct format
-            birth_date = datetime.strptime(birthdate, '%Y-%m-%d')
-            
-            # Check if birthdate is in the future
-            if birth_date > datetime.now():
-                return {'error': 'لا يمكن أن يكون تاريخ الميلاد في المستقبل'}, 400
-        except ValueError:
-            return {'error': 'يجب أن يكون تاريخ الميلاد بتنسيق YYYY-MM-DD'}, 400
-
-        return None
-
-    @staticmethod
-    def validate_usgender(gender):
-        """
-        Validates the 'usgender' field.
-        - Must be one of the predefined valid options (e.g., 'ذكر', 'انثى').
-        """
-        valid_genders = ['ذكر', 'انثى']  # Add more valid options if needed
-        
-        if not gender:
-            return {'error': 'الجنس مطلوب'}, 400
-        
-        if gender.lower() not in valid_genders:
-            return {'error': 'الجنس غير صحيح. الخيارات المتاحة هي ذكر أو انثى'}, 400
-
-        return None
-
-
-    @staticmethod
-    def validate_usphoneno(usphoneno):
-        """
-        Validates the 'usphoneno' field.
-        - Must be a valid phone number.
-        """
-        if not usphoneno:
-            return {'error': 'رقم الهاتف مطلوب'}, 400
-
-        # Example of a phone number validation (must contain 10-15 digits)
-        if not re.match(r'^\d{10,15}$', usphoneno):
-            return {'error': 'يجب أن يحتوي رقم الهاتف على 10 إلى 15 رقما'}, 400
-
-        return None
-
-    @staticmethod
-    def validate_orgid(orgID):
-        """
-        Validates the 'orgid' field.
-        - Must be provided and be a valid integer.
-        """
-        if not orgID:
-            return {'error': 'رقم المجموعة مطلوب'}, 400
-
-        if not isinstance(orgID, int):
-            return {'error': 'يجب أن يكون رقم المجموعة عدد صحيح'}, 400
-
-        return None
+    SCHEMA = tuple(field for field in AddUserValidator.SCHEMA if field[0] != 'uspassword')
 
     @staticmethod
     def validate_add_user_data(data):
         """
-        Validates the entire user data for the 'add_user' API.
+        Validates the entire user data for the 'edit_user' API.
         """
-        # Validate UsUsername
-        error = AddUserValidator.validate_ususername(data.get('ususername'))
-        if error:
-            return error
-
-        # Validate UsPhoneNo
-        error = AddUserValidator.validate_usphoneno(data.get('usphoneno'))
-        if error:
-            return error
-
-        # Validate OrgID
-        error = AddUserValidator.validate_orgid(data.get('orgid'))
-        if error:
-            return error
-        
-        # Validate Name fields (firstname, secondname, thirdname, forthname, surname)
-        error = AddUserValidator.validate_usname(data.get('usfirstname'), 'الاسم الأول')
-        if error:
-            return error
-
-        error = AddUserValidator.validate_usname(data.get('ussecondname'), 'الاسم الثاني')
-        if error:
-            return error
-
-        error = AddUserValidator.validate_usname(data.get('usthirdname'), 'الاسم الثالث')
-        if error:
-            return error
-
-        error = AddUserValidator.validate_usname(data.get('usforthname'), 'الاسم الرابع')
-        if error:
-            return error
-
-        error = AddUserValidator.validate_usname(data.get('ussurname'), 'اللقب')
-        if error:
-            return error
-
-        # Validate Birthdate
-        error = AddUserValidator.validate_usbirthdate(data.get('usbirthdate'))
-        if error:
-            return error
-
-        # Validate Gender
-        error = AddUserValidator.validate_usgender(data.get('usgender'))
-        if error:
-            return error
+        return validate_schema(EditUserValidator.SCHEMA, data)
 
-        # If all validations pass, return None
-        return None
-    
 
 #-------------------------------------------------------------------------------------------------
 class AddSubstrateValidator:
@@ -797,6 +542,14 @@ class AddSubstrateValidator:
     A class to handle the validation of fields for the Substrate API.
     """
 
+    SCHEMA = SUBSTRATE_NAME_FIELDS + (
+        ('birth_date', BIRTHDATE_CHECKS),
+        ('national_number', NATIONAL_NUMBER_CHECKS),
+        ('phone_number', PHONE_CHECKS),
+        ('gender', GENDER_CHECKS),
+    )
+    FILES_SCHEMA = (('card_photo', CARD_PHOTO_CHECKS),)
+
     @staticmethod
     def validate_Elname(name, field_name, required=True):
         """
@@ -804,297 +557,71 @@ class AddSubstrateValidator:
         - Must contain only alphabetic characters, spaces, apostrophes, or hyphens.
         - If required is False, it will only validate if a value is provided.
         """
-        if required and not name:
-            return {'error': f'الحقل {field_name} مطلوب'}, 400
-        
-        if name and not re.match(r'^[a-zA-Z\u0621-\u064A\s\'-]+$', name):  # Supports Arabic and English letters, spaces, apostrophes, hyphens
-            return {'error': f'يجب أن يحتوي {field_name} على أحرف فقط'}, 400
+        return validate_value(name_checks(field_name, required), name)
 
-        return None
-    
     @staticmethod
     def validate_Elbirthdate(birthdate):
         """
-        Validates the 'usbirthdate' field.
+        Validates the 'birth_date' field.
         - Must be a valid date in 'YYYY-MM-DD' format.
         - Must not be in the future.
         """
-        if not birthdate:
-            return {'error': 'تاريخ الميلاد مطلوب'}, 400
-        
-        try:
-            # Ensure date is in correct format
-            birth_date = datetime.strptime(birthdate, '%Y-%m-%d')
-            
-            # Check if birthdate is in the future
-            if birth_date > datetime.now():
-                return {'error': 'لا يمكن أن يكون تاريخ الميلاد في المستقبل'}, 400
-        except ValueError:
-            return {'error': 'يجب أن يكون تاريخ الميلاد بتنسيق YYYY-MM-DD'}, 400
+        return validate_value(BIRTHDATE_CHECKS, birthdate)
 
-        return None
-    
     @staticmethod
     def validate_gender(gender):
         """
-        Validates the 'usgender' field.
+        Validates the 'gender' field.
         - Must be one of the predefined valid options (e.g., 'ذكر', 'انثى').
         """
-        valid_genders = ['ذكر', 'انثى']  # Add more valid options if needed
-        
-        if not gender:
-            return {'error': 'الجنس مطلوب'}, 400
-        
-        if gender.lower() not in valid_genders:
-            return {'error': 'الجنس غير صحيح. الخيارات المتاحة هي ذكر أو انثى'}, 400
-
-        return None
-
+        return validate_value(GENDER_CHECKS, gender)
 
     @staticmethod
     def validate_phone_number(usphoneno):
         """
-        Validates the 'usphoneno' field.
-        - Must be a valid phone number.
+        Validates the 'phone_number' field.
+        - Must contain 10-15 digits.
         """
-        if not usphoneno:
-            return {'error': 'رقم الهاتف مطلوب'}, 400
-
-        # Example of a phone number validation (must contain 10-15 digits)
-        if not re.match(r'^\d{10,15}$', usphoneno):
-            return {'error': 'يجب أن يحتوي رقم الهاتف على 10 إلى 15 رقما'}, 400
+        return validate_value(PHONE_CHECKS, usphoneno)
 
-        return None
-    
     @staticmethod
-    def validate_national_numberr(usphoneno):
+    def validate_national_numberr(national_number):
         """
-        Validates the 'usphoneno' field.
-        - Must be a valid phone number.
+        Validates the 'national_number' field.
+        - Must contain 10-15 digits.
         """
-        if not usphoneno:
-            return {'error': 'رقم الهاتف مطلوب'}, 400
-
-        # Example of a phone number validation (must contain 10-15 digits)
-        if not re.match(r'^\d{10,15}$', usphoneno):
-            return {'error': 'يجب أن تحتوي رقم البطاقة الموحدة على 10 إلى 15 رقما'}, 400
+        return validate_value(NATIONAL_NUMBER_CHECKS, national_number)
 
-        return None
-    
     @staticmethod
     def validate_file(card_photo):
         """
         Validates that a file (e.g., 'card_photo') is uploaded and is of valid type.
         """
-        if not card_photo:
-            return {'error': 'صورة بطاقة الناخب مطلوبة'}, 400
-
-        # Check if the file has a valid extension (you can modify this as needed)
-        valid_extensions = ['.png', '.jpg', '.jpeg', '.pdf']
-        if not card_photo.filename.lower().endswith(tuple(valid_extensions)):
-            return {'error': 'يجب أن تكون الصورة بتنسيق PNG أو JPG أو JPEG أو pdf'}, 400
-
-        return None
-
-
+        return validate_value(CARD_PHOTO_CHECKS, card_photo)
 
     @staticmethod
     def validate_request_data(data, files):
         """
         Validates the entire request data.
-        This method now accepts both `data` (form data) and `files` (file uploads).
-        """
-        # Validate name fields (assuming all names are required except for optional fields)
-        name_fields = [
-            ('name', 'الاسم الأول', True),  # Required
-            ('father_name', 'اسم الأب', True),  # Required
-            ('third_name', 'الاسم الثالث', True),  # Required
-            ('forth_name', 'الاسم الرابع', False),  # Optional
-            ('surn_ame', 'اللقب', False)  # Optional
-        ]
-        
-        # Loop through and validate name fields
-        for field_key, field_label, required in name_fields:
-            error = AddSubstrateValidator.validate_Elname(data.get(field_key), field_label, required)
-            if error:
-                return error
-
-        # Validate other fields like birthdate, national_number, phone_number, etc.
-        error = AddSubstrateValidator.validate_Elbirthdate(data.get('birth_date'))
-        if error:
-            return error
-
-        error = AddSubstrateValidator.validate_national_numberr(data.get('national_number'))
-        if error:
-            return error
-
-        error = AddSubstrateValidator.validate_phone_number(data.get('phone_number'))
-        if error:
-            return error
-
-        error = AddSubstrateValidator.validate_gender(data.get('gender'))
-        if error:
-            return error
-
-        # Validate file upload (card photo)
-        error = AddSubstrateValidator.validate_file(files.get('card_photo'))
-        if error:
-            return error
-
-        # If all validations pass, return None
-        return None
+        This method accepts both `data` (form data) and `files` (file uploads).
+        """
+        return (validate_schema(AddSubstrateValidator.SCHEMA, data)
+                or validate_schema(AddSubstrateValidator.FILES_SCHEMA, files))
 
 
 
 #-------------------------------------------------------------------------------------------------
-class EditSubstrateValidator:
+
+# Same fields as AddSubstrateValidator; the card photo is not required on edit.
+class EditSubstrateValidator(AddSubstrateValidator):
     """
     A class to handle the validation of fields for the Substrate API.
     """
 
-    @staticmethod
-    def validate_Elname(name, field_name, required=True):
-        """
-        Validates name fields (firstname, secondname, etc.).
-        - Must contain only alphabetic characters, spaces, apostrophes, or hyphens.
-        - If required is False, it will only validate if a value is provided.
-        """
-        if required and not name:
-            return {'error': f'الحقل {field_name} مطلوب'}, 400
-        
-        if name and not re.match(r'^[a-zA-Z\u0621-\u064A\s\'-]+$', name):  # Supports Arabic and English letters, spaces, apostrophes, hyphens
-            return {'error': f'يجب أن يحتوي {field_name} على أحرف فقط'}, 400
-
-        return None
-    
-    @staticmethod
-    def validate_Elbirthdate(birthdate):
-        """
-        Validates the 'usbirthdate' field.
-        - Must be a valid date in 'YYYY-MM-DD' format.
-        - Must not be in the future.
-        """
-        if not birthdate:
-            return {'error': 'تاريخ الميلاد مطلوب'}, 400
-        
-        try:
-            # Ensure date is in correct format
-            birth_date = datetime.strptime(birthdate, '%Y-%m-%d')
-            
-            # Check if birthdate is in the future
-            if birth_date > datetime.now():
-                return {'error': 'لا يمكن أن يكون تاريخ الميلاد في المستقبل'}, 400
-        except ValueError:
-            return {'error': 'يجب أن يكون تاريخ الميلاد بتنسيق YYYY-MM-DD'}, 400
-
-        return None
-    
-    @staticmethod
-    def validate_gender(gender):
-        """
-        Validates the 'usgender' field.
-        - Must be one of the predefined valid options (e.g., 'ذكر', 'انثى').
-        """
-        valid_genders = ['ذكر', 'انثى']  # Add more valid options if needed
-        
-        if not gender:
-            return {'error': 'الجنس مطلوب'}, 400
-        
-        if gender.lower() not in valid_genders:
-            return {'error': 'الجنس غير صحيح. الخيارات المتاحة هي ذكر أو انثى'}, 400
-
-        return None
-
-
-    @staticmethod
-    def validate_phone_number(usphoneno):
-        """
-        Validates the 'usphoneno' field.
-        - Must be a valid phone number.
-        """
-        if not usphoneno:
-            return {'error': 'رقم الهاتف مطلوب'}, 400
-
-        # Example of a phone number validation (must contain 10-15 digits)
-        if not re.match(r'^\d{10,15}$', usphoneno):
-            return {'error': 'يجب أن يحتوي رقم الهاتف على 10 إلى 15 رقما'}, 400
-
-        return None
-    
-    @staticmethod
-    def validate_national_numberr(usphoneno):
-        """
-        Validates the 'usphoneno' field.
-        - Must be a valid phone number.
-        """
-        if not usphoneno:
-            return {'error': 'رقم الهاتف مطلوب'}, 400
-
-        # Example of a phone number validation (must contain 10-15 digits)
-        if not re.match(r'^\d{10,15}$', usphoneno):
-            return {'error': 'يجب أن تحتوي رقم البطاقة الموحدة على 10 إلى 15 رقما'}, 400
-
-        return None
-    
-    @staticmethod
-    def validate_file(card_photo):
-        """
-        Validates that a file (e.g., 'card_photo') is uploaded and is of valid type.
-        """
-        if not card_photo:
-            return {'error': 'صورة بطاقة الناخب مطلوبة'}, 400
-
-        # Check if the file has a valid extension (you can modify this as needed)
-        valid_extensions = ['.png', '.jpg', '.jpeg', '.pdf']
-        if not card_photo.filename.lower().endswith(tuple(valid_extensions)):
-            return {'error': 'يجب أن تكون الصورة بتنسيق PNG أو JPG أو JPEG أو pdf'}, 400
-
-        return None
-
-
-
     @staticmethod
     def validate_request_data(data, files):
         """
         Validates the entire request data.
-        This method now accepts both `data` (form data) and `files` (file uploads).
-        """
-        # Validate name fields (assuming all names are required except for optional fields)
-        name_fields = [
-            ('name', 'الاسم الأول', True),  # Required
-            ('father_name', 'اسم الأب', True),  # Required
-            ('third_name', 'الاسم الثالث', True),  # Required
-            ('forth_name', 'الاسم الرابع', False),  # Optional
-            ('surn_ame', 'اللقب', False)  # Optional
-        ]
-        
-        # Loop through and validate name fields
-        for field_key, field_label, required in name_fields:
-            error = EditSubstrateValidator.validate_Elname(data.get(field_key), field_label, required)
-            if error:
-                return error
-
-        # Validate other fields like birthdate, national_number, phone_number, etc.
-        error = EditSubstrateValidator.validate_Elbirthdate(data.get('birth_date'))
-        if error:
-            return error
-
-        error = EditSubstrateValidator.validate_national_numberr(data.get('national_number'))
-        if error:
-            return error
-
-        error = EditSubstrateValidator.validate_phone_number(data.get('phone_number'))
-        if error:
-            return error
-
-        error = EditSubstrateValidator.validate_gender(data.get('gender'))
-        if error:
-            return error
-
-        # Validate file upload (card photo)
-        # error = EditSubstrateValidator.validate_file(files.get('card_photo'))
-        # if error:
-        #     return error
-
-        # If all validations pass, return None
-        return None
+        This method accepts both `data` (form data) and `files` (file uploads).
+        """
+        return validate_schema(EditSubstrateValidator.SCHEMA, data)
@@ -3,3 +3,6 @@ from sqlalchemy.orm import column_property
 from sqlalchemy import Column, Integer, String
 # create the SQLAlchemy object
 db = SQLAlchemy()
+
+# BIGINT primary keys are not autoincrementing on SQLite (DevConfig); use INTEGER there only.
+BigIntegerPK = db.BigInteger().with_variant(db.Integer(), "sqlite")
@@ -0,0 +1,53 @@
+import os
+
+import pytest
+
+# Config reads these at import; the real values come from .env in deployments
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("JWT_SECRET_KEY", "test-jwt-secret-of-at-least-32-bytes")
+os.environ.setdefault("SQLALCHEMY_TRACK_MODIFICATIONS", "False")
+
+from Config.config import Config  # noqa: E402
+
+
+def make_config(tmp_path, **overrides):
+    attrs = {
+        "SQLALCHEMY_DATABASE_URI": "sqlite:///" + str(tmp_path / "app.db"),
+        "SQLALCHEMY_ENGINE_OPTIONS": {},
+        "SEARCH_INDEX_PATH": str(tmp_path / "search_index.db"),
+        "TRACE_ENABLED": False,
+        "AUDIT_LOG_ENABLED": False,
+        "MEMORY_GOVERNOR_ENABLED": False,
+        "MODELS_ROOT": str(tmp_path / "models"),
+    }
+    attrs.update(overrides)
+    return type("TestConfig", (Config,), attrs)
+
+
+@pytest.fixture
+def app(tmp_path):
+    from Main import create_app
+    from exts import db
+
+    # not TESTING: exceptions must go through the same handlers as in production
+    app = create_app(make_config(tmp_path))
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def auth_header(app):
+    from flask_jwt_extended import create_access_token
+
+    def make(identity="1", **claims):
+        token = create_access_token(identity=identity, additional_claims=claims)
+        return {"Authorization": f"Bearer {token}"}
+    return make
@@ -0,0 +1,19 @@
+def test_profile_without_token_is_401(client):
+    response = client.get("/api/admin/profile?seconds=0.01")
+    assert response.status_code == 401
+
+
+def test_profile_with_malformed_token_is_401(client):
+    response = client.get("/api/admin/profile?seconds=0.01", headers={"Authorization": "Bearer not-a-jwt"})
+    assert response.status_code == 401
+
+
+def test_profile_for_non_admin_is_403(client, auth_header):
+    response = client.get("/api/admin/profile?seconds=0.01", headers=auth_header(roles=["clerk"]))
+    assert response.status_code == 403
+
+
+def test_profile_for_admin_is_200(client, auth_header):
+    response = client.get("/api/admin/profile?seconds=0.01", headers=auth_header(roles=["admin"]))
+    assert response.status_code == 200
+    assert response.get_json()["ticks"] >= 1
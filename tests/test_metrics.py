@@ -0,0 +1,28 @@
+from conftest import make_config
+from utils import metrics
+
+
+def test_metrics_needs_an_admin_token(client, auth_header):
+    assert client.get("/api/metrics").status_code == 401
+    assert client.get("/api/metrics", headers=auth_header(roles=["clerk"])).status_code == 403
+    response = client.get("/api/metrics", headers=auth_header(roles=["admin"]))
+    assert response.status_code == 200
+    assert "gauges" in response.get_json()
+
+
+def test_metrics_allowed_ip_needs_no_token(tmp_path):
+    from Main import create_app
+
+    app = create_app(make_config(tmp_path, METRICS_ALLOWED_IPS="127.0.0.1"))
+    response = app.test_client().get("/api/metrics?format=prometheus")
+    assert response.status_code == 200
+    assert response.mimetype == "text/plain"
+
+
+def test_create_app_does_not_add_collectors(tmp_path):
+    from Main import create_app
+
+    create_app(make_config(tmp_path / "a"))
+    before = len(metrics._collectors)
+    create_app(make_config(tmp_path / "b"))
+    assert len(metrics._collectors) == before
@@ -0,0 +1,126 @@
+import json
+import threading
+import time
+
+import pytest
+
+from utils.memory_governor import memory_governor
+from utils.model_registry import ModelRetired, resident_models
+from utils.model_routing import model_router
+from utils.model_swap import ModelSwapper
+
+loads = []
+
+
+def stub_loader(path, dtype):
+    loads.append(path)
+    return "tok", {"weights": path}
+
+
+@pytest.fixture
+def router(tmp_path, monkeypatch):
+    # base has weights; bart has none and falls back to base, as in the shipped table
+    for name in ("base", "bart", "solo", "new_bart", "new_solo"):
+        (tmp_path / name).mkdir()
+    for name in ("base", "solo", "new_bart", "new_solo"):
+        (tmp_path / name / "model.safetensors").write_bytes(b"\0" * 16)
+    table = {
+        "models": {"base": {"path": "base", "backend": "stub"},
+                   "bart": {"path": "bart", "backend": "stub", "fallback": "base"},
+                   "solo": {"path": "solo", "backend": "stub"}},
+        "profiles": {"p": {"num_beams": 1}},
+        "routes": [{"task": "grammar", "model": "base", "profile": "p"},
+                   {"task": "paraphrase", "model": "bart", "profile": "p"},
+                   {"task": "coedit", "model": "solo", "profile": "p"}],
+    }
+    path = tmp_path / "routing.json"
+    path.write_text(json.dumps(table))
+    monkeypatch.setattr(memory_governor, "high", 0)   # no headroom check, no eviction
+    model_router.register_backend("stub", stub_loader)
+    model_router.load(str(path), str(tmp_path))
+    loads.clear()
+    yield model_router, tmp_path, str(path)
+    # leave no retired or resident stub models behind
+    resident_models.reinstate(["base", "solo"])
+    for entry in resident_models.resident():
+        resident_models.evict(entry["name"])
+
+
+def run_swap(swapper, name, path):
+    job = swapper.start(name, path, warmup=False)
+    deadline = time.monotonic() + 5
+    while swapper.job(job.id)["state"] not in ("done", "failed") and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return swapper.job(job.id)
+
+
+def test_swap_while_a_borrow_is_in_flight(router):
+    _, root, _ = router
+    swapper = ModelSwapper(drain_timeout=5)
+    with model_router.use("coedit", "en") as (route, held):
+        assert route.model == "solo"
+        job = swapper.start("solo", str(root / "new_solo"), warmup=False)
+        deadline = time.monotonic() + 5
+        while swapper.job(job.id)["draining"] != 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert swapper.job(job.id)["state"] == "draining"
+        # new requests get the new model while the old one is still held
+        with model_router.use("coedit", "en") as (new_route, entry):
+            assert new_route.model.startswith("solo#")
+            assert entry.mdl == {"weights": str(root / "new_solo")}
+        assert held.mdl == {"weights": str(root / "solo")}
+    while swapper.job(job.id)["state"] == "draining" and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert swapper.job(job.id)["state"] == "done"
+    assert "solo" not in {m["name"] for m in resident_models.resident()}
+    with pytest.raises(ModelRetired):
+        resident_models.acquire("solo", lambda: stub_loader("again", None))
+
+
+def test_fallback_entries_keep_their_model(router):
+    _, root, _ = router
+    assert model_router.route("paraphrase", "en").model == "base"
+    job = run_swap(ModelSwapper(), "bart", str(root / "new_bart"))
+    assert job["state"] == "done"
+    assert job["old_key"] == "base"
+
+    bart = model_router.model("bart")
+    assert bart["name"] == "bart" and bart["key"] == job["new_key"]
+    assert model_router.model("base")["key"] == "base"
+    assert model_router.serves("base")
+    # the shared fallback was not retired: the grammar route still loads it
+    with model_router.use("grammar", "en") as (route, entry):
+        assert route.model == "base"
+        assert entry.mdl == {"weights": str(root / "base")}
+    with model_router.use("paraphrase", "en") as (route, entry):
+        assert entry.mdl == {"weights": str(root / "new_bart")}
+
+
+def borrow(task):
+    """use() in a thread, so a use() that never returns fails the test instead of hanging it."""
+    result = {}
+
+    def run():
+        try:
+            with model_router.use(task, "en") as (route, entry):
+                result["model"], result["weights"] = route.model, entry.mdl["weights"]
+        except ModelRetired:
+            result["retired"] = True
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    thread.join(2)
+    assert not thread.is_alive(), "use() kept resolving a retired key"
+    return result
+
+
+def test_use_raises_on_a_retired_key_the_table_still_serves(router):
+    resident_models.retire("base")
+    assert borrow("grammar") == {"retired": True}
+
+
+def test_load_reinstates_a_retired_key(router):
+    _, root, routing = router
+    resident_models.retire("base")
+    model_router.load(routing, str(root))
+    assert borrow("grammar") == {"model": "base", "weights": str(root / "base")}
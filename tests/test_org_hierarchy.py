@@ -0,0 +1,122 @@
+import pytest
+
+from exts import db
+from Models.Orgs_model import orgs, orgs_closure
+from utils import org_hierarchy
+
+
+def org(orgid, orgup):
+    return {"orgid": orgid, "orgup": orgup, "orglevel": 0, "orgarname": f"org {orgid}", "orgisactive": True}
+
+
+def naive_closure():
+    """(ancestor, descendant, depth) rows from walking orgup, the way the closure must look."""
+    parent = dict(db.session.query(orgs.orgid, orgs.orgup).all())
+    rows = set()
+    for orgid in parent:
+        up, depth = orgid, 0
+        while up in parent and depth <= len(parent):
+            rows.add((up, orgid, depth))
+            up, depth = parent[up], depth + 1
+    return rows
+
+
+def closure():
+    return set(db.session.query(orgs_closure.ancestor_id, orgs_closure.descendant_id, orgs_closure.depth).all())
+
+
+def assert_consistent():
+    expected = naive_closure()
+    assert closure() == expected
+    # and the cached lookups see the committed tree
+    for orgid, in db.session.query(orgs.orgid).all():
+        ancestors = sorted((d, a) for a, o, d in expected if o == orgid)
+        assert org_hierarchy.get_ancestor_ids(orgid) == [a for _, a in ancestors]
+        assert org_hierarchy.get_descendant_ids(orgid) == {o for a, o, _ in expected if a == orgid}
+
+
+@pytest.fixture
+def tree(app):
+    #       1
+    #     /   \
+    #    2     3
+    #   / \     \
+    #  4   5     6
+    #  |
+    #  7
+    org_hierarchy.invalidate()
+    for orgid, orgup in ((1, 0), (2, 1), (3, 1), (4, 2), (5, 2), (6, 3), (7, 4)):
+        db.session.add(orgs(**org(orgid, orgup)))
+        db.session.commit()
+    return app
+
+
+def test_insert(tree):
+    assert_consistent()
+    assert org_hierarchy.get_ancestor_ids(7) == [7, 4, 2, 1]
+    assert org_hierarchy.get_descendant_ids(2) == {2, 4, 5, 7}
+
+
+def test_insert_in_one_flush(app):
+    org_hierarchy.invalidate()
+    db.session.add_all([orgs(**org(1, 0)), orgs(**org(2, 1)), orgs(**org(3, 2))])
+    db.session.commit()
+    assert_consistent()
+
+
+def test_move_subtree(tree):
+    org_hierarchy.get_descendant_ids(1)   # cache the tree before the change
+    node = db.session.get(orgs, 4)
+    node.orgup = 6
+    db.session.commit()
+    assert_consistent()
+    assert org_hierarchy.get_ancestor_ids(7) == [7, 4, 6, 3, 1]
+    assert org_hierarchy.get_descendant_ids(2) == {2, 5}
+
+
+def test_move_to_root(tree):
+    db.session.get(orgs, 2).orgup = 0
+    db.session.commit()
+    assert_consistent()
+    assert org_hierarchy.get_descendant_ids(1) == {1, 3, 6}
+
+
+def test_delete(tree):
+    org_hierarchy.get_descendant_ids(1)
+    db.session.delete(db.session.get(orgs, 2))
+    db.session.commit()
+    assert_consistent()
+    assert org_hierarchy.get_ancestor_ids(7) == [7, 4]
+    assert org_hierarchy.get_descendant_ids(1) == {1, 3, 6}
+
+
+def test_rollback_keeps_the_closure(tree):
+    db.session.get(orgs, 4).orgup = 6
+    db.session.flush()
+    db.session.rollback()
+    assert_consistent()
+
+
+def test_bulk_insert(tree):
+    orgs.bulk_insert([org(8, 7), org(9, 8), org(10, 3)])
+    assert_consistent()
+    assert org_hierarchy.get_ancestor_ids(9) == [9, 8, 7, 4, 2, 1]
+
+
+def test_bulk_update(tree):
+    orgs.bulk_update([{"orgid": 4, "orgup": 3}, {"orgid": 6, "orgup": 2}])
+    assert_consistent()
+    assert org_hierarchy.get_descendant_ids(3) == {3, 4, 7}
+
+
+def test_bulk_upsert(tree):
+    orgs.bulk_upsert([org(5, 3), org(11, 5)])
+    assert_consistent()
+    assert org_hierarchy.get_ancestor_ids(11) == [11, 5, 3, 1]
+
+
+def test_bulk_soft_delete(tree):
+    before = closure()
+    orgs.bulk_soft_delete([4])
+    assert closure() == before
+    assert_consistent()
@@ -0,0 +1,60 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from Models.Books_model import transfer_book
+from utils import pagination
+from utils.pagination import InvalidCursor, decode_cursor, encode_cursor, keyset_paginate
+
+START = datetime(2024, 3, 1, 8, 30)
+
+
+@pytest.fixture
+def transfers(app):
+    # 23 rows over 5 timestamps: most sort keys are shared by several rows
+    rows = [{"trans_id": i, "book_id": i, "org_send_id": 1, "org_recieve_id": 2,
+             "time_stamp": START + timedelta(minutes=i % 5)} for i in range(1, 24)]
+    transfer_book.bulk_insert(rows)
+    return rows
+
+
+def walk(limit, descending, cursor=None):
+    seen = []
+    query = transfer_book.query.filter_by(org_recieve_id=2)
+    columns = [transfer_book.time_stamp, transfer_book.trans_id]
+    while True:
+        page = keyset_paginate(query, columns, cursor=cursor, limit=limit, descending=descending)
+        seen.extend((r.time_stamp, r.trans_id) for r in page["items"])
+        assert page["has_more"] == (page["next_cursor"] is not None)
+        if not page["has_more"]:
+            return seen
+        cursor = page["next_cursor"]
+
+
+@pytest.mark.parametrize("limit", [1, 2, 4, 7, 23, 50])
+@pytest.mark.parametrize("descending", [True, False])
+def test_pages_cover_every_row_once(transfers, limit, descending):
+    expected = sorted(((r["time_stamp"], r["trans_id"]) for r in transfers), reverse=descending)
+    assert walk(limit, descending) == expected
+
+
+@pytest.mark.parametrize("descending", [True, False])
+def test_expanded_comparison(transfers, monkeypatch, descending):
+    # the OR-of-ANDs form used on backends without row values (SQL Server)
+    after = pagination._after
+    monkeypatch.setattr(pagination, "_after", lambda c, v, d, dialect: after(c, v, d, "mssql"))
+    expected = sorted(((r["time_stamp"], r["trans_id"]) for r in transfers), reverse=descending)
+    assert walk(3, descending) == expected
+
+
+def test_cursor_round_trip():
+    values = [datetime(2024, 3, 1, 8, 30, 15, 250), date(2024, 3, 1), 42, "x", None]
+    cursor = encode_cursor(values)
+    assert "=" not in cursor
+    assert decode_cursor(cursor, len(values)) == values
+
+
+@pytest.mark.parametrize("cursor", ["not base64 at all!", encode_cursor([1]), "e30"])
+def test_bad_cursor(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor, 2)
@@ -0,0 +1,101 @@
+import json
+
+import pytest
+
+from utils import metrics
+
+GRAMMAR = "/api/interface/grammar_check"
+
+
+def rejected(reason, endpoint="grammar_check"):
+    return metrics._counters.get(metrics._key("request_rejected_total", {"endpoint": endpoint, "reason": reason}), 0)
+
+
+@pytest.fixture
+def served(monkeypatch):
+    """Replaces the model call: valid requests echo their text, rejected ones never get here."""
+    calls = []
+
+    def run_task(task, text, style):
+        calls.append((task.endpoint, text, style))
+        return text
+    monkeypatch.setattr("Operation.interface.run_task", run_task)
+    return calls
+
+
+def post(client, body, **kwargs):
+    data = body if isinstance(body, (str, bytes)) else json.dumps(body)
+    return client.post(GRAMMAR, data=data, content_type="application/json", **kwargs)
+
+
+def test_valid_request_is_served(client, served):
+    response = post(client, {"text": "I has a cat.", "style": "Academic"})
+    assert response.status_code == 200
+    assert response.get_json()["corrected_text"] == "I has a cat."
+    assert served == [("grammar_check", "I has a cat.", "academic")]
+
+
+@pytest.mark.parametrize("body", ["{not json", "[1, 2]", "\"text\"", ""])
+def test_malformed_body_is_400(client, served, body):
+    before = rejected("malformed")
+    response = post(client, body)
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "request body must be a JSON object"}
+    assert rejected("malformed") == before + 1
+    assert served == []
+
+
+@pytest.mark.parametrize("body, reason", [
+    ({"text": 5}, "malformed"),
+    ({"text": "   "}, "missing_text"),
+    ({"style": "standard"}, "missing_text"),
+])
+def test_bad_text_is_400(client, served, body, reason):
+    before = rejected(reason)
+    assert post(client, body).status_code == 400
+    assert rejected(reason) == before + 1
+    assert served == []
+
+
+@pytest.mark.parametrize("style, reason", [("poetic", "invalid_style"), (["academic"], "malformed")])
+def test_bad_style_is_400(client, served, style, reason):
+    before = rejected(reason)
+    response = post(client, {"text": "I has a cat.", "style": style})
+    assert response.status_code == 400
+    assert "style" in response.get_json()["error"]
+    assert rejected(reason) == before + 1
+    assert served == []
+
+
+@pytest.mark.parametrize("output_format", [1, ["edits"], None, "html"])
+def test_bad_format_is_400(client, served, output_format):
+    before = rejected("invalid_format")
+    response = post(client, {"text": "I has a cat.", "format": output_format})
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "Invalid format. Allowed: ['text', 'edits']"}
+    assert rejected("invalid_format") == before + 1
+    assert served == []
+
+
+def test_format_of_an_endpoint_without_edits_is_400(client, served):
+    response = client.post("/api/interface/paraphrase", json={"text": "Hello there.", "format": "edits"})
+    assert response.status_code == 400
+    assert served == []
+
+
+def test_oversize_content_length_is_413_without_parsing(app, client, served):
+    app.config["GRAMMAR_MAX_CHARS"] = 10     # byte budget: 10 * 6 + 1024
+    before = rejected("too_large")
+    # not JSON at all: a 400 would mean the body was read and parsed
+    response = post(client, "x" * 2000)
+    assert response.status_code == 413
+    assert response.get_json() == {"error": "text is too long (max 10 characters)"}
+    assert rejected("too_large") == before + 1
+    assert served == []
+
+
+def test_text_over_the_limit_is_413(app, client, served):
+    app.config["GRAMMAR_MAX_CHARS"] = 10
+    assert post(client, {"text": "x" * 11}).status_code == 413
+    assert post(client, {"text": "  " + "x" * 10 + "  "}).status_code == 200
+    assert served == [("grammar_check", "x" * 10, "standard")]
@@ -0,0 +1,23 @@
+import random
+
+from utils.text_edits import apply_edits, diff_edits
+
+
+def test_whitespace_changes_round_trip():
+    for original, corrected in [
+        ("one\ttwo", "one two"),
+        ("I has a cat.\nHe go home.", "I have a cat. He goes home."),
+        ("a b", "a\nc"),
+    ]:
+        edits = diff_edits(original, corrected)
+        assert apply_edits(original, edits) == corrected
+        assert all(e["original"] != e["replacement"] for e in edits)
+
+
+def test_random_round_trip():
+    rng = random.Random(0)
+    alphabet = ["a", "b", "cat", "I", "has", " ", "  ", "\t", "\n", ".", ",", "'", "é", "ة", "َ"]
+    for _ in range(20000):
+        original = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 12)))
+        corrected = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 12)))
+        assert apply_edits(original, diff_edits(original, corrected)) == corrected
@@ -9,10 +9,10 @@ from Services.TokenWOUser import CheckTokenWOU
 from Services.Req_Rep import ReqRep
 from Services.Permissionview import PV
 from Services.UserTable import UserTable
-from Services.parentchildorgs import arrange_childorg_hierarchy, arrange_parentorg_hierarchy
+from utils.org_hierarchy import arrange_childorg_hierarchy, arrange_parentorg_hierarchy, get_descendant_ids, get_ancestor_ids
 from flask import Flask, request, jsonify, current_app, make_response, abort, Response, send_file
 from flask_restx import Resource, Namespace, fields, marshal
-from flask_paginate import Pagination, get_page_parameter
+from utils.pagination import keyset_paginate, InvalidCursor
 from Models.Orgs_Links import Link, Orgs
 from Models.Contrain_models import contraindications, Req_Rep, Types, Req_Rep, LinkCon
 from Models.Users_model import User, AccessToken, Permission, PermissionView
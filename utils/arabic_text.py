@@ -0,0 +1,82 @@
+"""
+Arabic text normalization shared by search and language detection.
+
+Users type the same Arabic text with and without diacritics, with different alef
+and yaa forms and with tatweel, so byte-for-byte comparisons miss. `normalize()`
+folds all of those to one canonical form:
+
+* strips tashkeel (harakat, tanwin, shadda, sukun, superscript alef, Quranic marks)
+* removes tatweel (kashida)
+* unifies alef forms  أ إ آ ٱ -> ا,  yaa forms  ى ی -> ي,  taa marbuta  ة -> ه
+* folds runs of whitespace to one space and trims
+
+Everything except the whitespace folding is a single `str.translate` over a table
+built once at import, so the per-character work runs in C. `normalize_batch()`
+translates a whole batch in one call (the search index backfill,
+utils/text_search.reindex_all).
+
+Result caches deliberately do not use this: the spelling variants it folds are
+exactly what a corrector judges, so they key on the exact text
+(utils/result_cache.py).
+
+The character tables come from pyarabic when it is installed and fall back to the
+same code points otherwise.
+"""
+import re
+
+try:
+    from pyarabic import araby
+    _TASHKEEL = "".join(araby.TASHKEEL) + araby.MINI_ALEF + araby.SMALL_WAW + araby.SMALL_YEH
+    _TATWEEL = araby.TATWEEL
+    _ALEFS = (araby.ALEF_HAMZA_ABOVE, araby.ALEF_HAMZA_BELOW, araby.ALEF_MADDA, araby.ALEF_WASLA)
+    _ALEF, _YEH, _ALEF_MAKSURA, _TEH_MARBUTA, _HEH = (araby.ALEF, araby.YEH, araby.ALEF_MAKSURA,
+                                                      araby.TEH_MARBUTA, araby.HEH)
+except ImportError:  # pragma: no cover - pyarabic is in the Pipfile, this is only a fallback
+    _TASHKEEL = "\u064B\u064C\u064D\u064E\u064F\u0650\u0651\u0652\u0670\u06E5\u06E6"
+    _TATWEEL = "\u0640"
+    _ALEFS = ("\u0623", "\u0625", "\u0622", "\u0671")
+    _ALEF, _YEH, _ALEF_MAKSURA, _TEH_MARBUTA, _HEH = "\u0627", "\u064A", "\u0649", "\u0629", "\u0647"
+
+_FARSI_YEH = "\u06CC"
+# Quranic annotation signs and the extended harakat not listed by pyarabic
+_EXTRA_MARKS = [chr(c) for c in range(0x0610, 0x061B)] + [chr(c) for c in range(0x0653, 0x0660)] \
+    + [chr(c) for c in range(0x06D6, 0x06DD)] + [chr(c) for c in range(0x06DF, 0x06E9)] \
+    + [chr(c) for c in range(0x06EA, 0x06EE)]
+
+_TABLE = {ord(ch): None for ch in set(_TASHKEEL) | set(_EXTRA_MARKS) | {_TATWEEL}}
+_TABLE.update({ord(ch): _ALEF for ch in _ALEFS})
+_TABLE.update({ord(_ALEF_MAKSURA): _YEH, ord(_FARSI_YEH): _YEH, ord(_TEH_MARBUTA): _HEH})
+
+_SPACES_RE = re.compile(r'\s+')
+
+# Arabic script blocks: Arabic, Supplement, Extended-A and the presentation forms
+ARABIC_CHAR_CLASS = '\u0600-\u06FF\u0750-\u077F\u08A0-\u08FF\uFB50-\uFDFF\uFE70-\uFEFF'
+_ARABIC_RE = re.compile(f'[{ARABIC_CHAR_CLASS}]')
+
+_BATCH_SEP = "\x00"
+
+
+def normalize(text, casefold=False):
+    """Canonical form of `text`. `casefold=True` also lowercases Latin (for search)."""
+    text = (text or "").translate(_TABLE)
+    if casefold:
+        text = text.casefold()
+    return _SPACES_RE.sub(" ", text).strip()
+
+
+def normalize_batch(texts, casefold=False):
+    """normalize() over a list of strings with one translate / one regex pass for the whole batch."""
+    texts = [t or "" for t in texts]
+    if not texts:
+        return []
+    if any(_BATCH_SEP in t for t in texts):
+        return [normalize(t, casefold) for t in texts]
+    joined = _BATCH_SEP.join(texts).translate(_TABLE)
+    if casefold:
+        joined = joined.casefold()
+    return [part.strip() for part in _SPACES_RE.sub(" ", joined).split(_BATCH_SEP)]
+
+
+def contains_arabic(text):
+    return bool(_ARABIC_RE.search(text or ""))
+
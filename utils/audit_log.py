@@ -0,0 +1,155 @@
+"""
+Batched, asynchronous audit logging into the `logactions` table.
+
+Request handlers call `audit_log.record(...)`, which only appends to an
+in-memory queue. A background thread drains the queue and writes the rows with
+one bulk INSERT per batch, flushing when `AUDIT_LOG_BATCH_SIZE` rows are waiting
+or every `AUDIT_LOG_FLUSH_INTERVAL` seconds, whichever comes first. Pending rows
+are flushed on interpreter shutdown, and a forked worker starts its own writer.
+
+Backpressure: the queue is bounded (`AUDIT_LOG_QUEUE_SIZE`). When it is full,
+`record()` waits up to `AUDIT_LOG_BLOCK_TIMEOUT` seconds (0 = never wait) and
+then drops the row and counts it in `audit_log_dropped_total`, so a slow or
+unavailable database never adds latency to the API.
+"""
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+
+from exts import db
+from utils import metrics
+
+logger = logging.getLogger("audit_log")
+
+_STOP = object()
+
+
+class AuditLogWriter:
+    def __init__(self, batch_size=200, flush_interval=2.0, queue_size=10000, block_timeout=0.0):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.block_timeout = block_timeout
+        self.enabled = True
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._app = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.enabled = app.config.get("AUDIT_LOG_ENABLED", True)
+        self.batch_size = app.config.get("AUDIT_LOG_BATCH_SIZE", self.batch_size)
+        self.flush_interval = app.config.get("AUDIT_LOG_FLUSH_INTERVAL", self.flush_interval)
+        self.block_timeout = app.config.get("AUDIT_LOG_BLOCK_TIMEOUT", self.block_timeout)
+        queue_size = app.config.get("AUDIT_LOG_QUEUE_SIZE")
+        if queue_size and queue_size != self._queue.maxsize and self._queue.empty():
+            self._queue = queue.Queue(maxsize=queue_size)
+        self._app = app
+        metrics.register_collector(lambda: {"audit_log_queue_depth": self._queue.qsize()}, name="audit_log")
+        if self.enabled:
+            self.start()
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            first_start = self._thread is None
+            self._thread = threading.Thread(target=self._run, name="audit-log-writer", daemon=True)
+            self._thread.start()
+        if first_start:
+            atexit.register(self.shutdown)
+            if hasattr(os, "register_at_fork"):
+                os.register_at_fork(after_in_child=self._after_fork)
+
+    def _after_fork(self):
+        # the writer thread does not survive fork(); forked workers start their own.
+        # Rows queued before the fork belong to the parent, which still writes them.
+        self._queue = queue.Queue(maxsize=self._queue.maxsize)
+        self._lock = threading.Lock()
+        if self.enabled:
+            self._thread = threading.Thread(target=self._run, name="audit-log-writer", daemon=True)
+            self._thread.start()
+
+    # -------------------- producer side --------------------
+    def record(self, methodname=None, apiurl=None, jsondata=None, usid=None, orgid=None,
+               parameters=None, tablename=None, extraproperties=None, timestamp=None):
+        if not self.enabled:
+            return False
+        row = {
+            "usid": usid,
+            "orgid": orgid,
+            "methodname": methodname,
+            "parameters": parameters,
+            "tablename": tablename,
+            "extraproperties": extraproperties,
+            "apiurl": apiurl,
+            "jsondata": jsondata,
+            "timestamp": timestamp or datetime.utcnow(),
+        }
+        try:
+            if self.block_timeout:
+                self._queue.put(row, timeout=self.block_timeout)
+            else:
+                self._queue.put_nowait(row)
+        except queue.Full:
+            metrics.inc("audit_log_dropped_total")
+            return False
+        return True
+
+    # -------------------- consumer side --------------------
+    def _run(self):
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            timeout = max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is _STOP:
+                self._flush(batch)
+                return
+            if item is not None:
+                batch.append(item)
+
+            if len(batch) >= self.batch_size or time.monotonic() >= deadline:
+                self._flush(batch)
+                batch = []
+                deadline = time.monotonic() + self.flush_interval
+
+    def _flush(self, batch):
+        if not batch or self._app is None:
+            return
+        from Models.Orgs_model import logactions
+
+        started = time.perf_counter()
+        with self._app.app_context():
+            try:
+                logactions.bulk_insert(batch, chunk_size=self.batch_size)
+                metrics.inc("audit_log_written_total", len(batch))
+            except Exception as e:
+                metrics.inc("audit_log_flush_errors_total")
+                metrics.inc("audit_log_dropped_total", len(batch))
+                logger.exception(f"Failed to flush {len(batch)} audit log rows: {e}")
+            finally:
+                db.session.remove()
+        metrics.observe("audit_log_flush_seconds", time.perf_counter() - started)
+
+    def shutdown(self, timeout=10.0):
+        """Flush whatever is queued and stop the writer thread."""
+        thread = self._thread
+        if thread is None or not thread.is_alive():
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            logger.warning("Audit log queue full at shutdown; pending rows may be lost")
+            return
+        thread.join(timeout)
+
+
+audit_log = AuditLogWriter()
@@ -0,0 +1,61 @@
+"""
+Admin authorization on top of the JWT already used by the API.
+
+`admin_required` verifies the JWT (401 when it is missing or invalid) and then
+checks whether the caller is an admin (403 otherwise):
+
+* through the token's claims, when it carries `roles` (a list of role names) or
+  `is_admin`;
+* otherwise through the role tables: an active `roleuser` row linking the
+  identity's usid to an active role named in `ADMIN_ROLE_NAMES`.
+"""
+from functools import wraps
+
+from flask import current_app, jsonify, make_response
+from flask_jwt_extended import get_jwt, get_jwt_identity, verify_jwt_in_request
+from flask_jwt_extended.exceptions import JWTExtendedException
+from jwt.exceptions import PyJWTError
+
+from exts import db
+
+
+def _admin_role_names():
+    names = current_app.config.get("ADMIN_ROLE_NAMES", "admin")
+    return {n.strip().lower() for n in names.split(",") if n.strip()}
+
+
+def is_admin(identity, claims):
+    admin_roles = _admin_role_names()
+    if claims.get("is_admin") is True:
+        return True
+    if claims.get("roles"):
+        return bool({str(r).lower() for r in claims["roles"]} & admin_roles)
+
+    usid = identity.get("usid") if isinstance(identity, dict) else identity
+    try:
+        usid = int(usid)
+    except (TypeError, ValueError):
+        return False
+
+    from Models.Users_model import role, roleuser
+    names = (db.session.query(role.name)
+             .join(roleuser, roleuser.roleid == role.id)
+             .filter(roleuser.userid == usid,
+                     roleuser.isactive.is_(True), roleuser.isdelete.isnot(True),
+                     role.isactive.is_(True), role.isdelete.isnot(True))
+             .all())
+    return any((name or "").strip().lower() in admin_roles for (name,) in names)
+
+
+def admin_required(fn):
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        try:
+            verify_jwt_in_request()
+        except (JWTExtendedException, PyJWTError):
+            # answered here: flask_restx turns them into 500s unless exceptions propagate
+            return make_response(jsonify({"error": "يجب تسجيل الدخول"}), 401)
+        if not is_admin(get_jwt_identity(), get_jwt()):
+            return make_response(jsonify({"error": "غير مصرح لك بالوصول"}), 403)
+        return fn(*args, **kwargs)
+    return wrapper
@@ -0,0 +1,61 @@
+"""
+Pool metrics for the single Flask-SQLAlchemy engine.
+
+`init_pool_metrics(app)` hooks the pool events of `db.engine` and registers a
+collector that reports pool utilisation on every `/api/metrics` scrape.
+"""
+import time
+
+from sqlalchemy import event
+
+from exts import db
+from utils import metrics
+
+
+def pool_status(engine, options=None):
+    """
+    Current state of the engine pool. `capacity` is pool_size + max_overflow
+    from SQLALCHEMY_ENGINE_OPTIONS (pools without a size report 0).
+    """
+    pool = engine.pool
+    options = options or {}
+    size = pool.size() if hasattr(pool, "size") else 0
+    checked_out = pool.checkedout() if hasattr(pool, "checkedout") else 0
+    status = {
+        "db_pool_size": size,
+        "db_pool_checked_out": checked_out,
+        "db_pool_checked_in": pool.checkedin() if hasattr(pool, "checkedin") else 0,
+        "db_pool_overflow": pool.overflow() if hasattr(pool, "overflow") else 0,
+    }
+    capacity = options.get("pool_size", size) + options.get("max_overflow", 0)
+    status["db_pool_capacity"] = capacity
+    status["db_pool_utilization"] = round(checked_out / capacity, 4) if capacity else 0.0
+    return status
+
+
+def init_pool_metrics(app):
+    with app.app_context():
+        engine = db.engine
+    options = app.config.get("SQLALCHEMY_ENGINE_OPTIONS") or {}
+
+    @event.listens_for(engine.pool, "connect")
+    def _on_connect(dbapi_conn, conn_record):
+        metrics.inc("db_pool_connections_created_total")
+
+    @event.listens_for(engine.pool, "checkout")
+    def _on_checkout(dbapi_conn, conn_record, conn_proxy):
+        conn_record.info["checkout_at"] = time.perf_counter()
+        metrics.inc("db_pool_checkouts_total")
+
+    @event.listens_for(engine.pool, "checkin")
+    def _on_checkin(dbapi_conn, conn_record):
+        started = conn_record.info.pop("checkout_at", None)
+        if started is not None:
+            metrics.observe("db_pool_connection_held_seconds", time.perf_counter() - started)
+
+    @event.listens_for(engine.pool, "invalidate")
+    def _on_invalidate(dbapi_conn, conn_record, exception):
+        metrics.inc("db_pool_invalidated_total")
+
+    metrics.register_collector(lambda: pool_status(engine, options), name="db_pool")
+    return engine
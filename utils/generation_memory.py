@@ -0,0 +1,268 @@
+"""
+Generation memory manager: admit generate() calls against a memory budget.
+
+Peak memory during generate grows with rows x beams x sequence length x layers:
+the encoder output and the cross-attention cache are expanded to every beam, the
+self-attention cache grows by one position per step and is copied when beams are
+reordered, and the scores are rows x beams x vocab floats. A burst of long inputs
+at 6-8 beams can OOM a worker that is fine at steady state.
+
+Before each generate call, `reserve()` estimates the peak from the model config,
+the batch size, the padded input length and the generate settings. Then it picks
+the first plan that fits the memory still free, in this order:
+
+1. the whole batch with the configured beams;
+2. the same beams over smaller sub-batches (halving), which costs latency but not
+   quality;
+3. fewer beams (halved; num_beam_groups is reduced to divide them, diversity is
+   dropped at one group, num_return_sequences is capped at the beams), over the
+   same sub-batch sizes.
+
+Fewer beams are used only when the request does not fit even alone. When it
+would fit once other requests release their memory, it waits for them, up to
+`GENERATION_MEMORY_WAIT_SECONDS`, and after that accepts fewer beams too. When
+no plan fits and nothing else is running (or the wait is over), it runs the
+smallest plan anyway and counts it in generation_memory_overcommit_total.
+
+The budget is `GENERATION_MEMORY_BUDGET_MB`. With 0 it is what is left below the
+memory governor's high watermark (utils/memory_governor.py) plus what is already
+reserved. No watermark means no limit.
+
+The actual peak of each call is recorded: a sampler thread reads the RSS every
+`GENERATION_MEMORY_SAMPLE_MS` while any call is running. Metrics per model are
+generate_peak_bytes and generate_estimate_bytes, plus generate_peak_estimate_ratio
+for calls that ran alone. The RSS rises only when the allocator asks the OS for
+more, so the recorded peak is a lower bound. When it still exceeds the estimate,
+the model's later estimates are scaled up (moving average, at most 4x).
+"""
+import logging
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+from utils import metrics
+from utils.memory_governor import memory_governor, rss_bytes
+
+logger = logging.getLogger("generation_memory")
+
+_MB = 1024 * 1024
+_MAX_CALIBRATION = 4.0
+
+
+def _first(cfg, *names, default=0):
+    for name in names:
+        value = getattr(cfg, name, None)
+        if value:
+            return value
+    return default
+
+
+class ModelShape:
+    """The sizes that drive generate() memory, read from a transformers config."""
+
+    def __init__(self, mdl):
+        cfg = getattr(mdl, "config", None)
+        self.d_model = _first(cfg, "d_model", "hidden_size", default=512)
+        self.heads = _first(cfg, "num_heads", "encoder_attention_heads", "num_attention_heads", default=8)
+        self.inner = self.heads * _first(cfg, "d_kv", default=self.d_model // self.heads)
+        self.d_ff = _first(cfg, "d_ff", "encoder_ffn_dim", "intermediate_size", default=4 * self.d_model)
+        self.decoder_layers = _first(cfg, "num_decoder_layers", "decoder_layers", "num_layers", default=6)
+        self.vocab = _first(cfg, "vocab_size", default=32128)
+        params = getattr(mdl, "parameters", None)
+        try:
+            self.element_size = next(params()).element_size() if params else 4
+        except StopIteration:
+            self.element_size = 4
+
+    def peak_bytes(self, rows, in_len, out_len, beams):
+        e, b = self.element_size, rows * beams
+        # encoder, one layer at a time under no_grad: hidden + FFN activations + attention scores
+        encode = rows * in_len * (4 * self.d_model + self.d_ff) * e + rows * self.heads * in_len * in_len * 4
+        encoder_out = b * in_len * self.d_model * e
+        cross_kv = self.decoder_layers * 2 * b * in_len * self.inner * e
+        self_kv = self.decoder_layers * 2 * b * out_len * self.inner * e
+        # beam search reorders the cache with index_select: old and new copies coexist
+        kv = (cross_kv + self_kv) * (2 if beams > 1 else 1)
+        scores = b * self.vocab * 4 * 3       # logits, log-softmax and processed scores in float32
+        return max(encode, encoder_out + kv + scores)
+
+
+def fewer_beams(gen_kwargs):
+    """The same settings with half the beams, or None at one beam."""
+    beams = gen_kwargs.get("num_beams", 1)
+    if beams <= 1:
+        return None
+    kwargs = dict(gen_kwargs, num_beams=beams // 2)
+    groups = min(kwargs.get("num_beam_groups", 1), kwargs["num_beams"])
+    while kwargs["num_beams"] % groups:
+        groups -= 1
+    if groups > 1:
+        kwargs["num_beam_groups"] = groups
+    else:
+        kwargs.pop("num_beam_groups", None)
+        kwargs.pop("diversity_penalty", None)
+    if "num_return_sequences" in kwargs:
+        kwargs["num_return_sequences"] = min(kwargs["num_return_sequences"], kwargs["num_beams"])
+    if kwargs["num_beams"] == 1:
+        kwargs.pop("early_stopping", None)
+    return kwargs
+
+
+class Plan:
+    __slots__ = ("batch_size", "gen_kwargs", "nbytes", "degraded")
+
+    def __init__(self, batch_size, gen_kwargs, nbytes, degraded):
+        self.batch_size = batch_size
+        self.gen_kwargs = gen_kwargs
+        self.nbytes = nbytes
+        self.degraded = degraded    # None, "batch" or "beams"
+
+
+class GenerationMemory:
+    def __init__(self):
+        self.enabled = False
+        self.budget = 0
+        self.wait_seconds = 30.0
+        self.sample_interval = 0.005
+        self._cond = threading.Condition()
+        self._reserved = 0
+        self._active = 0
+        self._calibration = {}
+        self._peaks = {}            # token -> [baseline, peak] for the calls being sampled
+        self._sampler = None
+
+    def init_app(self, app):
+        self.enabled = app.config.get("GENERATION_MEMORY_ENABLED", True)
+        self.budget = app.config.get("GENERATION_MEMORY_BUDGET_MB", 0) * _MB
+        self.wait_seconds = app.config.get("GENERATION_MEMORY_WAIT_SECONDS", self.wait_seconds)
+        self.sample_interval = app.config.get("GENERATION_MEMORY_SAMPLE_MS", 5) / 1000.0
+        metrics.register_collector(lambda: {"generation_memory_reserved_bytes": self._reserved,
+                                            "generation_memory_active": self._active},
+                                   name="generation_memory")
+
+    # -------------------- estimates --------------------
+    def estimate(self, model_name, mdl, rows, in_len, gen_kwargs):
+        out_len = gen_kwargs.get("max_new_tokens", 20) + 1
+        beams = gen_kwargs.get("num_beams", 1)
+        # sampling without beams expands every row to its num_return_sequences
+        width = beams if beams > 1 else gen_kwargs.get("num_return_sequences", 1)
+        raw = ModelShape(mdl).peak_bytes(rows, in_len, out_len, width)
+        return int(raw * self._calibration.get(model_name, 1.0))
+
+    def plans(self, model_name, mdl, rows, in_len, gen_kwargs):
+        """Candidate plans, best quality first."""
+        kwargs, degraded = gen_kwargs, None
+        while kwargs is not None:
+            size = rows
+            while True:
+                yield Plan(size, kwargs, self.estimate(model_name, mdl, size, in_len, kwargs),
+                           degraded or ("batch" if size < rows else None))
+                if size == 1:
+                    break
+                size = math.ceil(size / 2)
+            kwargs, degraded = fewer_beams(kwargs), "beams"
+
+    def _capacity(self):
+        if self.budget:
+            return self.budget
+        headroom = memory_governor.headroom_bytes()
+        return None if headroom is None else max(0, headroom) + self._reserved
+
+    # -------------------- admission --------------------
+    @contextmanager
+    def reserve(self, model_name, mdl, rows, in_len, gen_kwargs):
+        """Yields the Plan to run; the memory stays reserved until the block exits."""
+        if not self.enabled:
+            yield Plan(rows, gen_kwargs, 0, None)
+            return
+
+        plans = list(self.plans(model_name, mdl, rows, in_len, gen_kwargs))
+        deadline = time.monotonic() + self.wait_seconds
+        waited = False
+        with self._cond:
+            while True:
+                capacity = self._capacity()
+                if capacity is None:
+                    plan = plans[0]
+                    break
+                free = capacity - self._reserved
+                timed_out = time.monotonic() >= deadline
+                # fewer beams only when the request does not fit even alone (or has waited enough)
+                fits_alone = any(p.nbytes <= capacity for p in plans if p.degraded != "beams")
+                plan = next((p for p in plans if p.nbytes <= free
+                             and (p.degraded != "beams" or not fits_alone or timed_out)), None)
+                if plan is not None:
+                    break
+                if not self._active or timed_out:
+                    plan = plans[-1]
+                    metrics.inc("generation_memory_overcommit_total", model=model_name)
+                    logger.warning(f"generate on {model_name} over the memory budget: needs "
+                                   f"{plan.nbytes // _MB}MB, {max(0, free) // _MB}MB free")
+                    break
+                if not waited:
+                    waited = True
+                    metrics.inc("generation_memory_waits_total", model=model_name)
+                self._cond.wait(max(0.0, deadline - time.monotonic()))
+            self._reserved += plan.nbytes
+            self._active += 1
+            solo = self._active == 1
+
+        if plan.degraded:
+            metrics.inc("generation_memory_degraded_total", model=model_name, how=plan.degraded)
+        metrics.observe("generate_estimate_bytes", plan.nbytes, model=model_name)
+        token = object()
+        self._track(token)
+        try:
+            yield plan
+        finally:
+            baseline, peak = self._untrack(token)
+            with self._cond:
+                self._reserved -= plan.nbytes
+                self._active -= 1
+                solo = solo and self._active == 0
+                self._cond.notify_all()
+            self._record(model_name, plan, peak - baseline, solo)
+
+    def _record(self, model_name, plan, actual, solo):
+        metrics.observe("generate_peak_bytes", actual, model=model_name)
+        if not solo or not plan.nbytes or actual <= 0:
+            return   # concurrent calls share the RSS: their deltas cannot be told apart
+        ratio = actual / plan.nbytes
+        metrics.observe("generate_peak_estimate_ratio", ratio, model=model_name)
+        if ratio > 1:
+            # only ever raised: the RSS delta is a lower bound of what the call used.
+            # Moving average in log space, each call moves the factor a fifth of the way.
+            current = self._calibration.get(model_name, 1.0)
+            self._calibration[model_name] = min(_MAX_CALIBRATION, current * ratio ** 0.2)
+
+    # -------------------- peak sampling --------------------
+    def _track(self, token):
+        rss = rss_bytes()
+        with self._cond:
+            self._peaks[token] = [rss, rss]
+            if self._sampler is None or not self._sampler.is_alive():
+                self._sampler = threading.Thread(target=self._sample, name="generation-memory", daemon=True)
+                self._sampler.start()
+
+    def _untrack(self, token):
+        rss = rss_bytes()
+        with self._cond:
+            baseline, peak = self._peaks.pop(token)
+        return baseline, max(peak, rss)
+
+    def _sample(self):
+        while True:
+            with self._cond:
+                if not self._peaks:
+                    self._sampler = None
+                    return
+            rss = rss_bytes()
+            with self._cond:
+                for entry in self._peaks.values():
+                    if rss > entry[1]:
+                        entry[1] = rss
+            time.sleep(self.sample_interval)
+
+
+generation_memory = GenerationMemory()
@@ -0,0 +1,106 @@
+"""
+Script-based language detection and per-span routing for mixed Arabic / English text.
+
+`script_ratios()` walks the text once with a single compiled regex that matches runs
+of Arabic letters or runs of Latin letters, and reports the share of letters in
+each script. `split_spans()` uses the same pass per sentence: every sentence is
+labelled by its majority script, neutral sentences (numbers, symbols) join their
+neighbour, and adjacent sentences with the same label are merged. An English
+paragraph that mentions one Arabic name therefore stays one English span instead
+of being sent to the Arabic model.
+
+Spans keep their surrounding whitespace, so `"".join(s.prefix + s.text + s.suffix)`
+reproduces the input exactly and corrected spans can be put back in order.
+"""
+import re
+from collections import namedtuple
+
+from utils.arabic_text import ARABIC_CHAR_CLASS
+
+AR = "ar"
+EN = "en"
+
+# share of Arabic letters at which a sentence is routed to the Arabic model
+ARABIC_THRESHOLD = 0.5
+
+_SCRIPT_RUN_RE = re.compile(f'([{ARABIC_CHAR_CLASS}]+)|([A-Za-z\u00C0-\u024F]+)')
+# a sentence: everything up to and including its terminator(s) and trailing whitespace
+_SENTENCE_RE = re.compile(r'[^.!?\u061F\u06D4\n]*(?:[.!?\u061F\u06D4]+|\n+|$)\s*')
+
+Span = namedtuple("Span", "lang prefix text suffix")
+
+
+def _letter_counts(text):
+    arabic = latin = 0
+    for m in _SCRIPT_RUN_RE.finditer(text):
+        if m.group(1):
+            arabic += m.end() - m.start()
+        else:
+            latin += m.end() - m.start()
+    return arabic, latin
+
+
+def script_ratios(text):
+    """{"ar": share of Arabic letters, "en": share of Latin letters} (0.0 / 0.0 when no letters)."""
+    arabic, latin = _letter_counts(text or "")
+    total = arabic + latin
+    if not total:
+        return {AR: 0.0, EN: 0.0}
+    return {AR: arabic / total, EN: latin / total}
+
+
+def detect_language(text, threshold=ARABIC_THRESHOLD):
+    arabic, latin = _letter_counts(text or "")
+    total = arabic + latin
+    return AR if total and arabic / total >= threshold else EN
+
+
+def split_sentences(text):
+    """Sentences of `text`, each with its terminator(s) and trailing whitespace."""
+    return [m.group(0) for m in _SENTENCE_RE.finditer(text or "") if m.group(0)]
+
+
+def split_spans(text, threshold=ARABIC_THRESHOLD):
+    """Split `text` into consecutive single-language Spans (see module docstring)."""
+    text = text or ""
+    pieces = []  # [lang or None, chunk]
+    for m in _SENTENCE_RE.finditer(text):
+        chunk = m.group(0)
+        if not chunk:
+            continue
+        arabic, latin = _letter_counts(chunk)
+        total = arabic + latin
+        lang = None if not total else (AR if arabic / total >= threshold else EN)
+        pieces.append([lang, chunk])
+
+    if not pieces:
+        return []
+
+    # neutral chunks take the language of the previous chunk (or the next one at the start)
+    first_lang = next((lang for lang, _ in pieces if lang), EN)
+    current = first_lang
+    for piece in pieces:
+        if piece[0] is None:
+            piece[0] = current
+        current = piece[0]
+
+    merged = [pieces[0]]
+    for lang, chunk in pieces[1:]:
+        if lang == merged[-1][0]:
+            merged[-1][1] += chunk
+        else:
+            merged.append([lang, chunk])
+
+    spans = []
+    for lang, chunk in merged:
+        stripped = chunk.strip()
+        start = chunk.find(stripped) if stripped else len(chunk)
+        spans.append(Span(lang, chunk[:start], stripped, chunk[start + len(stripped):]))
+    return spans
+
+
+def join_spans(spans, texts=None):
+    """Reassemble spans in order, optionally replacing each span's text with `texts[i]`."""
+    if texts is None:
+        texts = [s.text for s in spans]
+    return "".join(s.prefix + t + s.suffix for s, t in zip(spans, texts))
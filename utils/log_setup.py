@@ -0,0 +1,160 @@
+"""
+Non-blocking, structured application logging.
+
+`init_logging(app)` installs one `QueueHandler` on the root logger. Request threads
+only render the message and put the record on an in-memory queue. A
+`QueueListener` thread formats the records as JSON lines and writes them to stdout
+(`LOG_OUTPUT=stdout`, the default) or to a per-process file
+`LOG_DIR/app-<pid>.log` (`LOG_OUTPUT=file`). Workers therefore never share a
+file handle or rotate each other's files. Rotation is left to logrotate, which
+the `WatchedFileHandler` follows.
+
+Every record carries `request_id` when it is emitted inside a request. The id is
+the incoming `X-Request-ID` header or a generated one, and it is echoed back on
+the response. Records emitted inside a trace also carry `trace_id` and `span_id`
+(utils/tracing.py). The optional fields `latency_ms`, `tokens_in`, `tokens_out` and
+`model` are passed with `extra={...}`. Each request also emits one access record
+with its method, path, status and latency.
+
+The queue is bounded (`LOG_QUEUE_SIZE`). When it is full the record is dropped
+and counted in `log_dropped_total`, so a slow disk or pipe never stalls a request.
+"""
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+import sys
+import time
+import traceback
+import uuid
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, WatchedFileHandler
+
+from flask import g, has_request_context, request
+
+from utils import metrics
+from utils.tracing import current_ids
+
+access_logger = logging.getLogger("access")
+
+# attributes a caller may attach with extra={...}; everything else on the record is ignored
+EXTRA_FIELDS = ("request_id", "trace_id", "span_id", "latency_ms", "tokens_in", "tokens_out", "model",
+                "method", "path", "status", "endpoint")
+
+_state = {"listener": None, "handler": None, "app": None, "hooks": False}
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "pid": record.process,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        for field in EXTRA_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class RequestQueueHandler(QueueHandler):
+    """
+    Runs in the emitting thread: tags the record with the current request id and
+    reduces it to plain data (message rendered, traceback as text) so the listener
+    never touches request state or live objects.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        if has_request_context() and getattr(record, "request_id", None) is None:
+            record.request_id = g.get("request_id")
+        if getattr(record, "trace_id", None) is None:
+            record.trace_id, record.span_id = current_ids()
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = "".join(traceback.format_exception(*record.exc_info)).rstrip()
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            metrics.inc("log_dropped_total")
+
+
+def _output_handler(app):
+    if app.config.get("LOG_OUTPUT", "stdout") == "file":
+        log_dir = app.config.get("LOG_DIR") or "logs"
+        os.makedirs(log_dir, exist_ok=True)
+        handler = WatchedFileHandler(os.path.join(log_dir, f"app-{os.getpid()}.log"), encoding="utf-8")
+    else:
+        handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(JsonFormatter())
+    return handler
+
+
+def _start(app):
+    log_queue = queue.Queue(maxsize=app.config.get("LOG_QUEUE_SIZE", 10000))
+    handler = RequestQueueHandler(log_queue)
+    listener = QueueListener(log_queue, _output_handler(app), respect_handler_level=False)
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(app.config.get("LOG_LEVEL", "INFO"))
+
+    listener.start()
+    _state.update(listener=listener, handler=handler, app=app)
+    metrics.register_collector(lambda: {"log_queue_depth": log_queue.qsize()}, name="log_setup")
+
+
+def _restart_in_child():
+    # a forked worker inherits the handler but not the listener thread; give it its own
+    if _state["app"] is not None:
+        _state["listener"] = None
+        _start(_state["app"])
+
+
+def shutdown():
+    """Write out everything queued and stop the listener."""
+    listener = _state["listener"]
+    if listener is not None:
+        _state["listener"] = None
+        listener.stop()
+
+
+def init_logging(app):
+    if _state["listener"] is None:
+        _start(app)
+    if not _state["hooks"]:
+        _state["hooks"] = True
+        atexit.register(shutdown)
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=_restart_in_child)
+
+    @app.before_request
+    def _begin_request():
+        g.request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def _end_request(response):
+        started = g.get("request_started")
+        latency_ms = round((time.perf_counter() - started) * 1000, 2) if started else None
+        response.headers["X-Request-ID"] = g.get("request_id", "")
+        access_logger.info("request", extra={
+            "method": request.method, "path": request.path, "status": response.status_code,
+            "latency_ms": latency_ms, "endpoint": request.endpoint,
+        })
+        return response
@@ -0,0 +1,208 @@
+"""
+Memory governor: watermark-driven garbage collection and model eviction.
+
+Request code no longer runs `gc.collect()`. Objects are freed by reference counting
+as usual, and Python's generational GC handles cycles at its normal thresholds.
+A background thread reads the process RSS every `MEMORY_CHECK_INTERVAL` seconds.
+The read is one small file in /proc, so it costs almost nothing:
+
+* below the high watermark nothing happens, so steady-state requests pay no GC
+  tax;
+* above it, the governor runs one full collection, empties the CUDA cache, and
+  asks glibc to return freed arenas (`malloc_trim`). If RSS is still above the
+  low watermark, it evicts idle resident models (utils/model_registry.py), least
+  recently used first, until it is below the low watermark or no idle model is
+  left.
+
+The same eviction runs before a new model is loaded (`make_room`), so loading a
+second model never pushes a worker over its limit when an idle one can go.
+
+The watermarks are `MEMORY_HIGH_WATERMARK_MB` / `MEMORY_LOW_WATERMARK_MB`, per
+worker process. With 0 (the default) they are 85% / 70% of the memory limit (the
+cgroup limit when running in a container, the physical memory otherwise) divided
+by `MEMORY_WORKERS`: every worker enforces them on its own RSS, so each gets its
+share of the machine. The model swap headroom check and the generation memory
+budget are derived from them and inherit the share.
+
+Metrics: process_rss_bytes, memory_limit_bytes, memory_{high,low}_watermark_bytes,
+memory_gc_runs_total, memory_gc_seconds, plus the registry's models_resident and
+model_resident_bytes{model}.
+"""
+import atexit
+import ctypes
+import ctypes.util
+import gc
+import logging
+import os
+import sys
+import threading
+import time
+
+from utils import metrics
+from utils.model_registry import resident_models
+
+logger = logging.getLogger("memory_governor")
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+_MB = 1024 * 1024
+
+
+def rss_bytes():
+    """Current resident set size of this process."""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        import resource  # peak, not current, but the best available without /proc
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def memory_limit_bytes():
+    """cgroup memory limit when set, physical memory otherwise."""
+    for path in ("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory/memory.limit_in_bytes"):
+        try:
+            with open(path) as f:
+                value = f.read().strip()
+        except OSError:
+            continue
+        if value.isdigit() and int(value) < (1 << 60):
+            return int(value)
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (AttributeError, ValueError, OSError):
+        return 0
+
+
+def _load_malloc_trim():
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6")
+        return libc.malloc_trim
+    except (OSError, AttributeError):
+        return None
+
+
+class MemoryGovernor:
+    def __init__(self, check_interval=1.0):
+        self.check_interval = check_interval
+        self.limit = 0
+        self.high = 0
+        self.low = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._stuck_rss = 0  # RSS at the last check that could not get below the high watermark
+        self._malloc_trim = _load_malloc_trim()
+
+    def init_app(self, app):
+        self.limit = memory_limit_bytes()
+        high_mb = app.config.get("MEMORY_HIGH_WATERMARK_MB", 0)
+        low_mb = app.config.get("MEMORY_LOW_WATERMARK_MB", 0)
+        # each worker process enforces the watermarks on its own RSS: split the limit between them
+        share = self.limit / max(1, app.config.get("MEMORY_WORKERS", 1))
+        self.high = high_mb * _MB if high_mb else int(share * 0.85)
+        self.low = low_mb * _MB if low_mb else int(share * 0.70)
+        self.low = min(self.low, self.high)
+        self.check_interval = app.config.get("MEMORY_CHECK_INTERVAL", self.check_interval)
+        metrics.register_collector(self._collect)
+        if app.config.get("MEMORY_GOVERNOR_ENABLED", True) and self.high:
+            self.start()
+
+    def _collect(self):
+        return {
+            "process_rss_bytes": rss_bytes(),
+            "memory_limit_bytes": self.limit,
+            "memory_high_watermark_bytes": self.high,
+            "memory_low_watermark_bytes": self.low,
+        }
+
+    # -------------------- actions --------------------
+    def collect(self, reason):
+        """One full collection, CUDA cache release and malloc_trim."""
+        started = time.perf_counter()
+        gc.collect()
+        torch = sys.modules.get("torch")
+        if torch is not None and torch.cuda.is_available():
+            torch.cuda.empty_cache()
+        if self._malloc_trim is not None:
+            self._malloc_trim(0)
+        metrics.inc("memory_gc_runs_total", reason=reason)
+        metrics.observe("memory_gc_seconds", time.perf_counter() - started)
+
+    def _evict_until(self, target, exclude=()):
+        rss = rss_bytes()
+        while rss > target:
+            name = resident_models.evict_lru(exclude=exclude)
+            if name is None:
+                break
+            self.collect("evict")
+            new_rss = rss_bytes()
+            logger.info(f"Evicted model {name}: rss {rss // _MB}MB -> {new_rss // _MB}MB")
+            rss = new_rss
+        return rss
+
+    def check(self):
+        """
+        Act only when RSS is above the high watermark. When the last attempt could not
+        get below it (every resident model was in use), wait until a model goes idle or
+        RSS grows by another 5% instead of running a full collection on every tick.
+        """
+        rss = rss_bytes()
+        if not self.high or rss <= self.high:
+            self._stuck_rss = 0
+            return
+        if self._stuck_rss and rss <= self._stuck_rss * 1.05 and not resident_models.has_idle():
+            return
+        with self._lock:
+            if rss_bytes() <= self.high:
+                return
+            self.collect("high_watermark")
+            rss = self._evict_until(self.low)
+            if rss > self.high:
+                self._stuck_rss = rss
+                metrics.inc("memory_over_high_watermark_total")
+                logger.warning(f"RSS {rss // _MB}MB still above high watermark {self.high // _MB}MB "
+                               f"with no idle model left to evict")
+
+    def headroom_bytes(self):
+        """Bytes left below the high watermark (None when there is no watermark)."""
+        return self.high - rss_bytes() if self.high else None
+
+    def make_room(self, exclude=()):
+        """Before loading a model: if RSS is over the high watermark, evict down to the low one."""
+        if not self.high or rss_bytes() <= self.high:
+            return
+        with self._lock:
+            self._evict_until(self.low, exclude=exclude)
+
+    # -------------------- background thread --------------------
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        first_start = self._thread is None
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="memory-governor", daemon=True)
+        self._thread.start()
+        if first_start:
+            atexit.register(self.shutdown)
+            if hasattr(os, "register_at_fork"):
+                os.register_at_fork(after_in_child=self._after_fork)
+
+    def _after_fork(self):
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="memory-governor", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.check_interval):
+            try:
+                self.check()
+            except Exception as e:
+                logger.exception(f"Memory governor check failed: {e}")
+
+    def shutdown(self):
+        self._stop.set()
+
+
+memory_governor = MemoryGovernor()
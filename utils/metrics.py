@@ -0,0 +1,96 @@
+"""
+In-process metrics registry.
+
+Counters, gauges and simple summaries (count / sum / max) kept in memory and
+exposed by the `/api/metrics` route in Main.create_app, either as JSON or in the
+Prometheus text format (`?format=prometheus`).
+
+Values that are cheaper to read on demand (pool status, RSS, ...) are provided by
+collectors: callables registered with `register_collector()` that return a dict of
+gauge values and are only called when the metrics are scraped. A collector
+registered under a name replaces the previous one of that name, so services
+re-initialized by another `create_app()` do not pile up collectors.
+"""
+import threading
+
+_lock = threading.Lock()
+_counters = {}
+_gauges = {}
+_summaries = {}
+_collectors = {}   # name (or the callable itself) -> callable
+
+
+def _key(name, labels):
+    if not labels:
+        return name
+    return name + "{" + ",".join(f'{k}="{v}"' for k, v in sorted(labels.items())) + "}"
+
+
+def inc(name, value=1, **labels):
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def set_gauge(name, value, **labels):
+    key = _key(name, labels)
+    with _lock:
+        _gauges[key] = value
+
+
+def observe(name, value, **labels):
+    key = _key(name, labels)
+    with _lock:
+        s = _summaries.get(key)
+        if s is None:
+            s = _summaries[key] = {"count": 0, "sum": 0.0, "max": value}
+        s["count"] += 1
+        s["sum"] += value
+        if value > s["max"]:
+            s["max"] = value
+
+
+def register_collector(fn, name=None):
+    with _lock:
+        _collectors[name or fn] = fn
+    return fn
+
+
+def snapshot():
+    with _lock:
+        data = {
+            "counters": dict(_counters),
+            "gauges": dict(_gauges),
+            "summaries": {k: dict(v) for k, v in _summaries.items()},
+        }
+        collectors = list(_collectors.values())
+    for fn in collectors:
+        try:
+            data["gauges"].update(fn() or {})
+        except Exception:
+            # a broken collector must never break the metrics endpoint
+            inc("metrics_collector_errors_total")
+    return data
+
+
+def render_prometheus():
+    data = snapshot()
+    lines = []
+    for key, value in sorted(data["counters"].items()):
+        lines.append(f"{key} {value}")
+    for key, value in sorted(data["gauges"].items()):
+        lines.append(f"{key} {value}")
+    for key, s in sorted(data["summaries"].items()):
+        name, _, labels = key.partition("{")
+        labels = "{" + labels if labels else ""
+        lines.append(f"{name}_count{labels} {s['count']}")
+        lines.append(f"{name}_sum{labels} {s['sum']}")
+        lines.append(f"{name}_max{labels} {s['max']}")
+    return "\n".join(lines) + "\n"
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _gauges.clear()
+        _summaries.clear()
@@ -0,0 +1,189 @@
+"""
+Registry of resident models.
+
+A model is loaded on first use and then stays in memory, so later requests skip
+`from_pretrained` and the allocator churn. Request code borrows it with:
+
+    with resident_models.use("ar", _load_arabic) as model:
+        with model.tokenizer_lock:
+            enc = model.tok(...)
+        out = model.mdl.generate(...)
+
+* Concurrent first requests for the same name load it once (one lock per name).
+* `in_use` counts the requests currently holding the model. The memory governor
+  only evicts idle models, least recently used first.
+* Tokenizers are not safe to call from several threads at once (fast tokenizers
+  raise "Already borrowed"), so each model carries a lock for tokenize/decode.
+  `generate` itself runs outside it.
+
+Evicting only drops the registry's reference. A request still holding the model
+keeps it alive until it returns, and the next request loads it again.
+
+Retiring (after a hot swap, utils/model_swap.py) also drops the reference, but
+the name is not loaded again until a reloaded routing table serves it again
+(`reinstate`): `acquire` raises ModelRetired, so a request that resolved its
+route just before the switch resolves again and gets the new model.
+"""
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from utils import metrics
+from utils.tracing import tracer
+
+
+class ModelRetired(Exception):
+    pass
+
+
+def model_nbytes(mdl):
+    """Bytes held by the model's parameters and buffers (0 when it is not a torch module)."""
+    total = 0
+    for tensors in (getattr(mdl, "parameters", None), getattr(mdl, "buffers", None)):
+        if tensors is None:
+            continue
+        for t in tensors():
+            total += t.numel() * t.element_size()
+    return total
+
+
+class ResidentModel:
+    def __init__(self, name, tok, mdl, load_seconds):
+        self.name = name
+        self.tok = tok
+        self.mdl = mdl
+        self.nbytes = model_nbytes(mdl)
+        self.load_seconds = load_seconds
+        self.loaded_at = time.time()
+        self.last_used = time.monotonic()
+        self.in_use = 0
+        self.tokenizer_lock = threading.Lock()
+
+    def stats(self):
+        return {
+            "name": self.name,
+            "bytes": self.nbytes,
+            "in_use": self.in_use,
+            "load_seconds": round(self.load_seconds, 3),
+            "idle_seconds": round(time.monotonic() - self.last_used, 1),
+        }
+
+
+class ModelRegistry:
+    def __init__(self):
+        self._models = OrderedDict()  # name -> ResidentModel, least recently used first
+        self._lock = threading.Lock()
+        self._load_locks = {}
+        self._retired = set()
+        metrics.register_collector(self._collect)
+
+    def _collect(self):
+        with self._lock:
+            entries = list(self._models.values())
+        values = {"models_resident": len(entries)}
+        for entry in entries:
+            values[f'model_resident_bytes{{model="{entry.name}"}}'] = entry.nbytes
+            values[f'model_in_use{{model="{entry.name}"}}'] = entry.in_use
+        return values
+
+    def _acquire(self, name):
+        with self._lock:
+            entry = self._models.get(name)
+            if entry is not None:
+                self._models.move_to_end(name)
+                entry.in_use += 1
+                entry.last_used = time.monotonic()
+            return entry
+
+    def _release(self, entry):
+        with self._lock:
+            entry.in_use -= 1
+            entry.last_used = time.monotonic()
+
+    def load(self, name, loader):
+        """Load `name` with `loader()` -> (tok, mdl) unless it is already resident."""
+        with self._lock:
+            load_lock = self._load_locks.setdefault(name, threading.Lock())
+        with load_lock:
+            with self._lock:
+                if name in self._retired:
+                    raise ModelRetired(name)
+                entry = self._models.get(name)
+            if entry is not None:
+                return entry
+            from utils.memory_governor import memory_governor
+            memory_governor.make_room(exclude=(name,))
+
+            started = time.perf_counter()
+            with tracer.span("model.load", model=name):
+                tok, mdl = loader()
+            entry = ResidentModel(name, tok, mdl, time.perf_counter() - started)
+            with self._lock:
+                self._models[name] = entry
+            metrics.inc("model_loads_total", model=name)
+            metrics.observe("model_load_seconds", entry.load_seconds, model=name)
+            return entry
+
+    def acquire(self, name, loader):
+        """Borrow `name`, loading it first if needed. Pair with release()."""
+        entry = self._acquire(name)
+        while entry is None:  # loop: it may be evicted again between load and acquire
+            self.load(name, loader)
+            entry = self._acquire(name)
+        return entry
+
+    def release(self, entry):
+        self._release(entry)
+
+    @contextmanager
+    def use(self, name, loader):
+        entry = self.acquire(name, loader)
+        try:
+            yield entry
+        finally:
+            self._release(entry)
+
+    def retire(self, name):
+        """Drop `name` for good and return its entry (None if it was not resident)."""
+        with self._lock:
+            self._retired.add(name)
+            return self._models.pop(name, None)
+
+    def reinstate(self, names):
+        """Undo retire() for `names`, e.g. when a reloaded routing table serves them again."""
+        with self._lock:
+            self._retired.difference_update(names)
+
+    def evict(self, name):
+        with self._lock:
+            entry = self._models.pop(name, None)
+        if entry is not None:
+            metrics.inc("model_evictions_total", model=name)
+        return entry is not None
+
+    def evict_lru(self, exclude=()):
+        """
+        Evict the least recently used model that no request is holding and return its
+        name (None when there is none). Models in use are skipped: dropping them would
+        not free anything until their requests return.
+        """
+        with self._lock:
+            name = next((e.name for e in self._models.values()
+                         if e.in_use == 0 and e.name not in exclude), None)
+            if name is not None:
+                del self._models[name]
+        if name is not None:
+            metrics.inc("model_evictions_total", model=name)
+        return name
+
+    def has_idle(self):
+        with self._lock:
+            return any(e.in_use == 0 for e in self._models.values())
+
+    def resident(self):
+        with self._lock:
+            return [e.stats() for e in self._models.values()]
+
+
+resident_models = ModelRegistry()
@@ -0,0 +1,262 @@
+"""
+Model routing: which model, backend and generation profile serve a request.
+
+The routing table (MODEL_ROUTING_FILE, Config/model_routing.json by default) has
+four sections:
+
+* models    name -> directory under MODELS_ROOT, backend (how it is loaded), dtype, and
+            an optional fallback model used when the directory holds no weights;
+* profiles  name -> keyword arguments for `generate()`;
+* tiers     latency tiers by text length, the first one that fits wins, e.g.
+            [{"name": "short", "max_chars": 200}, {"name": "long"}];
+* routes    ordered rules {task, lang, style, tier} -> {model, profile}. A key left
+            out matches anything, and the first matching rule wins.
+
+Everything is checked and resolved once, in `init_app`. Unknown models, profiles,
+tiers or backends fail app startup. Fallbacks are followed on disk at that point,
+so requests never probe the filesystem. `route()` results are memoized per
+(task, lang, style, tier).
+
+A backend is a loader `(path, dtype) -> (tok, mdl)`, registered with
+`model_router.register_backend(name, loader)` before `init_app`. The inference
+engine registers its own at import (Operation/engine/backends.py).
+
+A profile may carry a "retry" object: overrides used when a task runs a prompt a
+second time (`route.generate_kwargs(retry=True)`). `block_sentinel_tokens` and
+`copy_bias` are engine options, turned into generate() arguments by
+Operation/engine/pipeline.py.
+
+`load()` swaps in a new table atomically, and `switch_model()` (the hot swap in
+utils/model_swap.py) repoints one model. Requests already holding a Route keep
+using it. Listeners added with `add_listener()`, such as result caches, are called
+after every change. `use()` resolves a route and borrows its resident model in
+one step, resolving again if the model was swapped out in between.
+"""
+import json
+import logging
+import os
+import threading
+from contextlib import contextmanager
+
+from utils import metrics
+from utils.model_registry import ModelRetired, resident_models
+
+logger = logging.getLogger("model_routing")
+
+WEIGHT_FILES = ("model.safetensors", "model.safetensors.index.json", "pytorch_model.bin", "pytorch_model.bin.index.json",
+                "encoder_model.onnx", "model.onnx")
+ROUTE_KEYS = ("task", "lang", "style", "tier")
+
+
+def has_weights(path):
+    return any(os.path.exists(os.path.join(path, f)) for f in WEIGHT_FILES)
+
+
+class Route:
+    __slots__ = ("model", "path", "backend", "dtype", "profile", "load")
+
+    def __init__(self, model, path, backend, dtype, profile, load):
+        self.model = model          # registry key: the resolved model name
+        self.path = path
+        self.backend = backend
+        self.dtype = dtype
+        self.profile = profile      # generate() kwargs plus backend options; copy before changing
+        self.load = load            # () -> (tok, mdl), for resident_models.use()
+
+    def generate_kwargs(self, retry=False):
+        kwargs = {k: v for k, v in self.profile.items() if k != "retry"}
+        if retry:
+            kwargs.update(self.profile.get("retry", {}))
+        return kwargs
+
+
+class ModelRouter:
+    def __init__(self):
+        self.models_root = ""
+        self._backends = {}
+        self._models = {}      # name -> {"name", "key", "path", "backend", "dtype"} after fallback resolution
+        self._swaps = 0
+        self._profiles = {}
+        self._tiers = [("any", None)]   # [(name, max_chars or None)]
+        self._routes = []
+        self._cache = {}
+        self._listeners = []
+        self._lock = threading.Lock()
+
+    def register_backend(self, name, loader):
+        self._backends[name] = loader
+
+    def add_listener(self, fn):
+        self._listeners.append(fn)
+
+    def _changed(self):
+        for fn in self._listeners:
+            try:
+                fn()
+            except Exception as e:
+                logger.exception(f"Routing change listener failed: {e}")
+
+    def init_app(self, app):
+        self.load(app.config.get("MODEL_ROUTING_FILE"), app.config.get("MODELS_ROOT", ""))
+
+    # -------------------- loading / validation --------------------
+    def load(self, path, models_root):
+        with open(path, encoding="utf-8") as f:
+            table = json.load(f)
+        models = table.get("models", {})
+        profiles = table.get("profiles", {})
+        tiers = [(t["name"], t.get("max_chars")) for t in table.get("tiers", [])] or [("any", None)]
+        tier_names = {name for name, _ in tiers}
+
+        for name, spec in models.items():
+            if spec.get("backend") not in self._backends:
+                raise ValueError(f"model {name}: unknown backend {spec.get('backend')!r}")
+            if spec.get("fallback") and spec["fallback"] not in models:
+                raise ValueError(f"model {name}: unknown fallback {spec['fallback']!r}")
+        routes = table.get("routes", [])
+        for i, rule in enumerate(routes):
+            unknown = set(rule) - set(ROUTE_KEYS) - {"model", "profile"}
+            if unknown:
+                raise ValueError(f"route {i}: unknown keys {sorted(unknown)}")
+            if rule.get("model") not in models:
+                raise ValueError(f"route {i}: unknown model {rule.get('model')!r}")
+            if rule.get("profile") not in profiles:
+                raise ValueError(f"route {i}: unknown profile {rule.get('profile')!r}")
+            if "tier" in rule and rule["tier"] not in tier_names:
+                raise ValueError(f"route {i}: unknown tier {rule['tier']!r}")
+
+        resolved = {name: self._resolve(name, models, models_root) for name in models}
+        # a key retired by an earlier swap is served again when a new table names it
+        resident_models.reinstate(m["key"] for m in resolved.values())
+        with self._lock:
+            self.models_root = models_root
+            self._models = resolved
+            self._profiles = profiles
+            self._tiers = tiers
+            self._routes = routes
+            self._cache = {}
+        self._changed()
+
+    @staticmethod
+    def _resolve(name, models, models_root):
+        """Follow the fallback chain to the first model whose directory has weights."""
+        chain, current = [], name
+        while current and current not in chain:
+            chain.append(current)
+            spec = models[current]
+            path = os.path.join(models_root, spec["path"])
+            if has_weights(path):
+                if current != name:
+                    logger.warning(f"Model {name}: no weights in its directory, using fallback {current}")
+                return {"name": current, "key": current, "path": path, "backend": spec["backend"],
+                        "dtype": spec.get("dtype", "float32")}
+            current = spec.get("fallback")
+        spec = models[name]
+        logger.warning(f"Model {name}: no weights under {os.path.join(models_root, spec['path'])} "
+                       f"(fallbacks: {', '.join(chain[1:]) or 'none'}); loading it will fail")
+        return {"name": name, "key": name, "path": os.path.join(models_root, spec["path"]),
+                "backend": spec["backend"], "dtype": spec.get("dtype", "float32")}
+
+    # -------------------- lookups --------------------
+    def tier(self, chars):
+        for name, max_chars in self._tiers:
+            if max_chars is None or chars <= max_chars:
+                return name
+        return self._tiers[-1][0]
+
+    def route(self, task, lang, style=None, chars=0):
+        cache = self._cache  # load() replaces the dict, so a route built from the old table is not kept
+        key = (task, lang, style, self.tier(chars))
+        route = cache.get(key)
+        if route is None:
+            route = self._build(key)
+            cache[key] = route
+        metrics.inc("model_route_total", task=task, lang=lang, tier=key[3], model=route.model)
+        return route
+
+    def _build(self, key):
+        with self._lock:
+            for rule in self._routes:
+                if all(rule.get(k) in (None, v) for k, v in zip(ROUTE_KEYS, key)):
+                    model = self._models[rule["model"]]
+                    profile = self._profiles[rule["profile"]]
+                    break
+            else:
+                raise LookupError("no model route for task={} lang={} style={} tier={}".format(*key))
+        loader = self._backends[model["backend"]]
+        path, dtype = model["path"], model["dtype"]
+        return Route(model["key"], path, model["backend"], dtype, profile, lambda: loader(path, dtype))
+
+    @contextmanager
+    def use(self, task, lang, style=None, chars=0):
+        """Yield (route, resident model) for a request; the model is borrowed until the block exits."""
+        retired = None
+        while True:
+            route = self.route(task, lang, style, chars)
+            try:
+                entry = resident_models.acquire(route.model, route.load)
+                break
+            except ModelRetired:
+                # swapped between route() and acquire(): the next route() sees the new model.
+                # A table still pointing at the retired key would loop forever.
+                if route.model == retired:
+                    raise
+                retired = route.model
+        try:
+            yield route, entry
+        finally:
+            resident_models.release(entry)
+
+    # -------------------- hot swap --------------------
+    def model(self, name):
+        with self._lock:
+            model = self._models.get(name)
+            return dict(model) if model else None
+
+    def prepare_model(self, name, path, backend=None, dtype=None):
+        """The replacement for model `name`, under a new registry key. Nothing is switched yet."""
+        with self._lock:
+            current = self._models.get(name)
+            if current is None:
+                raise KeyError(name)
+            self._swaps += 1
+            key = f"{name}#{self._swaps}"
+        backend = backend or current["backend"]
+        if backend not in self._backends:
+            raise ValueError(f"unknown backend {backend!r}")
+        loader = self._backends[backend]
+        dtype = dtype or current["dtype"]
+        return {"name": name, "key": key, "path": path, "backend": backend, "dtype": dtype,
+                "load": lambda: loader(path, dtype)}
+
+    def switch_model(self, name, replacement):
+        """
+        Point the table entry `name` at `replacement` and return its old registry key.
+        Other entries that resolved to the same model (fallbacks) keep it.
+        """
+        spec = {k: v for k, v in replacement.items() if k != "load"}
+        with self._lock:
+            old_key = self._models[name]["key"]
+            self._models = dict(self._models, **{name: spec})
+            self._cache = {}
+        self._changed()
+        return old_key
+
+    def serves(self, key):
+        """Whether some table entry still resolves to registry key `key`."""
+        with self._lock:
+            return any(m["key"] == key for m in self._models.values())
+
+    def model_dir(self, name):
+        """Resolved directory of a model in the table (MODELS_ROOT/<name> for others)."""
+        model = self._models.get(name)
+        return model["path"] if model else os.path.join(self.models_root, name)
+
+    def describe(self):
+        with self._lock:
+            return {"models": {n: dict(m) for n, m in self._models.items()},
+                    "tiers": [{"name": n, "max_chars": c} for n, c in self._tiers],
+                    "routes": list(self._routes)}
+
+
+model_router = ModelRouter()
@@ -0,0 +1,198 @@
+"""
+Hot model swap: replace the model behind a routing-table name without a restart.
+
+A swap runs as a background job through these states:
+
+    checking   the new directory has weights, and their size fits below the memory
+               governor's high watermark next to everything already resident;
+    loading    the new model is loaded under a new registry key ("<name>#<n>") and
+               held, so the governor cannot evict it before it serves;
+    warming    one short generate call, so the first real request does not pay for
+               lazy initialisation (allocator growth, kernel selection);
+    switching  model_router.switch_model() repoints the routes atomically. Requests
+               that already hold the old model keep it, new requests get the new
+               one, and result caches are cleared;
+    draining   the old key is retired; the job waits until its last in-flight
+               request returns, then drops it and runs one collection. When the
+               old model was a fallback other table entries still resolve to,
+               only this entry moves and the old model stays;
+    done / failed.
+
+Only one swap per model runs at a time. A swap changes this worker process only
+and lasts until restart; to make it permanent, edit Config/model_routing.json.
+"""
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from utils import metrics
+from utils.memory_governor import memory_governor
+from utils.model_registry import resident_models
+from utils.model_routing import has_weights, model_router
+
+logger = logging.getLogger("model_swap")
+
+_WEIGHT_SUFFIXES = (".safetensors", ".bin")
+_MAX_JOBS = 50
+
+
+class SwapError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def weights_nbytes(path):
+    """On-disk size of the weights in `path`: a fair estimate of the memory they take once loaded."""
+    try:
+        names = os.listdir(path)
+    except OSError:
+        return 0
+    safetensors = [n for n in names if n.endswith(".safetensors")]
+    return sum(os.path.getsize(os.path.join(path, n))
+               for n in (safetensors or [n for n in names if n.endswith(_WEIGHT_SUFFIXES)]))
+
+
+def warm_up(model, text="Warm up."):
+    import torch
+    with model.tokenizer_lock:
+        enc = model.tok([text], return_tensors="pt")
+    with torch.no_grad():
+        model.mdl.generate(input_ids=enc.input_ids, attention_mask=enc.attention_mask, max_new_tokens=4)
+
+
+class SwapJob:
+    def __init__(self, model, path, backend, dtype, warmup):
+        self.id = uuid.uuid4().hex[:12]
+        self.model = model
+        self.path = path
+        self.backend = backend
+        self.dtype = dtype
+        self.warmup = warmup
+        self.state = "checking"
+        self.error = None
+        self.estimate_bytes = 0
+        self.old_key = None
+        self.new_key = None
+        self.draining = 0
+        self.timings = {}
+        self._marks = []
+        self.created = time.time()
+        self.finished = None
+
+    def to_dict(self):
+        return {
+            "id": self.id, "model": self.model, "path": self.path, "backend": self.backend,
+            "dtype": self.dtype, "state": self.state, "error": self.error,
+            "estimate_bytes": self.estimate_bytes, "old_key": self.old_key, "new_key": self.new_key,
+            "draining": self.draining, "timings": self.timings,
+            "created": self.created, "finished": self.finished,
+        }
+
+
+class ModelSwapper:
+    def __init__(self, drain_timeout=300.0):
+        self.drain_timeout = drain_timeout
+        self._jobs = OrderedDict()
+        self._active = {}   # model name -> running job
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.drain_timeout = app.config.get("MODEL_SWAP_DRAIN_TIMEOUT", self.drain_timeout)
+
+    def _check_headroom(self, job):
+        if not has_weights(job.path):
+            raise SwapError(f"no weights under {job.path}")
+        job.estimate_bytes = weights_nbytes(job.path)
+        headroom = memory_governor.headroom_bytes()
+        if headroom is not None and job.estimate_bytes > headroom:
+            raise SwapError(f"not enough memory headroom: the model needs about {job.estimate_bytes // 2**20}MB, "
+                            f"{max(headroom, 0) // 2**20}MB left below the high watermark", status=507)
+
+    def start(self, name, path, backend=None, dtype=None, warmup=True):
+        current = model_router.model(name)
+        if current is None:
+            raise SwapError(f"unknown model {name!r}", status=404)
+        job = SwapJob(name, path, backend or current["backend"], dtype or current["dtype"], warmup)
+        with self._lock:
+            if name in self._active:
+                raise SwapError(f"a swap of {name} is already running ({self._active[name].id})", status=409)
+            self._check_headroom(job)
+            self._active[name] = job
+            self._jobs[job.id] = job
+            while len(self._jobs) > _MAX_JOBS:
+                self._jobs.popitem(last=False)
+        threading.Thread(target=self._run, args=(job,), name=f"model-swap-{name}", daemon=True).start()
+        return job
+
+    def _step(self, job, state):
+        job.state = state
+        job._marks.append((state, time.perf_counter()))
+
+    def _run(self, job):
+        entry = None
+        try:
+            self._step(job, "checking")
+            self._check_headroom(job)  # again: memory may have moved since the request was accepted
+            self._step(job, "loading")
+            replacement = model_router.prepare_model(job.model, job.path, job.backend, job.dtype)
+            job.new_key = replacement["key"]
+            entry = resident_models.acquire(replacement["key"], replacement["load"])
+
+            if job.warmup:
+                self._step(job, "warming")
+                warm_up(entry)
+
+            self._step(job, "switching")
+            job.old_key = model_router.switch_model(job.model, replacement)
+            resident_models.release(entry)
+            entry = None
+            logger.info(f"Model {job.model} switched: {job.old_key} -> {job.new_key}")
+
+            self._step(job, "draining")
+            # a fallback shared with other table entries stays: only this entry moved
+            old = None if model_router.serves(job.old_key) else resident_models.retire(job.old_key)
+            deadline = time.monotonic() + self.drain_timeout
+            while old is not None and old.in_use > 0 and time.monotonic() < deadline:
+                job.draining = old.in_use
+                time.sleep(0.05)
+            if old is not None and old.in_use > 0:
+                # the switch itself succeeded; the old model goes when those requests return
+                job.error = f"{old.in_use} request(s) still on {job.old_key} after {self.drain_timeout}s"
+                logger.warning(f"Swap of model {job.model}: {job.error}")
+            job.draining = 0
+            del old
+            memory_governor.collect("swap")
+            job.state = "done"
+            metrics.inc("model_swaps_total", model=job.model, result="done")
+        except Exception as e:
+            job.state = "failed"
+            job.error = str(e)
+            metrics.inc("model_swaps_total", model=job.model, result="failed")
+            logger.exception(f"Swap of model {job.model} failed: {e}")
+            if entry is not None:
+                resident_models.release(entry)
+                if job.old_key is None:
+                    resident_models.retire(job.new_key)  # never served: drop the half-installed model
+        finally:
+            # seconds spent in each state
+            ends = [t for _, t in job._marks[1:]] + [time.perf_counter()]
+            job.timings = {state: round(end - t, 3) for (state, t), end in zip(job._marks, ends)}
+            job.finished = time.time()
+            with self._lock:
+                self._active.pop(job.model, None)
+
+    def job(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+        return job.to_dict() if job else None
+
+    def jobs(self):
+        with self._lock:
+            return [j.to_dict() for j in reversed(self._jobs.values())]
+
+
+model_swapper = ModelSwapper()
@@ -0,0 +1,104 @@
+"""
+Ancestor / descendant lookups over the orgs tree.
+
+Backed by the `orgs_closure` table (Models/Orgs_model.py), which is kept in sync
+with `orgs.orgup` on insert / update / delete. The whole closure is loaded once
+into process memory, so permission and routing checks are dict lookups; the
+cache is dropped after any commit that changes the tree, and refreshed at least
+every `ORG_HIERARCHY_CACHE_TTL` seconds to pick up changes made by other worker
+processes.
+"""
+import threading
+import time
+
+from exts import db
+
+ORG_HIERARCHY_CACHE_TTL = 300  # seconds
+
+_lock = threading.Lock()
+_cache = None          # {"ancestors": {org: [(ancestor, depth), ...]}, "descendants": {org: set}, "loaded_at": t}
+
+
+def invalidate():
+    global _cache
+    with _lock:
+        _cache = None
+
+
+def _load():
+    from Models.Orgs_model import orgs_closure
+
+    ancestors, descendants = {}, {}
+    rows = db.session.query(orgs_closure.ancestor_id, orgs_closure.descendant_id, orgs_closure.depth).all()
+    for ancestor, descendant, depth in rows:
+        ancestors.setdefault(descendant, []).append((ancestor, depth))
+        descendants.setdefault(ancestor, set()).add(descendant)
+    for chain in ancestors.values():
+        chain.sort(key=lambda item: item[1])
+    return {"ancestors": ancestors, "descendants": descendants, "loaded_at": time.monotonic()}
+
+
+def _tree():
+    global _cache
+    cache = _cache
+    if cache is None or time.monotonic() - cache["loaded_at"] > ORG_HIERARCHY_CACHE_TTL:
+        with _lock:
+            cache = _cache
+            if cache is None or time.monotonic() - cache["loaded_at"] > ORG_HIERARCHY_CACHE_TTL:
+                cache = _cache = _load()
+    return cache
+
+
+def get_descendant_ids(orgid, include_self=True):
+    """All orgs under `orgid` (the whole subtree)."""
+    ids = _tree()["descendants"].get(orgid, set())
+    if include_self:
+        return frozenset(ids | {orgid})
+    return frozenset(ids - {orgid})
+
+
+def get_ancestor_ids(orgid, include_self=True):
+    """Ancestors of `orgid`, nearest first (parent, grandparent, ..., root)."""
+    chain = [a for a, depth in _tree()["ancestors"].get(orgid, []) if depth > 0]
+    return [orgid] + chain if include_self else chain
+
+
+def is_descendant(orgid, ancestor_id):
+    """True if `orgid` is `ancestor_id` or lies anywhere below it."""
+    return orgid == ancestor_id or orgid in _tree()["descendants"].get(ancestor_id, ())
+
+
+def arrange_childorg_hierarchy(orgid):
+    return sorted(get_descendant_ids(orgid))
+
+
+def arrange_parentorg_hierarchy(orgid):
+    return get_ancestor_ids(orgid)
+
+
+def rebuild_closure():
+    """
+    Recompute orgs_closure from orgs.orgup. Tool/migrate_indexes.py runs it to
+    backfill a new table; run it too after changes that bypass the ORM events.
+    """
+    from Models.Orgs_model import orgs, orgs_closure
+
+    parent = dict(db.session.query(orgs.orgid, orgs.orgup).all())
+    rows = []
+    for orgid in parent:
+        rows.append({"ancestor_id": orgid, "descendant_id": orgid, "depth": 0})
+        seen, up, depth = {orgid}, parent.get(orgid), 1
+        while up is not None and up in parent and up not in seen:
+            rows.append({"ancestor_id": up, "descendant_id": orgid, "depth": depth})
+            seen.add(up)
+            up, depth = parent.get(up), depth + 1
+
+    try:
+        db.session.query(orgs_closure).delete(synchronize_session=False)
+        orgs_closure.bulk_insert(rows, commit=False)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    invalidate()
+    return len(rows)
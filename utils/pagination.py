@@ -0,0 +1,95 @@
+"""
+Keyset (cursor) pagination.
+
+Offset pagination (`LIMIT n OFFSET k`) makes the database read and throw away k
+rows, so page 10 000 of an inbox is as slow as reading the whole inbox. Keyset
+pagination remembers the sort key of the last row returned and asks for rows
+strictly after it, which an index on the sort columns answers directly, so
+every page costs the same however deep it is.
+
+    page = keyset_paginate(
+        transfer_book.query.filter_by(org_recieve_id=org_id, is_delete=False),
+        [transfer_book.time_stamp, transfer_book.trans_id],
+        cursor=request.args.get("cursor"), limit=20)
+    # -> {"items": [...], "next_cursor": "eyJ2Ijog...", "has_more": True}
+
+The last order column must be unique (normally the primary key) so rows with the
+same timestamp are neither skipped nor repeated.
+"""
+import base64
+import json
+from datetime import date, datetime
+
+from sqlalchemy import and_, or_, tuple_
+
+MAX_PAGE_SIZE = 200
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        if "d" in value:
+            return date.fromisoformat(value["d"])
+    return value
+
+
+def encode_cursor(values):
+    raw = json.dumps([_encode_value(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor, size):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(f"malformed cursor: {e}")
+    if not isinstance(values, list) or len(values) != size:
+        raise InvalidCursor("cursor does not match the sort columns")
+    return [_decode_value(v) for v in values]
+
+
+def _after(columns, values, descending, dialect):
+    if dialect in ("postgresql", "sqlite"):
+        # row-value comparison, answered by a single index range scan
+        left, right = tuple_(*columns), tuple_(*values)
+        return left < right if descending else left > right
+    # expanded form for backends without row values (SQL Server)
+    clauses = []
+    for i, column in enumerate(columns):
+        equal = [c == v for c, v in zip(columns[:i], values[:i])]
+        step = column < values[i] if descending else column > values[i]
+        clauses.append(and_(*equal, step))
+    return or_(*clauses)
+
+
+def keyset_paginate(query, order_columns, cursor=None, limit=20, descending=True):
+    limit = max(1, min(int(limit or 20), MAX_PAGE_SIZE))
+    if cursor:
+        values = decode_cursor(cursor, len(order_columns))
+        dialect = query.session.get_bind().dialect.name
+        query = query.filter(_after(order_columns, values, descending, dialect))
+
+    ordering = [c.desc() if descending else c.asc() for c in order_columns]
+    rows = query.order_by(*ordering).limit(limit + 1).all()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = None
+    if has_more and rows:
+        last = rows[-1]
+        next_cursor = encode_cursor([getattr(last, c.key) for c in order_columns])
+    return {"items": rows, "next_cursor": next_cursor, "has_more": has_more}
@@ -0,0 +1,151 @@
+"""
+Low-overhead sampling profiler and one-shot torch.profiler capture.
+
+`sample_stacks()` wakes up every `interval` seconds and reads the Python stack
+of every other thread from `sys._current_frames()`. It does not use tracing
+hooks, so the profiled threads run at full speed. The cost is one stack walk
+per thread per tick on the sampler thread. Stacks are aggregated into the
+collapsed format ("root;caller;leaf count" per line) read by flamegraph.pl,
+speedscope and inferno. Time spent in native code, such as torch kernels inside
+`mdl.generate`, is attributed to the Python frame that called into it.
+
+Threads parked in a wait (idle request threads, the log/trace/audit writers)
+are skipped unless `include_idle=True`.
+
+`torch_capture` is a one-shot slot. `arm()` it, and the next generate call that
+runs inside `torch_capture.profile()` is executed under `torch.profiler`. Its
+per-operator breakdown is kept for the caller that armed it.
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+# leaf frames that mean "this thread is blocked, not working"
+_IDLE_LEAVES = {
+    ("threading.py", "wait"), ("threading.py", "_wait_for_tstate_lock"), ("queue.py", "get"),
+    ("selectors.py", "select"), ("socket.py", "accept"), ("socketserver.py", "serve_forever"),
+    ("socket.py", "readinto"), ("ssl.py", "read"),
+}
+
+_busy = threading.Lock()
+
+
+class ProfilerBusy(Exception):
+    pass
+
+
+def _frame_label(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _is_idle(frame):
+    return (os.path.basename(frame.f_code.co_filename), frame.f_code.co_name) in _IDLE_LEAVES
+
+
+def sample_stacks(duration, interval=0.01, include_idle=False, capture=None):
+    """
+    Sample all threads for `duration` seconds. Returns (Counter of collapsed stack ->
+    samples, number of ticks, capture result). Only one profile runs at a time
+    (ProfilerBusy otherwise). A `capture` (torch_capture) is armed only once the
+    profile is this caller's, and disarmed when it ends, so a refused caller never
+    touches the capture of the profile that is running.
+    """
+    if not _busy.acquire(blocking=False):
+        raise ProfilerBusy()
+    if capture is not None:
+        capture.arm()
+    try:
+        own = threading.get_ident()
+        names = {}
+        stacks = Counter()
+        labels = {}
+        ticks = 0
+        deadline = time.perf_counter() + duration
+        while time.perf_counter() < deadline:
+            if len(names) != threading.active_count():
+                names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own or (not include_idle and _is_idle(frame)):
+                    continue
+                parts = []
+                while frame is not None:
+                    code = frame.f_code
+                    label = labels.get(code)
+                    if label is None:
+                        label = labels[code] = _frame_label(code)
+                    parts.append(label)
+                    frame = frame.f_back
+                parts.append(names.get(ident, f"thread-{ident}"))
+                stacks[";".join(reversed(parts))] += 1
+            ticks += 1
+            time.sleep(interval)
+        return stacks, ticks, capture.wait(0) if capture is not None else None
+    finally:
+        if capture is not None:
+            capture.disarm()
+        _busy.release()
+
+
+def collapsed(stacks):
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+class TorchCapture:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._armed = False
+        self._done = threading.Event()
+        self.result = None
+
+    def arm(self):
+        with self._lock:
+            self._armed = True
+            self.result = None
+            self._done.clear()
+
+    def disarm(self):
+        with self._lock:
+            self._armed = False
+
+    def wait(self, timeout):
+        return self.result if self._done.wait(timeout) else None
+
+    def _take(self):
+        with self._lock:
+            taken, self._armed = self._armed, False
+        return taken
+
+    @contextmanager
+    def profile(self, **attributes):
+        """Run the block under torch.profiler when armed; a plain pass-through otherwise."""
+        if not self._armed or not self._take():
+            yield
+            return
+        from torch.profiler import ProfilerActivity, profile
+
+        activities = [ProfilerActivity.CPU]
+        torch = sys.modules.get("torch")
+        if torch is not None and torch.cuda.is_available():
+            activities.append(ProfilerActivity.CUDA)
+        started = time.perf_counter()
+        with profile(activities=activities, record_shapes=True) as prof:
+            yield
+        averages = prof.key_averages()
+        self.result = {
+            **attributes,
+            "wall_ms": round((time.perf_counter() - started) * 1000, 2),
+            "table": averages.table(sort_by="self_cpu_time_total", row_limit=30),
+            "operators": [
+                {"name": e.key, "calls": e.count,
+                 "self_cpu_ms": round(e.self_cpu_time_total / 1000, 3),
+                 "cpu_ms": round(e.cpu_time_total / 1000, 3)}
+                for e in sorted(averages, key=lambda e: e.self_cpu_time_total, reverse=True)[:30]
+            ],
+        }
+        self._done.set()
+
+
+torch_capture = TorchCapture()
@@ -0,0 +1,74 @@
+"""
+Request validation for the text endpoints (grammar_check, paraphrase, aiBypass, coedit).
+
+A `TextRequestSchema` is declared once per endpoint with its allowed styles and the
+config key holding its character limit. `parse()` rejects a request before any
+tokenization work, with a cost that does not depend on the size of the input:
+
+* the declared Content-Length is checked against the byte budget implied by the
+  character limit, so an oversize body is refused without being read or parsed;
+* the body must be a JSON object whose `text` is a non-empty string no longer than
+  the limit, whose `style` (optional) is a string in the allowed set, and whose
+  `format` (optional) is one of the endpoint's output formats.
+
+Rejections are counted in `request_rejected_total{endpoint,reason}`.
+"""
+from flask import current_app, jsonify, make_response
+
+from utils import metrics
+
+# a JSON string may encode one character as a 6-byte \uXXXX escape (ensure_ascii)
+_BYTES_PER_CHAR = 6
+_BODY_OVERHEAD = 1024
+
+
+class TextRequestSchema:
+    def __init__(self, endpoint, styles, default_style, limit_key, default_limit, formats=("text",)):
+        self.endpoint = endpoint
+        self.styles = frozenset(styles)
+        self.default_style = default_style
+        self.limit_key = limit_key
+        self.default_limit = default_limit
+        self.formats = tuple(formats)   # the first one is the default
+        self._styles_message = f"Invalid style. Allowed: {sorted(self.styles)}"
+        self._formats_message = f"Invalid format. Allowed: {list(self.formats)}"
+
+    def max_chars(self):
+        return current_app.config.get(self.limit_key, self.default_limit)
+
+    def _reject(self, reason, message, code=400):
+        metrics.inc("request_rejected_total", endpoint=self.endpoint, reason=reason)
+        return make_response(jsonify({"error": message}), code)
+
+    def parse(self, request):
+        """Returns ((text, style, format), None) for a valid request, or (None, error response)."""
+        max_chars = self.max_chars()
+        length = request.content_length
+        if length is not None and length > max_chars * _BYTES_PER_CHAR + _BODY_OVERHEAD:
+            return None, self._reject("too_large", f"text is too long (max {max_chars} characters)", 413)
+
+        data = request.get_json(force=True, silent=True)
+        if not isinstance(data, dict):
+            return None, self._reject("malformed", "request body must be a JSON object")
+
+        text = data.get("text")
+        if text is not None and not isinstance(text, str):
+            return None, self._reject("malformed", "text must be a string")
+        text = (text or "").strip()
+        if not text:
+            return None, self._reject("missing_text", "text is required")
+        if len(text) > max_chars:
+            return None, self._reject("too_large", f"text is too long (max {max_chars} characters)", 413)
+
+        style = data.get("style")
+        if style is not None and not isinstance(style, str):
+            return None, self._reject("malformed", "style must be a string")
+        style = (style or self.default_style).strip().lower()
+        if style not in self.styles:
+            return None, self._reject("invalid_style", self._styles_message)
+
+        output_format = data.get("format", self.formats[0])
+        if output_format not in self.formats:
+            return None, self._reject("invalid_format", self._formats_message)
+
+        return (text, style, output_format), None
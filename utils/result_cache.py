@@ -0,0 +1,51 @@
+"""
+Thread-safe LRU cache for model outputs, keyed by (task, style, text).
+
+Decoding is deterministic for a given (task, style, text), so a repeated request is
+served from memory instead of running `generate` again. The key is the exact text
+with only whitespace runs folded. Diacritics and Arabic letter variants are
+deliberately not folded (`arabic_text.normalize()`): they are exactly what a
+corrector is asked to judge, so two such inputs must not share an output. Hits and misses are
+exported as `result_cache_hits_total` / `result_cache_misses_total` per cache name.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+
+from utils import metrics
+
+
+class ResultCache:
+    def __init__(self, name, max_entries=2048):
+        self.name = name
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        metrics.register_collector(lambda: {f'result_cache_entries{{cache="{self.name}"}}': len(self._data)},
+                                   name=f"result_cache:{name}")
+
+    @staticmethod
+    def key(*parts):
+        raw = "\x1f".join(" ".join(str(p).split()) for p in parts)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+        metrics.inc("result_cache_hits_total" if value is not None else "result_cache_misses_total", cache=self.name)
+        return value
+
+    def put(self, key, value):
+        if self.max_entries <= 0 or value is None:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
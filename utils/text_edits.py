@@ -0,0 +1,118 @@
+"""
+Structured edits between a text and its correction.
+
+`diff_edits(original, corrected)` returns the changes as a list of
+
+    {"start": 12, "end": 16, "original": "have", "replacement": "has", "type": "grammar"}
+
+where start / end are character (code point) offsets into `original`, end
+exclusive. An insertion has start == end and an empty "original"; a deletion has
+an empty "replacement". Applying the edits from last to first (`apply_edits`)
+turns `original` into `corrected` exactly.
+
+The alignment is over tokens, not characters: a token is a word (letters, digits,
+Arabic diacritics, inner apostrophes) or one punctuation mark, with the
+whitespace in front of it. The common prefix and suffix are skipped first, so a long document with a few
+corrections is aligned in about one pass. Only the differing middle goes through
+difflib's SequenceMatcher. Each edit then covers whole words, and the common
+prefix of their leading whitespace is moved out of the edit.
+
+Types: "whitespace", "punctuation" (only punctuation differs), "case", "spelling"
+(one word, either the same after Arabic normalization (hamza, ta marbuta, alif
+maqsura, diacritics), a transposition, or at least 75% similar without being an English inflection
+or contraction change), "grammar" (anything else).
+"""
+import difflib
+import os
+import re
+
+from utils.arabic_text import normalize
+
+_WORD_CHARS = r'\w\u0610-\u061A\u064B-\u065F\u0670\u06D6-\u06ED\u0640'
+_TOKEN_RE = re.compile(rf"\s*(?:[{_WORD_CHARS}]+(?:['\u2019][{_WORD_CHARS}]+)*|[^{_WORD_CHARS}\s])|\s+$")
+_PUNCT_RE = re.compile(rf'[^{_WORD_CHARS}\s]')
+
+SPELLING_SIMILARITY = 0.75
+# English endings whose change is grammar (agreement, tense), not spelling
+INFLECTIONS = frozenset(("", "s", "es", "ed", "d", "ing", "er", "est", "ly"))
+
+
+def tokenize(text):
+    """Token strings and their start offsets; "".join(tokens) == text."""
+    tokens, starts = [], []
+    for m in _TOKEN_RE.finditer(text):
+        tokens.append(m.group())
+        starts.append(m.start())
+    return tokens, starts
+
+
+def edit_type(original, replacement):
+    a, b = original.strip(), replacement.strip()
+    if a == b:
+        return "whitespace"
+    if _PUNCT_RE.sub(" ", a).split() == _PUNCT_RE.sub(" ", b).split():
+        return "punctuation"
+    if a.lower() == b.lower():
+        return "case"
+    if a and b and len(a.split()) == 1 and len(b.split()) == 1:
+        if normalize(a) == normalize(b) or sorted(a) == sorted(b):   # letter variants, transpositions
+            return "spelling"
+        if not _inflection(a.lower(), b.lower()) and \
+                difflib.SequenceMatcher(None, a, b).ratio() >= SPELLING_SIMILARITY:
+            return "spelling"
+    return "grammar"
+
+
+def _inflection(a, b):
+    """reduce -> reduces, walk -> walked, don't -> doesn't: a change of form, not of spelling."""
+    if "'" in a + b or "\u2019" in a + b:
+        return True
+    stem = len(os.path.commonprefix([a, b]))
+    return stem >= 3 and a[stem:] in INFLECTIONS and b[stem:] in INFLECTIONS
+
+
+def _edit(original, start, end, replacement):
+    old = original[start:end]
+    # leading whitespace both sides share is not part of the edit; only the common prefix of
+    # the two runs is shared ("\t" -> " " and "\n" -> " " are edits)
+    shared = len(os.path.commonprefix([old[:len(old) - len(old.lstrip())],
+                                       replacement[:len(replacement) - len(replacement.lstrip())]]))
+    old, replacement, start = old[shared:], replacement[shared:], start + shared
+    return {"start": start, "end": start + len(old), "original": old,
+            "replacement": replacement, "type": edit_type(old, replacement)}
+
+
+def diff_edits(original, corrected):
+    if original == corrected:
+        return []
+    a, a_starts = tokenize(original)
+    b, _ = tokenize(corrected)
+    a_starts.append(len(original))
+
+    head = 0
+    limit = min(len(a), len(b))
+    while head < limit and a[head] == b[head]:
+        head += 1
+    tail = 0
+    while tail < limit - head and a[-1 - tail] == b[-1 - tail]:
+        tail += 1
+
+    edits = []
+    matcher = difflib.SequenceMatcher(None, a[head:len(a) - tail], b[head:len(b) - tail], autojunk=False)
+    for op, i1, i2, j1, j2 in matcher.get_opcodes():
+        if op == "equal":
+            continue
+        i1, i2, j1, j2 = i1 + head, i2 + head, j1 + head, j2 + head
+        if op == "replace" and i2 - i1 == j2 - j1:
+            # word for word: one edit per word, so each gets its own type
+            for i, j in zip(range(i1, i2), range(j1, j2)):
+                edits.append(_edit(original, a_starts[i], a_starts[i + 1], b[j]))
+        else:
+            edits.append(_edit(original, a_starts[i1], a_starts[i2], "".join(b[j1:j2])))
+    return edits
+
+
+def apply_edits(text, edits):
+    for edit in sorted(edits, key=lambda e: e["start"], reverse=True):
+        text = text[:edit["start"]] + edit["replacement"] + text[edit["end"]:]
+    return text
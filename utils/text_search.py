@@ -0,0 +1,365 @@
+"""
+Full-text search over books (subject, description, notes) and attachments
+(attachments_text).
+
+Two interchangeable inverted-index backends, picked from the database in use:
+
+* PostgreSQL: a `search_documents` table with a generated `tsvector` column and a
+  GIN index, ranked with ts_rank_cd, joined to books to leave out soft-deleted ones.
+* Everything else (SQLite DevConfig, SQL Server): a local on-disk SQLite FTS5
+  index at SEARCH_INDEX_PATH, ranked with bm25.
+
+PostgreSQL has no Arabic text-search dictionary, so both backends index text that
+was normalized in Python first (utils/arabic_text.py: tashkeel, letter variants,
+tatweel, case) and use a plain word tokenizer ('simple' / unicode61); queries go
+through the same normalization. The original text is stored next to it, and
+snippets are cut from that (`highlight()`), so users see their own spelling and
+diacritics.
+
+Results are books: a book whose subject and attachments both match is one hit,
+ranked by its best document, and `search()` returns the number of matching books
+that are not deleted.
+
+The index is updated incrementally: mapper events on books / attachments queue the
+changed documents on the session, and they are written once the transaction
+commits. Bulk statements bypass those events; run `reindex_all()` after a bulk
+import.
+"""
+import logging
+import re
+import sqlite3
+import threading
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session, object_session
+
+from exts import db
+from utils import arabic_text
+
+logger = logging.getLogger("text_search")
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+# a word of the original text: \w does not match Arabic diacritics and tatweel
+_WORD_RE = re.compile(r'[\w\u0610-\u061A\u064B-\u065F\u0670\u06D6-\u06ED\u0640]+')
+SNIPPET_WORDS = 16
+
+
+def normalize(value):
+    return arabic_text.normalize(value, casefold=True)
+
+
+def query_terms(query):
+    return _TOKEN_RE.findall(normalize(query))
+
+
+def highlight(original, terms, max_words=SNIPPET_WORDS):
+    """Up to `max_words` words of `original` from around the first match, matched words in [ ]."""
+    terms = set(terms)
+    words = list(_WORD_RE.finditer(original or ""))
+    if not words:
+        return ""
+    hits = [i for i, m in enumerate(words) if any(t in terms for t in query_terms(m.group()))]
+    start = max(0, min((hits[0] if hits else 0) - 3, len(words) - max_words))
+    end = min(len(words), start + max_words)
+    out, pos = [], words[start].start()
+    for i in range(start, end):
+        m = words[i]
+        out.append(original[pos:m.start()])
+        out.append(f"[{m.group()}]" if i in hits else m.group())
+        pos = m.end()
+    return ("..." if start else "") + "".join(out) + ("..." if end < len(words) else "")
+
+
+# -------------------- Documents --------------------
+# (doc_type, doc_id, book_id, normalized content, original text)
+def book_source(book):
+    parts = (book.subject, book.description, book.notes)
+    return ("book", book.book_id, book.book_id, "\n".join(p for p in parts if p))
+
+
+def attachment_source(attachment):
+    return ("attachment", attachment.attach_id, attachment.book_id, attachment.attachments_text or "")
+
+
+def documents(sources):
+    """Index documents for (doc_type, doc_id, book_id, original) sources, normalized in one batch."""
+    contents = arabic_text.normalize_batch([original for *_, original in sources], casefold=True)
+    return [(t, i, b, content, original) for (t, i, b, original), content in zip(sources, contents)]
+
+
+def book_document(book):
+    return documents([book_source(book)])[0]
+
+
+def attachment_document(attachment):
+    return documents([attachment_source(attachment)])[0]
+
+
+# -------------------- Local backend (SQLite FTS5, on disk) --------------------
+class LocalSearchIndex:
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._ensure_schema()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _ensure_schema(self):
+        conn = self._conn()
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS search_docs (
+                rowid INTEGER PRIMARY KEY,
+                doc_type TEXT NOT NULL,
+                doc_id INTEGER NOT NULL,
+                book_id INTEGER,
+                original TEXT,
+                UNIQUE (doc_type, doc_id)
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS search_fts USING fts5(content, tokenize='unicode61');
+        """)
+        # indexes built before snippets came from the original text; reindex_all() fills it
+        if "original" not in {row[1] for row in conn.execute("PRAGMA table_info(search_docs)")}:
+            conn.execute("ALTER TABLE search_docs ADD COLUMN original TEXT")
+        conn.commit()
+
+    def upsert(self, docs):
+        with self._write_lock:
+            conn = self._conn()
+            with conn:
+                for doc_type, doc_id, book_id, content, original in docs:
+                    rowid = conn.execute(
+                        "INSERT INTO search_docs (doc_type, doc_id, book_id, original) VALUES (?, ?, ?, ?) "
+                        "ON CONFLICT (doc_type, doc_id) DO UPDATE "
+                        "SET book_id = excluded.book_id, original = excluded.original "
+                        "RETURNING rowid",
+                        (doc_type, doc_id, book_id, original)).fetchone()[0]
+                    conn.execute("DELETE FROM search_fts WHERE rowid = ?", (rowid,))
+                    if content:
+                        conn.execute("INSERT INTO search_fts (rowid, content) VALUES (?, ?)", (rowid, content))
+
+    def delete(self, keys):
+        with self._write_lock:
+            conn = self._conn()
+            with conn:
+                for doc_type, doc_id in keys:
+                    row = conn.execute("SELECT rowid FROM search_docs WHERE doc_type = ? AND doc_id = ?",
+                                       (doc_type, doc_id)).fetchone()
+                    if row:
+                        conn.execute("DELETE FROM search_fts WHERE rowid = ?", row)
+                        conn.execute("DELETE FROM search_docs WHERE rowid = ?", row)
+
+    def size(self):
+        return self._conn().execute("SELECT count(*) FROM search_docs").fetchone()[0]
+
+    def search(self, query, limit=20, offset=0):
+        """(number of matching books, one hit per book on this page: its best-ranked document)."""
+        terms = query_terms(query)
+        if not terms:
+            return 0, []
+        match = " ".join('"' + t.replace('"', '""') + '"' for t in terms)
+        # the index lives outside the database, so a book counts as live while its own
+        # document is indexed: soft and hard deletes remove it, and its attachments drop
+        # out with it before paging
+        matches = ("SELECT d.doc_type, d.doc_id, d.book_id, bm25(search_fts) AS score, "
+                   "coalesce(d.original, search_fts.content) AS original "
+                   "FROM search_fts JOIN search_docs d ON d.rowid = search_fts.rowid "
+                   "WHERE search_fts MATCH ? AND EXISTS (SELECT 1 FROM search_docs b "
+                   "WHERE b.doc_type = 'book' AND b.doc_id = d.book_id)")
+        conn = self._conn()
+        total = conn.execute(f"SELECT count(DISTINCT book_id) FROM ({matches})", (match,)).fetchone()[0]
+        rows = conn.execute(
+            "SELECT doc_type, doc_id, book_id, score, original FROM ("
+            "SELECT m.*, row_number() OVER (PARTITION BY book_id ORDER BY score, doc_type DESC) AS best "
+            f"FROM ({matches}) m) WHERE best = 1 ORDER BY score, book_id LIMIT ? OFFSET ?",
+            (match, limit, offset)).fetchall()
+        # bm25 is "lower is better"; flip it so both backends rank by higher score
+        return total, [{"doc_type": r[0], "doc_id": r[1], "book_id": r[2], "score": -r[3],
+                        "snippet": highlight(r[4], terms)} for r in rows]
+
+
+# -------------------- PostgreSQL backend (tsvector + GIN) --------------------
+class PostgresSearchIndex:
+    def __init__(self, engine):
+        self.engine = engine
+        self._ensure_schema()
+
+    def _ensure_schema(self):
+        with self.engine.begin() as conn:
+            conn.execute(text("""
+                CREATE TABLE IF NOT EXISTS search_documents (
+                    doc_type VARCHAR(20) NOT NULL,
+                    doc_id BIGINT NOT NULL,
+                    book_id BIGINT,
+                    content TEXT NOT NULL DEFAULT '',
+                    original TEXT,
+                    tsv TSVECTOR GENERATED ALWAYS AS (to_tsvector('simple', content)) STORED,
+                    PRIMARY KEY (doc_type, doc_id)
+                )"""))
+            conn.execute(text("ALTER TABLE search_documents ADD COLUMN IF NOT EXISTS original TEXT"))
+            conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_search_documents_tsv ON search_documents USING GIN (tsv)"))
+
+    def upsert(self, docs):
+        rows = [{"doc_type": t, "doc_id": i, "book_id": b, "content": c or "", "original": o}
+                for t, i, b, c, o in docs]
+        if not rows:
+            return
+        with self.engine.begin() as conn:
+            conn.execute(text(
+                "INSERT INTO search_documents (doc_type, doc_id, book_id, content, original) "
+                "VALUES (:doc_type, :doc_id, :book_id, :content, :original) "
+                "ON CONFLICT (doc_type, doc_id) DO UPDATE "
+                "SET book_id = EXCLUDED.book_id, content = EXCLUDED.content, original = EXCLUDED.original"), rows)
+
+    def delete(self, keys):
+        rows = [{"doc_type": t, "doc_id": i} for t, i in keys]
+        if not rows:
+            return
+        with self.engine.begin() as conn:
+            conn.execute(text("DELETE FROM search_documents WHERE doc_type = :doc_type AND doc_id = :doc_id"), rows)
+
+    def size(self):
+        with self.engine.connect() as conn:
+            return conn.execute(text("SELECT count(*) FROM search_documents")).scalar()
+
+    def search(self, query, limit=20, offset=0):
+        """(number of matching books, one hit per book on this page: its best-ranked document)."""
+        from Models.Books_model import books
+
+        terms = query_terms(query)
+        if not terms:
+            return 0, []
+        params = {"q": " & ".join(terms), "limit": limit, "offset": offset}
+        # soft-deleted books are filtered here, before paging, so pages are full and total is exact
+        matches = ("FROM search_documents d JOIN {books} b ON b.book_id = d.book_id, "
+                   "to_tsquery('simple', :q) q "
+                   "WHERE d.tsv @@ q AND b.is_delete IS NOT TRUE").format(books=books.__table__.name)
+        with self.engine.connect() as conn:
+            total = conn.execute(text(f"SELECT count(DISTINCT d.book_id) {matches}"), params).scalar()
+            rows = conn.execute(text(
+                "SELECT doc_type, doc_id, book_id, score, original FROM ("
+                "SELECT DISTINCT ON (d.book_id) d.doc_type, d.doc_id, d.book_id, "
+                "coalesce(d.original, d.content) AS original, "
+                f"ts_rank_cd(d.tsv, q) AS score {matches} "
+                "ORDER BY d.book_id, score DESC, d.doc_type DESC) best "
+                "ORDER BY score DESC, book_id LIMIT :limit OFFSET :offset"), params).fetchall()
+        return total, [{"doc_type": r[0], "doc_id": r[1], "book_id": r[2], "score": float(r[3]),
+                        "snippet": highlight(r[4], terms)} for r in rows]
+
+
+# -------------------- Wiring --------------------
+_index = None
+_index_lock = threading.Lock()
+_app = None
+
+
+def get_search_index():
+    """The process-wide index; created on first use inside an app context."""
+    global _index
+    if _index is None:
+        from flask import current_app
+        with _index_lock:
+            if _index is None:
+                engine = db.engine
+                if engine.dialect.name == "postgresql":
+                    _index = PostgresSearchIndex(engine)
+                else:
+                    _index = LocalSearchIndex(current_app.config["SEARCH_INDEX_PATH"])
+    return _index
+
+
+def _queue(target, op):
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault("search_pending", []).append(op)
+
+
+def _on_book_change(mapper, connection, target):
+    if target.is_delete:
+        _queue(target, ("delete", ("book", target.book_id)))
+    else:
+        _queue(target, ("upsert", book_document(target)))
+
+
+def _on_attachment_change(mapper, connection, target):
+    if target.is_delete:
+        _queue(target, ("delete", ("attachment", target.attach_id)))
+    else:
+        _queue(target, ("upsert", attachment_document(target)))
+
+
+def _on_book_delete(mapper, connection, target):
+    _queue(target, ("delete", ("book", target.book_id)))
+
+
+def _on_attachment_delete(mapper, connection, target):
+    _queue(target, ("delete", ("attachment", target.attach_id)))
+
+
+def _after_commit(session):
+    pending = session.info.pop("search_pending", None)
+    if not pending or _app is None:
+        return
+    upserts = [doc for op, doc in pending if op == "upsert"]
+    deletes = [key for op, key in pending if op == "delete"]
+    try:
+        with _app.app_context():
+            index = get_search_index()
+            if deletes:
+                index.delete(deletes)
+            if upserts:
+                index.upsert(upserts)
+    except Exception as e:
+        # the row itself is committed; a missed index update is repaired by reindex_all()
+        logger.exception(f"Search index update failed: {e}")
+
+
+def _after_rollback(session):
+    session.info.pop("search_pending", None)
+
+
+def init_search(app):
+    global _app
+    from Models.Books_model import books, attachments
+
+    _app = app
+    if not app.config.get("SEARCH_ENABLED", True):
+        return
+    for model, handler in ((books, _on_book_change), (attachments, _on_attachment_change)):
+        for name in ("after_insert", "after_update"):
+            if not event.contains(model, name, handler):
+                event.listen(model, name, handler)
+        delete_handler = _on_book_delete if model is books else _on_attachment_delete
+        if not event.contains(model, "after_delete", delete_handler):
+            event.listen(model, "after_delete", delete_handler)
+    if not event.contains(Session, "after_commit", _after_commit):
+        event.listen(Session, "after_commit", _after_commit)
+        event.listen(Session, "after_rollback", _after_rollback)
+
+
+def reindex_all(batch_size=5000):
+    """Rebuild the index from the tables (initial backfill / after bulk imports)."""
+    from Models.Books_model import books, attachments
+
+    index = get_search_index()
+    count = 0
+    for model, source in ((books, book_source), (attachments, attachment_source)):
+        batch = []
+        for obj in model.query.filter(model.is_delete.isnot(True)).yield_per(batch_size):
+            batch.append(source(obj))
+            if len(batch) >= batch_size:
+                index.upsert(documents(batch))
+                count += len(batch)
+                batch = []
+        if batch:
+            index.upsert(documents(batch))
+            count += len(batch)
+    return count
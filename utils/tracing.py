@@ -0,0 +1,314 @@
+"""
+Request tracing with W3C trace context and OTLP/JSON export.
+
+Each HTTP request gets a trace. The trace id comes from an incoming `traceparent`
+header, so a caller's trace continues here, or it is generated. The id is stored
+in a context variable and:
+
+* is attached to every log record as `trace_id` / `span_id` (utils/log_setup.py);
+* is returned on the response as `traceparent`, next to `X-Request-ID`. When the
+  caller sent no X-Request-ID, the trace id is used as the request id.
+
+Stages are timed with `tracer.span("generate", lang="ar")` blocks. A span that
+raises is marked with status ERROR and the exception type.
+
+Sampling is decided once per trace: an upstream `traceparent` decision is kept,
+otherwise a trace is sampled with probability `TRACE_SAMPLE_RATIO`. Spans of an
+unsampled trace cost one context-variable read. Sampled spans are handed to a
+bounded queue. A background thread writes them as OTLP/JSON lines
+(`ExportTraceServiceRequest` per batch) to `TRACE_EXPORT_DIR/spans-<pid>.jsonl`.
+The OpenTelemetry collector's `otlpjsonfile` receiver can read that file
+directly, and the format is the same as what `opentelemetry-exporter-otlp` would
+send.
+
+When the proxy sets `X-Request-Start` (nginx `t=${msec}`), the time between the
+proxy accepting the request and the worker picking it up is recorded as a
+`queue` span.
+"""
+import atexit
+import contextvars
+import json
+import logging
+import os
+import queue
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import g, request
+
+from utils import metrics
+
+logger = logging.getLogger("tracing")
+
+_TRACEPARENT_RE = re.compile(r'^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$')
+_SPAN_KIND_INTERNAL = 1
+_SPAN_KIND_SERVER = 2
+_STATUS_OK = 1
+_STATUS_ERROR = 2
+
+# (trace_id, span_id, sampled) of the innermost active span
+_current = contextvars.ContextVar("trace_context", default=None)
+
+
+def _new_id(nbytes):
+    return "%0*x" % (nbytes * 2, random.getrandbits(nbytes * 8))
+
+
+def current_ids():
+    """(trace_id, span_id) of the active span, or (None, None) outside a trace."""
+    ctx = _current.get()
+    return (ctx[0], ctx[1]) if ctx else (None, None)
+
+
+def _otlp_value(value):
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class Span:
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "kind", "start_ns", "end_ns",
+                 "attributes", "status", "status_message")
+
+    def __init__(self, name, trace_id, parent_id, kind=_SPAN_KIND_INTERNAL, start_ns=None, attributes=None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = _new_id(8)
+        self.parent_id = parent_id
+        self.kind = kind
+        self.start_ns = start_ns or time.time_ns()
+        self.end_ns = None
+        self.attributes = dict(attributes or {})
+        self.status = _STATUS_OK
+        self.status_message = ""
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def set_error(self, exc):
+        self.status = _STATUS_ERROR
+        self.status_message = type(exc).__name__
+        self.attributes["exception.type"] = type(exc).__name__
+
+    def to_otlp(self):
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in self.attributes.items() if v is not None],
+            "status": {"code": self.status, "message": self.status_message},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+class _NoopSpan:
+    def set_attribute(self, key, value):
+        pass
+
+    def set_error(self, exc):
+        pass
+
+
+_NOOP = _NoopSpan()
+_STOP = object()
+
+
+class Tracer:
+    def __init__(self, sample_ratio=0.1, queue_size=10000, flush_interval=1.0):
+        self.enabled = False
+        self.sample_ratio = sample_ratio
+        self.flush_interval = flush_interval
+        self.service_name = "grammar-check"
+        self.export_path = None
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.enabled = app.config.get("TRACE_ENABLED", True)
+        self.sample_ratio = app.config.get("TRACE_SAMPLE_RATIO", self.sample_ratio)
+        self.service_name = app.config.get("TRACE_SERVICE_NAME", self.service_name)
+        export_dir = app.config.get("TRACE_EXPORT_DIR") or app.config.get("LOG_DIR") or "logs"
+        self.export_path = os.path.join(export_dir, "spans-{pid}.jsonl")
+        metrics.register_collector(lambda: {"trace_queue_depth": self._queue.qsize()}, name="tracing")
+
+        app.before_request(self._begin_request)
+        app.after_request(self._end_request)
+        app.teardown_request(self._teardown_request)
+        if self.enabled:
+            self.start()
+
+    # -------------------- spans --------------------
+    @contextmanager
+    def span(self, name, **attributes):
+        ctx = _current.get()
+        if ctx is None or not ctx[2]:
+            yield _NOOP
+            return
+        span = Span(name, ctx[0], ctx[1], attributes=attributes)
+        token = _current.set((span.trace_id, span.span_id, True))
+        try:
+            yield span
+        except BaseException as e:
+            span.set_error(e)
+            raise
+        finally:
+            _current.reset(token)
+            self._finish(span)
+
+    def _finish(self, span, end_ns=None):
+        span.end_ns = end_ns or time.time_ns()
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            metrics.inc("trace_spans_dropped_total")
+
+    # -------------------- HTTP propagation --------------------
+    def _begin_request(self):
+        trace_id, parent_id, sampled = None, None, None
+        match = _TRACEPARENT_RE.match(request.headers.get("traceparent", "").strip().lower())
+        if match and match.group(1) != "0" * 32:
+            trace_id, parent_id = match.group(1), match.group(2)
+            sampled = bool(int(match.group(3), 16) & 1)
+        if trace_id is None:
+            trace_id = _new_id(16)
+        if sampled is None:
+            sampled = self.enabled and random.random() < self.sample_ratio
+        sampled = sampled and self.enabled
+
+        if "X-Request-ID" not in request.headers:
+            g.request_id = trace_id
+
+        if not sampled:
+            g.trace_span = None
+            g.trace_token = _current.set((trace_id, _new_id(8), False))
+            return
+
+        span = Span(f"{request.method} {request.url_rule or request.path}", trace_id, parent_id,
+                    kind=_SPAN_KIND_SERVER, attributes={
+                        "http.method": request.method, "http.target": request.path,
+                        "request.id": g.get("request_id"),
+                    })
+        queued_ns = self._request_start_ns()
+        if queued_ns and queued_ns < span.start_ns:
+            self._finish(Span("queue", trace_id, span.span_id, start_ns=queued_ns), end_ns=span.start_ns)
+            span.start_ns = queued_ns
+        g.trace_span = span
+        g.trace_token = _current.set((trace_id, span.span_id, True))
+
+    @staticmethod
+    def _request_start_ns():
+        # nginx: "t=1700000000.123" (seconds); some proxies send microseconds
+        raw = request.headers.get("X-Request-Start", "")
+        if not raw:
+            return None
+        try:
+            value = float(raw.split("=", 1)[-1])
+        except ValueError:
+            return None
+        return int(value * 1e9) if value < 1e11 else int(value * 1e3)
+
+    def _end_request(self, response):
+        ctx = _current.get()
+        if ctx is not None:
+            response.headers["traceparent"] = f"00-{ctx[0]}-{ctx[1]}-{'01' if ctx[2] else '00'}"
+        span = g.get("trace_span")
+        if span is not None:
+            span.set_attribute("http.status_code", response.status_code)
+            if response.status_code >= 500:
+                span.status = _STATUS_ERROR
+        return response
+
+    def _teardown_request(self, exc):
+        span = g.pop("trace_span", None)
+        if span is not None:
+            if exc is not None:
+                span.set_error(exc)
+            self._finish(span)
+        token = g.pop("trace_token", None)
+        if token is not None:
+            _current.reset(token)
+
+    # -------------------- export --------------------
+    def start(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            first_start = self._thread is None
+            self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+            self._thread.start()
+        if first_start:
+            atexit.register(self.shutdown)
+            if hasattr(os, "register_at_fork"):
+                os.register_at_fork(after_in_child=self._after_fork)
+
+    def _after_fork(self):
+        # the exporter thread does not survive fork(); forked workers start their own
+        self._queue = queue.Queue(maxsize=self._queue.maxsize)
+        self._lock = threading.Lock()
+        if self.enabled:
+            self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = []
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            while item is not None:
+                if item is _STOP:
+                    self._export(batch)
+                    return
+                batch.append(item)
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    item = None
+            self._export(batch)
+
+    def _export(self, spans):
+        if not spans:
+            return
+        payload = {"resourceSpans": [{
+            "resource": {"attributes": [
+                {"key": "service.name", "value": {"stringValue": self.service_name}},
+                {"key": "process.pid", "value": {"intValue": str(os.getpid())}},
+            ]},
+            "scopeSpans": [{"scope": {"name": "utils.tracing"}, "spans": [s.to_otlp() for s in spans]}],
+        }]}
+        path = self.export_path.format(pid=os.getpid())
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(payload, ensure_ascii=False) + "\n")
+            metrics.inc("trace_spans_exported_total", len(spans))
+        except OSError as e:
+            metrics.inc("trace_spans_dropped_total", len(spans))
+            logger.warning(f"Failed to export {len(spans)} spans: {e}")
+
+    def shutdown(self, timeout=5.0):
+        thread = self._thread
+        if thread is None or not thread.is_alive():
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            return
+        thread.join(timeout)
+
+
+tracer = Tracer()